@@ -27,7 +27,15 @@
 This module contains the parser function along with all the support classes.
 '''
 
+import binascii
+import heapq
+import math
 import sys
+import weakref
+from array import array
+from bisect import bisect_left, bisect_right
+
+from .containers import SortedEditList, RippleList, AttributeSchema
 
 
 class ParserError(Exception):
@@ -41,9 +49,25 @@ class EditError(Exception):
     pass
 
 
-def parse(edl_path, start_tc=None, format='cmx3600', base=25):
+def parse(edl_path, start_tc=None, format='cmx3600', base=25, **kwargs):
     '''
     Parses the given *edl_path* assuming the file is in the format *format*.
+    Any further keyword arguments are passed on to the format's parser.
+    '''
+
+    try:
+        __import__('%s.%s' % (__name__, format))
+        parser = sys.modules['%s.%s' % (__name__, format)]
+    except ImportError:
+        raise ParserError('Invalid format')
+
+    return parser.parse(edl_path, start_tc, base=base, **kwargs)
+
+
+def iter_edits(edl_path, format='cmx3600', base=25, **kwargs):
+    '''
+    Lazily yields the edits of *edl_path* assuming the file is in the format
+    *format*, without building an EDL.
     '''
 
     try:
@@ -52,10 +76,91 @@ def parse(edl_path, start_tc=None, format='cmx3600', base=25):
     except ImportError:
         raise ParserError('Invalid format')
 
-    return parser.parse(edl_path, start_tc, base=base)
+    return parser.iter_edits(edl_path, base=base, **kwargs)
+
+
+def assemble(edls, offsets=None, renumber=True, start=1):
+    '''
+    Assembles *edls*, like the reels of a feature, into one stream of edits
+    ordered by record in, see editparser.pipeline.merge for the *offsets*.
+    The inputs can be EDLs or streams already ordered by record in, such as
+    iter_edits, and are read one edit at a time. With *renumber* the edits
+    are numbered from *start*.
+    '''
+    from . import pipeline
+    edits = pipeline.merge(edls, offsets)
+    if renumber:
+        edits = pipeline.renumber(edits, start)
+    return edits
+
+
+def relink(edl, roots, attribute='media_path', **kwargs):
+    '''
+    Lazily yields the edits of *edl* with *attribute* set to the media
+    file below *roots* they refer to, see editparser.media.relink.
+    '''
+    from .media import relink as relink_edits
+    return relink_edits(edl, roots, attribute=attribute, **kwargs)
+
+
+def watch(directory, callback, format='cmx3600', base=25, **kwargs):
+    '''
+    Starts watching *directory* and calls *callback* with a WatchEvent for
+    every new, modified or deleted EDL, see editparser.watcher.Watcher.
+    Returns the running Watcher, call its stop method to end watching.
+    '''
+    from .watcher import Watcher
+    return Watcher(directory, callback, format=format, base=base, **kwargs).start()
+
+
+ROUNDING = ('floor', 'nearest', 'ceil')
+
+
+def round_division(numerator, denominator, rounding='nearest'):
+    '''
+    Divides *numerator* by *denominator* rounding down ('floor'), to the
+    nearest integer ('nearest', halves round up) or up ('ceil'). Exact for
+    integer arguments.
+    '''
+    if isinstance(numerator, (int, long)) and isinstance(denominator, (int, long)):
+        if rounding == 'floor':
+            return numerator // denominator
+        elif rounding == 'ceil':
+            return -(-numerator // denominator)
+        elif rounding == 'nearest':
+            return (2 * numerator + denominator) // (2 * denominator)
+    else:
+        value = float(numerator) / denominator
+        if rounding == 'floor':
+            return int(math.floor(value))
+        elif rounding == 'ceil':
+            return int(math.ceil(value))
+        elif rounding == 'nearest':
+            return int(math.floor(value + 0.5))
+    raise TimeCodeError('Invalid rounding "%s", expected one of %s' % (rounding, ', '.join(ROUNDING)))
+
+
+def rebase_edit_frames(frames, base, new_base, rounding='nearest'):
+    '''
+    Converts the (mediaIn, mediaOut, globalIn, globalOut) *frames* of an
+    edit from *base* to *new_base*. Cut points are converted on their own
+    so adjacent edits stay adjacent, and an edit whose media and record
+    durations matched keeps them matching.
+    '''
+    media_in, media_out, global_in, global_out = frames
+    new_global_in = round_division(global_in * new_base, base, rounding)
+    new_global_out = round_division(global_out * new_base, base, rounding)
+    new_media_in = round_division(media_in * new_base, base, rounding)
+    if media_out - media_in == global_out - global_in:
+        new_media_out = new_media_in + new_global_out - new_global_in
+    else:
+        new_media_out = round_division(media_out * new_base, base, rounding)
+    return new_media_in, new_media_out, new_global_in, new_global_out
+
 
+class TimeCode(object):
+    __slots__ = ('_base', '_frames')
 
-class TimeCode():
     def __init__(self, tc='00:00:00:00', frames=0, base=24):
         self._base = base
 
@@ -129,6 +234,12 @@ class TimeCode():
     def __repr__(self):
         return '<TimeCode:%s>' % self.__str__()
 
+    def __getstate__(self):
+        return self._base, self._frames
+
+    def __setstate__(self, state):
+        self._base, self._frames = state
+
     def __add__(self, other):
         # adding Timecodes in different bases is possible but confusing, so we just error
         if self.base() != other.base():
@@ -163,26 +274,352 @@ class TimeCode():
 class EDL():
     def __init__(self, title, path, startTimeCode='01:00:00:00', base=25):
         self._title = title
+        # the edit list, None while the sorted edits below hold the edits
         self._edits = []
+        # whether the edit list is in record order, None if not known
+        self._ordered = True
+        self._sorted = None
+        self._ripple = None
+        self._indexes = None
+        self._transitions = []
+        self._schema = AttributeSchema()
         self._edlPath = path
         self.startTC = TimeCode(startTimeCode, base=base)
 
     def appendEdit(self, edit):
-        self._edits.append(edit)
+        if self._ripple is not None:
+            self._apply_ripples()
+        if self._edits is None and self._sorted.is_last(_record_in_key(edit)):
+            self._sorted.add(edit)
+        else:
+            edits = self.getAllEdits()
+            if self._ordered and edits and _record_in_key(edit) < _record_in_key(edits[-1]):
+                self._ordered = False
+            edits.append(edit)
+            if self._sorted is not None:
+                self._sorted.add(edit)
+        self._added(edit)
 
     def insertEdit(self, index, edit):
-        self._edits.insert(index, edit)
+        self.getAllEdits().insert(index, edit)
+        self._ordered = None
+        self._sorted = None
+        self._added(edit)
+
+    def insert_sorted(self, edit):
+        '''
+        Inserts *edit* into an edit list ordered by record in, after all
+        edits with the same or an earlier record in. On an ordered list
+        this takes logarithmic time, the list is read back on the next
+        getAllEdits; on an unordered one the place is searched from the end.
+        '''
+        if self._is_ordered():
+            self._sorted_edits().add(edit)
+            self._edits = None
+        else:
+            edits = self._edits
+            key = _record_in_key(edit)
+            position = len(edits)
+            while position > 0 and _record_in_key(edits[position - 1]) > key:
+                position -= 1
+            edits.insert(position, edit)
+            if self._sorted is not None:
+                self._sorted.add(edit)
+        self._added(edit)
+
+    def removeEdit(self, edit):
+        if self._is_ordered():
+            self._sorted_edits().remove(edit)
+            self._edits = None
+        else:
+            self._edits.remove(edit)
+            if self._sorted is not None:
+                self._sorted.remove(edit)
+        edit._remove_owner(self)
+        self._indexes = None
+
+    def _is_ordered(self):
+        if self._ripple is not None:
+            self._apply_ripples()
+        if self._edits is None:
+            return True
+        if self._ordered is None:
+            edits = self._edits
+            self._ordered = all(_record_in_key(edits[i - 1]) <= _record_in_key(edits[i])
+                                for i in range(1, len(edits)))
+        return self._ordered
+
+    def _added(self, edit):
+        edit._add_owner(self)
+        self._indexes = None
+
+    def _edit_changed(self, record_in):
+        # called by the edits of this EDL when they are changed
+        if record_in:
+            if self._ripple is not None:
+                self._apply_ripples()
+            if self._edits is None:
+                self._edits = list(self._sorted)
+            self._ordered = None
+            self._sorted = None
+        else:
+            self._indexes = None
+
+    def edits_in_range(self, start=None, end=None):
+        '''
+        Iterates in record order over the edits with a record in from *start*
+        up to but not including *end*, given as TimeCodes or frames.
+        '''
+        if isinstance(start, TimeCode):
+            start = start.frames()
+        if isinstance(end, TimeCode):
+            end = end.frames()
+        return self._sorted_edits().irange(start, end)
+
+    def _sorted_edits(self):
+        # the edits in record order, for range queries and sorted changes
+        if self._ripple is not None:
+            self._apply_ripples()
+        if self._sorted is None:
+            self._sorted = SortedEditList(_record_in_key, self._edits)
+        return self._sorted
+
+    def ripple_trim(self, edit, frames, side='out'):
+        '''
+        Moves the *side* ('in' or 'out') of *edit* by *frames* in the source
+        and shifts all later edits by the change in duration, so a positive
+        count lengthens the edit at the out and shortens it at the in.
+
+        Ripple edits are deferred until the edits are read through the EDL,
+        the record accessors of an edit only apply them to that edit.
+        '''
+        base = edit._mediaIn._base
+        media_in = edit._mediaIn._frames
+        media_out = edit._mediaOut._frames
+        if side == 'in':
+            media_in += frames
+            change = -frames
+        elif side == 'out':
+            media_out += frames
+            change = frames
+        else:
+            raise EditError('Invalid trim side "%s", expected "in" or "out".' % side)
+
+        global_out = edit._globalOut._frames + change
+        if media_in > media_out or edit._globalIn._frames > global_out:
+            raise EditError('Trim would move the In after the Out!')
+
+        self._ripple_edits().shift(edit, change)
+        edit._mediaIn = TimeCode(frames=media_in, base=base)
+        edit._mediaOut = TimeCode(frames=media_out, base=base)
+        edit._globalOut = TimeCode(frames=global_out, base=base)
+
+    def ripple_delete(self, edit):
+        '''
+        Removes *edit* and moves all later edits back to close the gap.
+        '''
+        ripple = self._ripple_edits()
+        ripple.shift(edit, edit._globalIn._frames - edit._globalOut._frames)
+        ripple.remove(edit)
+        if self._edits is not None:
+            self._edits.remove(edit)
+        self._indexes = None
+        edit._remove_owner(self)
+        edit._ripple_owner = None
+
+    def ripple_insert(self, edit):
+        '''
+        Inserts *edit* at its record in and moves the edits from there on
+        back by its duration. In the edit list it follows the edit before it
+        in record order.
+        '''
+        ripple = self._ripple_edits()
+        ripple.insert(edit)
+        ripple.shift(edit, edit._globalOut._frames - edit._globalIn._frames)
+        if self._edits is not None:
+            previous = ripple.before(edit)
+            if previous is None:
+                self._edits.insert(0, edit)
+            else:
+                self._edits.insert(self._edits.index(previous) + 1, edit)
+        self._indexes = None
+        edit._add_owner(self)
+        edit._ripple_owner = self
+
+    def _ripple_edits(self):
+        # while the edit list is in record order the ripple list holds the
+        # edits, otherwise the edit list is kept along with it
+        if self._ripple is None:
+            if self._is_ordered():
+                if self._sorted is not None:
+                    edits = list(self._sorted)
+                else:
+                    edits = self._edits
+                self._edits = None
+            else:
+                edits = self._edits
+            for edit in edits:
+                # an edit follows the ripples of one EDL at a time
+                if edit._ripple_owner is not None:
+                    edit._ripple_owner.getAllEdits()
+                edit._ripple_owner = self
+            self._ripple = RippleList(edits, _record_in_key)
+            self._sorted = None
+        return self._ripple
+
+    def _apply_ripples(self):
+        ripple = self._ripple
+        self._ripple = None
+        edits = []
+        shifted = []
+        for edit, shift in ripple.items():
+            edits.append(edit)
+            edit._ripple_owner = None
+            if shift:
+                base = edit._globalIn._base
+                edit._globalIn = TimeCode(frames=edit._globalIn._frames + shift, base=base)
+                edit._globalOut = TimeCode(frames=edit._globalOut._frames + shift, base=base)
+                shifted.append(edit)
+        if self._edits is None:
+            self._edits = edits
+        for edit in shifted:
+            edit._changed(True)
+
+    def _settle(self, edit):
+        # moves a single edit by its pending ripple edits
+        shift = self._ripple.settle(edit)
+        if shift:
+            base = edit._globalIn._base
+            edit._globalIn = TimeCode(frames=edit._globalIn._frames + shift, base=base)
+            edit._globalOut = TimeCode(frames=edit._globalOut._frames + shift, base=base)
+            edit._changed(True, self)
+
+    def __getstate__(self):
+        # the lookups are left out and built again when needed
+        edits = list(self.getAllEdits())
+        state = self.__dict__.copy()
+        state['_edits'] = edits
+        state['_ordered'] = None
+        state['_sorted'] = None
+        state['_indexes'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        for edit in self._edits:
+            edit._add_owner(self)
 
     def getAllEdits(self):
+        '''
+        Returns the list of edits. Change it through the EDL methods only,
+        the range and attribute lookups rely on them.
+        '''
+        if self._ripple is not None:
+            self._apply_ripples()
+        if self._edits is None:
+            self._edits = list(self._sorted)
         return self._edits
 
+    def check_edits(self):
+        '''
+        Runs the checks of the Edit constructor over all edits in one pass
+        and raises an EditError listing every failing event. The failures
+        are also kept in the *errors* attribute of the exception as
+        (index, number, message) tuples.
+        '''
+        errors = []
+        for index, edit in enumerate(self.getAllEdits()):
+            if edit._globalIn._frames > edit._globalOut._frames:
+                errors.append((index, edit.get('number'), 'Global In cannot be after Global Out!'))
+            if not (edit._mediaIn._base == edit._mediaOut._base ==
+                    edit._globalIn._base == edit._globalOut._base):
+                errors.append((index, edit.get('number'), 'TimeCode objects do not have the same base.'))
+
+        if errors:
+            lines = []
+            for index, number, message in errors:
+                if number is None:
+                    lines.append('edit #%d: %s' % (index, message))
+                else:
+                    lines.append('event %s: %s' % (number, message))
+            error = EditError('%d invalid edits in %s\n%s' % (len(errors), self._title, '\n'.join(lines)))
+            error.errors = errors
+            raise error
+
+    def where(self, **criteria):
+        '''
+        Returns the edits whose attributes match all *criteria*, in list
+        order. A list valued attribute, like the CMX 'channels', matches
+        when it contains the value; 'channel' is short for 'channels'.
+
+        Every attribute queried gets an index from value to edit positions,
+        built on first use and kept until edits are added or removed or
+        Edit.set is called on one of the edits of this EDL.
+        '''
+        edits = self.getAllEdits()
+        if not criteria:
+            return list(edits)
+
+        matches = []
+        for attribute, value in criteria.items():
+            positions = self._attribute_index(_QUERY_ALIASES.get(attribute, attribute)).get(value)
+            if positions is None:
+                return []
+            matches.append(positions)
+
+        matches.sort(key=len)
+        positions = matches[0]
+        for other in matches[1:]:
+            positions = [p for p in positions if _contains_sorted(other, p)]
+        return [edits[p] for p in positions]
+
+    def _attribute_index(self, attribute):
+        edits = self.getAllEdits()
+        if self._indexes is None:
+            self._indexes = {}
+
+        index = self._indexes.get(attribute)
+        if index is None:
+            index = {}
+            for position, edit in enumerate(edits):
+                value = edit.get(attribute)
+                if isinstance(value, (list, tuple)):
+                    values = set(value)
+                else:
+                    values = (value,)
+                for value in values:
+                    try:
+                        index.setdefault(value, array('l')).append(position)
+                    except TypeError:
+                        # unhashable values can not be queried
+                        pass
+            self._indexes[attribute] = index
+        return index
+
     def getEdit(self, index):
+        if self._ripple is None and self._edits is None:
+            edits = self._sorted
+        else:
+            edits = self.getAllEdits()
         try:
-            res = self._edits[index]
+            res = edits[index]
         except IndexError:
             res = None
         return res
 
+    def appendTransition(self, transition):
+        self._transitions.append(transition)
+
+    def getAllTransitions(self):
+        return self._transitions
+
+    def attribute_schema(self):
+        '''
+        Returns the AttributeSchema that the parsers store the attributes of
+        this EDL's edits in.
+        '''
+        return self._schema
+
     def title(self):
         return self._title
 
@@ -192,8 +629,270 @@ class EDL():
     def start_tc(self):
         return self.startTC
 
+    def frame_columns(self):
+        '''
+        Returns the frame numbers of all edits as four parallel arrays,
+        (mediaIn, mediaOut, globalIn, globalOut), in edit order.
+        '''
+        media_in = array('l')
+        media_out = array('l')
+        global_in = array('l')
+        global_out = array('l')
+        for edit in self.getAllEdits():
+            media_in.append(edit._mediaIn._frames)
+            media_out.append(edit._mediaOut._frames)
+            global_in.append(edit._globalIn._frames)
+            global_out.append(edit._globalOut._frames)
+        return media_in, media_out, global_in, global_out
+
+    def rebase(self, new_base, rounding='nearest'):
+        '''
+        Converts the start and all edits and transitions of this EDL to the
+        frame rate *new_base*, see rebase_edit_frames. Each edit converts
+        from its own base. Returns the indices of the edits with a cut point
+        that had to be rounded.
+        '''
+        edits = self.getAllEdits()
+        media_in, media_out, global_in, global_out = self.frame_columns()
+
+        # transitions convert from the base of their incoming edit
+        transition_bases = [transition._incoming._globalIn._base for transition in self._transitions]
+
+        rounded = []
+        for i, edit in enumerate(edits):
+            media_base = edit._mediaIn._base
+            record_base = edit._globalIn._base
+            new_media_in = round_division(media_in[i] * new_base, media_base, rounding)
+            new_global_in = round_division(global_in[i] * new_base, record_base, rounding)
+            new_global_out = round_division(global_out[i] * new_base, record_base, rounding)
+            if media_out[i] - media_in[i] == global_out[i] - global_in[i] and media_base == record_base:
+                new_media_out = new_media_in + new_global_out - new_global_in
+            else:
+                new_media_out = round_division(media_out[i] * new_base, media_base, rounding)
+            if (any((frames * new_base) % media_base for frames in (media_in[i], media_out[i])) or
+                    any((frames * new_base) % record_base for frames in (global_in[i], global_out[i]))):
+                rounded.append(i)
+
+            edit._mediaIn = TimeCode(frames=new_media_in, base=new_base)
+            edit._mediaOut = TimeCode(frames=new_media_out, base=new_base)
+            edit._globalIn = TimeCode(frames=new_global_in, base=new_base)
+            edit._globalOut = TimeCode(frames=new_global_out, base=new_base)
+            edit._changed(True)
+
+        for transition, base in zip(self._transitions, transition_bases):
+            transition._duration = round_division(transition._duration * new_base, base, rounding)
+
+        base = self.startTC.base()
+        self.startTC = TimeCode(frames=round_division(self.startTC.frames() * new_base, base, rounding),
+                                base=new_base)
+        return rounded
+
+    def consolidate(self, renumber=True):
+        '''
+        Merges the through-edits of this EDL, see
+        editparser.pipeline.consolidate, and with *renumber* numbers the
+        remaining edits from 1. Returns a dictionary from the old event
+        numbers to the new ones, the Vegas 'ID' for lists without numbers.
+        An old number shared by events that ended up in edits with
+        different numbers maps to a tuple of those numbers.
+        '''
+        from . import pipeline
+        edits = self.getAllEdits()
+        attribute = 'number'
+        if edits and edits[0].get('number') is None and edits[0].get('ID') is not None:
+            attribute = 'ID'
+
+        groups = []
+        edits = list(pipeline.consolidate(edits, lambda edit, originals: groups.append(originals)))
+        if renumber:
+            edits = list(pipeline.renumber(edits, attribute=attribute))
+
+        mapping = {}
+        replaced = {}
+        for edit, originals in zip(edits, groups):
+            number = edit.get(attribute)
+            for original in originals:
+                replaced[id(original)] = edit
+                old = original.get(attribute)
+                if old is None:
+                    continue
+                numbers = mapping.setdefault(old, [])
+                if number not in numbers:
+                    numbers.append(number)
+        for old, numbers in mapping.items():
+            mapping[old] = numbers[0] if len(numbers) == 1 else tuple(numbers)
+
+        for transition in self._transitions:
+            transition._outgoing = replaced.get(id(transition._outgoing), transition._outgoing)
+            transition._incoming = replaced.get(id(transition._incoming), transition._incoming)
+
+        for edit in self._edits:
+            edit._remove_owner(self)
+        for edit in edits:
+            edit._add_owner(self)
+        self._edits = edits
+        self._ordered = None
+        self._sorted = None
+        self._indexes = None
+        return mapping
+
+    def fingerprint(self, attributes=None):
+        '''
+        Returns a hex digest combining the fingerprints of all edits in
+        order. Only edits that changed since the last call are rehashed.
+        '''
+        from .fingerprint import Fingerprinter
+        fingerprinter = Fingerprinter(attributes)
+        for edit in self.getAllEdits():
+            fingerprinter.add(edit)
+        return fingerprinter.hexdigest()
+
+    def validate(self):
+        '''
+        Checks all edits for reversed in and out points, differing media and
+        record durations, gaps or overlaps with the previous edit on the same
+        channel and decreasing event numbers. Returns a list of
+        editparser.validate.Finding tuples.
+        '''
+        from .validate import validate_edl
+        return validate_edl(self)
+
+    def map_record_frames(self, frames):
+        '''
+        Maps each record frame in *frames* to the edit that covers it.
+
+        Returns three parallel sequences: edit indices, tape names and source
+        frames. Frames that no edit covers get the edit index -1, no tape and
+        the source frame -1. Where edits overlap the one starting last wins.
+        '''
+        edits = self.getAllEdits()
+        media_in, media_out, global_in, global_out = self.frame_columns()
+
+        # record in column sorted, zero length edits cover nothing
+        order = [i for i in range(len(edits)) if global_in[i] < global_out[i]]
+        order.sort(key=global_in.__getitem__)
+        starts = [global_in[i] for i in order]
+
+        # running maximum of the record outs, tells if any earlier edit
+        # still covers a frame past the out of the closest one
+        reach = []
+        furthest = None
+        for i in order:
+            furthest = global_out[i] if furthest is None else max(furthest, global_out[i])
+            reach.append(furthest)
+
+        edit_indices = array('l')
+        tapes = []
+        source_frames = array('l')
+
+        current_in = current_out = 0
+        for frame in frames:
+            if not current_in <= frame < current_out:
+                upper = bisect_right(starts, frame)
+                pos = upper - 1
+                while pos >= 0 and reach[pos] > frame and global_out[order[pos]] <= frame:
+                    pos -= 1
+                if pos < 0 or reach[pos] <= frame:
+                    edit_indices.append(-1)
+                    tapes.append(None)
+                    source_frames.append(-1)
+                    continue
+
+                current = order[pos]
+                current_in = global_in[current] if pos == upper - 1 else frame
+                current_out = global_out[current]
+                if upper < len(starts):
+                    # a later overlapping edit takes over from its start
+                    current_out = min(current_out, starts[upper])
+                edit = edits[current]
+                tape = edit.get('tape', edit.get('FileName'))
+                offset = media_in[current] - global_in[current]
+
+            edit_indices.append(current)
+            tapes.append(tape)
+            source_frames.append(frame + offset)
+
+        return edit_indices, tapes, source_frames
+
+    def flatten(self, track_priority=None):
+        '''
+        Returns a new EDL with the single layer of edits that is visible when
+        overlapping edits are stacked.
+
+        *track_priority* is either a function returning the priority of an
+        edit, where the highest priority is on top, or a list of track
+        numbers (the Vegas 'Track' attribute) from the top-most down. By
+        default lower track numbers are on top, as in Vegas. Between edits of
+        the same priority the later one in the list is on top. Partly covered
+        edits are split with their media in moved accordingly.
+        '''
+        if track_priority is None:
+            track_priority = lambda edit: -edit.get('Track', 0)
+        elif not callable(track_priority):
+            ranks = dict((track, -i) for i, track in enumerate(track_priority))
+            lowest = -len(ranks)
+            track_priority = lambda edit: ranks.get(edit.get('Track'), lowest)
+
+        edits = [edit for edit in self.getAllEdits()
+                 if edit._globalIn._frames < edit._globalOut._frames]
+        starts = sorted(range(len(edits)), key=lambda i: edits[i]._globalIn._frames)
+        boundaries = sorted(set([edit._globalIn._frames for edit in edits] +
+                                [edit._globalOut._frames for edit in edits]))
+
+        flat = EDL(self._title, self._edlPath, self.startTC.tc(), base=self.startTC.base())
+
+        def emit(i, start, end):
+            edit = edits[i]
+            base = edit._mediaIn._base
+            offset = edit._mediaIn._frames - edit._globalIn._frames
+            flat.appendEdit(Edit(TimeCode(frames=start + offset, base=base),
+                                 TimeCode(frames=end + offset, base=base),
+                                 TimeCode(frames=start, base=base),
+                                 TimeCode(frames=end, base=base),
+                                 **dict(edit.attributes())))
+
+        # sweep over all cut points keeping the active edits in a heap
+        active = []
+        next_start = 0
+        visible = None
+        visible_from = None
+        for frame in boundaries:
+            while next_start < len(starts) and edits[starts[next_start]]._globalIn._frames == frame:
+                i = starts[next_start]
+                heapq.heappush(active, (-track_priority(edits[i]), -i))
+                next_start += 1
+            while active and edits[-active[0][1]]._globalOut._frames <= frame:
+                heapq.heappop(active)
+
+            top = -active[0][1] if active else None
+            if top != visible:
+                if visible is not None:
+                    emit(visible, visible_from, frame)
+                visible = top
+                visible_from = frame
+
+        return flat
+
+
+def _record_in_key(edit):
+    return edit._globalIn._frames
+
+
+_QUERY_ALIASES = {'channel': 'channels'}
+
+
+def _contains_sorted(positions, position):
+    i = bisect_left(positions, position)
+    return i < len(positions) and positions[i] == position
+
+
+class Edit(object):
+    # weak references to the EDLs holding this edit
+    _owners = ()
+
+    # the EDL whose pending ripple edits move this edit
+    _ripple_owner = None
 
-class Edit():
     def __init__(self, mediaIn, mediaOut, globalIn, globalOut, **kwargs):
         self._mediaIn = self.parse_input_tc(mediaIn)
         self._mediaOut = self.parse_input_tc(mediaOut)
@@ -209,6 +908,34 @@ class Edit():
 
         #print 'creating edit, kwargs:', kwargs
         self._attributes = kwargs
+        self._digest = None
+
+    @classmethod
+    def from_frames(cls, mediaIn, mediaOut, globalIn, globalOut, base, attributes=None):
+        '''
+        Creates an edit from frame counts at *base*, see from_timecodes.
+        '''
+        return cls.from_timecodes(TimeCode(frames=mediaIn, base=base),
+                                  TimeCode(frames=mediaOut, base=base),
+                                  TimeCode(frames=globalIn, base=base),
+                                  TimeCode(frames=globalOut, base=base),
+                                  attributes)
+
+    @classmethod
+    def from_timecodes(cls, mediaIn, mediaOut, globalIn, globalOut, attributes=None):
+        '''
+        Creates an edit from TimeCode objects without the checks of the
+        constructor, for parsers that check all their edits at once with
+        EDL.check_edits. The *attributes* dictionary is used, not copied.
+        '''
+        edit = cls.__new__(cls)
+        edit._mediaIn = mediaIn
+        edit._mediaOut = mediaOut
+        edit._globalIn = globalIn
+        edit._globalOut = globalOut
+        edit._attributes = attributes if attributes is not None else {}
+        edit._digest = None
+        return edit
 
     def parse_input_tc(self, tc):
         if not isinstance(tc, TimeCode):
@@ -229,11 +956,13 @@ class Edit():
         return self._mediaOut
 
     def globalIn(self, refTC=None):
+        self._sync()
         if refTC is None:
             refTC = TimeCode(frames=0, base=self._globalIn.base())
         return self._globalIn-refTC
 
     def globalOut(self, refTC=None):
+        self._sync()
         if refTC is None:
             refTC = TimeCode(frames=0, base=self._globalOut.base())
         return self._globalOut-refTC
@@ -257,24 +986,147 @@ class Edit():
         self._mediaOut = mediaOut
 
     def setGlobalIn(self, globalIn):
+        self._sync()
         if globalIn.base() != self._globalIn.base():
             raise EditError('Wrong input base! Expected %s, got %s.' % (self._globalIn.base(), globalIn.base()))
         self._globalIn = globalIn
+        self._changed(True)
 
     def setGlobalOut(self, globalOut):
+        self._sync()
         if globalOut.base() != self._globalOut.base():
             raise EditError('Wrong input base! Expected %s, got %s.' % (self._globalOut.base(), globalOut.base()))
         self._globalOut = globalOut
 
+    def _sync(self):
+        # applies the pending ripple edits that move this edit
+        if self._ripple_owner is not None:
+            self._ripple_owner._settle(self)
+
+    def __getstate__(self):
+        # the EDLs holding this edit take it over again when unpickled
+        self._sync()
+        state = self.__dict__.copy()
+        state.pop('_owners', None)
+        state.pop('_ripple_owner', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+    def _add_owner(self, edl):
+        owner = weakref.ref(edl)
+        if owner not in self._owners:
+            self._owners = self._owners + (owner,)
+
+    def _remove_owner(self, edl):
+        self._owners = tuple(owner for owner in self._owners
+                             if owner() is not None and owner() is not edl)
+
+    def _changed(self, record_in, source=None):
+        # lets the EDLs holding this edit, but *source*, drop their lookups
+        for owner in self._owners:
+            edl = owner()
+            if edl is not None and edl is not source:
+                edl._edit_changed(record_in)
+
     def get(self, attribute, default=None):
         return self._attributes.get(attribute, default)
 
     def set(self, attribute, value):
+        '''
+        Sets *attribute*, a list *value* is stored as a copy. Change the
+        attributes through set only, the cached fingerprint and the
+        attribute lookups of EDL.where are reset here.
+        '''
         #print 'setting attr', attribute, 'to', value
+        if isinstance(value, list):
+            value = list(value)
         self._attributes[attribute] = value
+        self._digest = None
+        self._changed(False)
 
     def attributes(self):
         return self._attributes
 
+    def fingerprint(self, attributes=None):
+        '''
+        Returns a hex digest of the frames of this edit and its *attributes*,
+        by default editparser.fingerprint.ATTRIBUTES.
+        '''
+        from .fingerprint import edit_digest
+        return binascii.hexlify(edit_digest(self, attributes))
+
+    def use_schema(self, schema):
+        '''
+        Moves the attributes of this edit into the shared storage of
+        *schema*, see AttributeSchema.
+        '''
+        self._attributes = schema.attributes(self._attributes)
+
     def __repr__(self):
         return '< Edit: %s[%s;%s]%s>' % (self._globalIn, self._mediaIn, self._mediaOut, self._globalOut)
+
+
+class Transition():
+    '''
+    A dissolve or wipe of *duration* frames from the *outgoing* edit to the
+    *incoming* edit, starting at the record in of the incoming edit.
+
+    During the transition the outgoing source keeps playing on from its
+    media out while the incoming source plays from its media in.
+    '''
+    def __init__(self, kind, duration, outgoing, incoming):
+        self._kind = kind
+        self._duration = int(duration)
+        self._outgoing = outgoing
+        self._incoming = incoming
+
+    def kind(self):
+        return self._kind
+
+    def duration(self):
+        return self._duration
+
+    def outgoing(self):
+        return self._outgoing
+
+    def incoming(self):
+        return self._incoming
+
+    def globalIn(self):
+        return self._incoming.globalIn()
+
+    def globalOut(self):
+        return self.globalIn() + TimeCode(frames=self._duration, base=self.globalIn().base())
+
+    def blend(self):
+        '''
+        Lazily yields (record frame, outgoing source frame, incoming source
+        frame, mix weight) for every frame of the transition. The mix weight
+        is the share of the incoming source, rising from 0.0 towards 1.0.
+        '''
+        record_in = self._incoming._globalIn._frames
+        outgoing_in = self._outgoing._mediaOut._frames
+        incoming_in = self._incoming._mediaIn._frames
+        duration = float(self._duration)
+        for i in xrange(self._duration):
+            yield (record_in + i, outgoing_in + i, incoming_in + i, i / duration)
+
+    def blend_columns(self):
+        '''
+        Returns the blend schedule as four parallel arrays, see blend().
+        '''
+        record_in = self._incoming._globalIn._frames
+        outgoing_in = self._outgoing._mediaOut._frames
+        incoming_in = self._incoming._mediaIn._frames
+        steps = xrange(self._duration)
+        duration = float(self._duration)
+        return (array('l', (record_in + i for i in steps)),
+                array('l', (outgoing_in + i for i in steps)),
+                array('l', (incoming_in + i for i in steps)),
+                array('d', (i / duration for i in steps)))
+
+    def __repr__(self):
+        return '< Transition: %s %s %s -> %s>' % (self._kind, self._duration,
+                                                  self._outgoing, self._incoming)
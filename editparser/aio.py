@@ -0,0 +1,195 @@
+# Copyright (c) 2012, Sveinbjorn J. Tryggvason
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    Redistributions of source code must retain the above
+#    copyright notice, this list of conditions and the following disclaimer.
+#
+#    Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT,INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+'''
+Event loop friendly parsing. The functions here return asyncio futures
+that are resolved once the file has been read and parsed in an executor,
+so they can be awaited from coroutines without blocking the loop.
+
+Works with asyncio, or with its trollius backport where asyncio is not
+available.
+'''
+
+import collections
+import functools
+
+try:
+    import asyncio
+except ImportError:
+    try:
+        import trollius as asyncio
+    except ImportError:
+        asyncio = None
+
+from . import parse as parse_sync
+
+
+class Limit(object):
+    '''
+    Limits how many parses run at once, like a semaphore with *value*
+    slots. A Limit can be shared between calls on the same event loop and
+    must only be used from the loop's thread.
+    '''
+
+    def __init__(self, value):
+        if value < 1:
+            raise ValueError('Limit must be at least 1, got %s' % value)
+        self._value = value
+        self._waiting = collections.deque()
+
+    def _schedule(self, future, start):
+        if self._value > 0:
+            self._value -= 1
+            start()
+        else:
+            self._waiting.append((future, start))
+
+    def _release(self):
+        while self._waiting:
+            future, start = self._waiting.popleft()
+            # cancelled while waiting for a slot
+            if not future.done():
+                start()
+                return
+        self._value += 1
+
+
+def parse(edl_path, start_tc=None, format='cmx3600', base=25, executor=None, limit=None,
+          loop=None, **kwargs):
+    '''
+    Returns a future resolving to the EDL parsed from *edl_path*, see
+    editparser.parse. Reading and parsing run in *executor*, the loop's
+    default thread pool if None; a process pool keeps CPU bound parsing
+    off the interpreter running the loop. *limit*, a Limit shared by the
+    calls it bounds, limits how many parses run at once; use parse_many
+    to bound a batch by a number.
+
+    Cancelling the future cancels the parse, waiting for a slot or handed
+    to the executor, and frees its slot. A parse the executor has already
+    started can not be stopped, it runs to the end in the background.
+    '''
+    if limit is not None and not isinstance(limit, Limit):
+        raise TypeError('limit must be a Limit shared between calls, got %r' % (limit,))
+    loop = _get_loop(loop)
+
+    call = functools.partial(parse_sync, edl_path, start_tc, format=format, base=base, **kwargs)
+    outer = _create_future(loop)
+
+    def start():
+        job = loop.run_in_executor(executor, call)
+
+        def job_done(job):
+            if limit is not None:
+                limit._release()
+            if outer.done():
+                return
+            if job.cancelled():
+                outer.cancel()
+            elif job.exception() is not None:
+                outer.set_exception(job.exception())
+            else:
+                outer.set_result(job.result())
+
+        def outer_done(outer):
+            if outer.cancelled():
+                job.cancel()
+
+        job.add_done_callback(job_done)
+        outer.add_done_callback(outer_done)
+
+    if limit is None:
+        start()
+    else:
+        limit._schedule(outer, start)
+    return outer
+
+
+def parse_many(edl_paths, start_tc=None, format='cmx3600', base=25, executor=None, limit=8,
+               return_exceptions=False, loop=None, **kwargs):
+    '''
+    Returns a future resolving to the list of EDLs parsed from
+    *edl_paths*, in order, with at most *limit* parses running at once;
+    *limit* is a Limit or a number of slots for this batch.
+    With *return_exceptions* a failed parse puts its exception in the list
+    instead of failing the whole future. Cancelling the future cancels
+    every parse that has not finished, and cancelling one of the parses
+    cancels the future.
+    '''
+    loop = _get_loop(loop)
+    if limit is not None and not isinstance(limit, Limit):
+        limit = Limit(limit)
+
+    futures = [parse(edl_path, start_tc, format=format, base=base, executor=executor,
+                     limit=limit, loop=loop, **kwargs)
+               for edl_path in edl_paths]
+    return _gather(futures, return_exceptions, loop)
+
+
+def _gather(futures, return_exceptions, loop):
+    # asyncio.gather, for any loop that makes futures
+    result = _create_future(loop)
+    pending = [len(futures)]
+
+    def done(future):
+        if result.done():
+            return
+        if future.cancelled():
+            result.cancel()
+            return
+        if future.exception() is not None and not return_exceptions:
+            result.set_exception(future.exception())
+            return
+        pending[0] -= 1
+        if not pending[0]:
+            result.set_result([future.exception() if future.exception() is not None
+                               else future.result() for future in futures])
+
+    def result_done(result):
+        if result.cancelled():
+            # the waiting parses first, so a freed slot does not start them
+            for future in reversed(futures):
+                future.cancel()
+
+    if not futures:
+        result.set_result([])
+    for future in futures:
+        future.add_done_callback(done)
+    result.add_done_callback(result_done)
+    return result
+
+
+def _get_loop(loop):
+    if loop is None:
+        if asyncio is None:
+            raise RuntimeError('editparser.aio requires asyncio or trollius')
+        loop = asyncio.get_event_loop()
+    return loop
+
+
+def _create_future(loop):
+    create_future = getattr(loop, 'create_future', None)
+    if create_future is not None:
+        return create_future()
+    return asyncio.Future(loop=loop)
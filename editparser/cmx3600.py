@@ -26,7 +26,10 @@
 import os
 import re
 
-from . import EDL, TimeCode, Edit, ParserError
+from . import EDL, TimeCode, Edit, Transition, ParserError
+
+
+TRANSITIONS = ('D', 'W')
 
 
 def parse(edl_path, start_tc=None, base=25):
@@ -34,11 +37,11 @@ def parse(edl_path, start_tc=None, base=25):
         raise IOError('Path does not exist: %s' % edl_path)
 
     edl_file = open(edl_path, 'rt')
-    edl_lines = edl_file.readlines()
+    first_line = edl_file.readline()
     edl_file.close()
 
     # check if we there is a TITLE specified
-    search = re.search(r'TITLE:\s+(.*)', edl_lines[0])
+    search = re.search(r'TITLE:\s+(.*)', first_line)
     if not search:
         edl_name = 'edl'
     else:
@@ -52,28 +55,58 @@ def parse(edl_path, start_tc=None, base=25):
     else:
         the_edl = EDL(edl_name, edl_path, base=base)
 
+    previous_edit = None
+    for current_edit in iter_edits(edl_path, base, the_edl.attribute_schema()):
+        the_edl.appendEdit(current_edit)
+
+        # a dissolve or wipe event repeats the event number of the
+        # outgoing event it transitions from
+        if (current_edit.get('transition') in TRANSITIONS and previous_edit is not None and
+                previous_edit.get('number') == current_edit.get('number')):
+            the_edl.appendTransition(Transition(current_edit.get('transition'),
+                                                current_edit.get('duration'),
+                                                previous_edit, current_edit))
+        previous_edit = current_edit
+
+    the_edl.check_edits()
+    return the_edl
+
+
+def iter_edits(edl_path, base=25, schema=None):
+    '''
+    Lazily yields the edits of the EDL at *edl_path*, each one once the
+    comment lines following its event line have been read. The attributes
+    are stored in *schema* if one is given. The edits are not checked, see
+    EDL.check_edits.
+    '''
+    if not os.path.exists(edl_path):
+        raise IOError('Path does not exist: %s' % edl_path)
+
     event_expr = re.compile(r'(\d{3}).*')
-    edit_search_exp = re.compile(r'\d{3}.*[A-Z]\s(.*)')
-    edit_name_exp = re.compile(r'\*\sFROM\sCLIP\sNAME:\s(.*)')
     current_edit = None
 
-    for i in range(len(edl_lines)):
-        line = edl_lines[i].strip()
-        if re.match(event_expr, line):
-            parsed_line = parse_event_line(line, base)
-            mi = parsed_line.pop('media_in')
-            mo = parsed_line.pop('media_out')
-            gi = parsed_line.pop('global_in')
-            go = parsed_line.pop('global_out')
-            current_edit = Edit(mi, mo, gi, go, **parsed_line)
-            the_edl.appendEdit(current_edit)
-        else:
-            line_info = parse_info_line(line)
-            for k, v in line_info.items():
+    with open(edl_path, 'rt') as edl_file:
+        for line in edl_file:
+            line = line.strip()
+            if re.match(event_expr, line):
                 if current_edit is not None:
-                    current_edit.set(k, v)
-
-    return the_edl
+                    yield current_edit
+                parsed_line = parse_event_line(line, base)
+                mi = parsed_line.pop('media_in')
+                mo = parsed_line.pop('media_out')
+                gi = parsed_line.pop('global_in')
+                go = parsed_line.pop('global_out')
+                current_edit = Edit.from_timecodes(mi, mo, gi, go, parsed_line)
+                if schema is not None:
+                    current_edit.use_schema(schema)
+            else:
+                line_info = parse_info_line(line)
+                for k, v in line_info.items():
+                    if current_edit is not None:
+                        current_edit.set(k, v)
+
+    if current_edit is not None:
+        yield current_edit
 
 def parse_event_line(line, base=24):
     expr = r'(?P<number>\d{3})\s*(?P<tape>[A-Z_0-9]*)\s(?P<channel>[VA]+)\s*(?P<transition>\w)\s*(?P<duration>\d{3})?\s(?P<mi>\d\d:\d\d:\d\d:\d\d)\s(?P<mo>\d\d:\d\d:\d\d:\d\d)\s(?P<gi>\d\d:\d\d:\d\d:\d\d)\s(?P<go>\d\d:\d\d:\d\d:\d\d)'
@@ -0,0 +1,685 @@
+# Copyright (c) 2012, Sveinbjorn J. Tryggvason
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    Redistributions of source code must retain the above
+#    copyright notice, this list of conditions and the following disclaimer.
+#
+#    Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT,INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+'''
+Container types used to keep edits ordered and to store their attributes.
+'''
+
+from bisect import bisect_left, bisect_right
+try:
+    from collections.abc import Mapping, MutableMapping
+except ImportError:
+    from collections import Mapping, MutableMapping
+
+
+class SortedEditList(object):
+    '''
+    A list of items kept ordered by *key*, stored as a list of sorted blocks
+    so that inserting and removing an item only moves the items of one
+    block. Items with equal keys keep their insertion order.
+
+    The key of an item must not change while the item is in the list.
+    '''
+
+    def __init__(self, key, items=(), load=1000):
+        self._key = key
+        self._load = load
+        self._blocks = []
+        self._keys = []
+        self._maxes = []
+        self._len = 0
+        self.update(items)
+
+    def update(self, items):
+        items = list(items)
+        if self._len:
+            for item in items:
+                self.add(item)
+            return
+
+        # bulk load into an empty list
+        items.sort(key=self._key)
+        for i in range(0, len(items), self._load):
+            block = items[i:i + self._load]
+            keys = [self._key(item) for item in block]
+            self._blocks.append(block)
+            self._keys.append(keys)
+            self._maxes.append(keys[-1])
+        self._len = len(items)
+
+    def add(self, item):
+        key = self._key(item)
+        if not self._maxes:
+            self._blocks.append([item])
+            self._keys.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            return
+
+        pos = bisect_right(self._maxes, key)
+        if pos == len(self._maxes):
+            pos -= 1
+            self._blocks[pos].append(item)
+            self._keys[pos].append(key)
+            self._maxes[pos] = key
+        else:
+            i = bisect_right(self._keys[pos], key)
+            self._blocks[pos].insert(i, item)
+            self._keys[pos].insert(i, key)
+        self._len += 1
+
+        if len(self._blocks[pos]) > 2 * self._load:
+            self._split(pos)
+
+    def remove(self, item):
+        '''
+        Removes *item* (compared by identity), raises ValueError if it is not
+        in the list.
+        '''
+        key = self._key(item)
+        pos = bisect_left(self._maxes, key)
+        while pos < len(self._maxes):
+            keys = self._keys[pos]
+            block = self._blocks[pos]
+            i = bisect_left(keys, key)
+            while i < len(keys) and keys[i] == key:
+                if block[i] is item:
+                    self._delete(pos, i)
+                    return
+                i += 1
+            if i < len(keys):
+                break
+            pos += 1
+        raise ValueError('Item is not in the list')
+
+    def is_last(self, key):
+        '''
+        Tells whether an item with *key* would be added at the end.
+        '''
+        return not self._maxes or key >= self._maxes[-1]
+
+    def irange(self, start=None, end=None):
+        '''
+        Iterates over the items with a key from *start* up to but not
+        including *end*.
+        '''
+        if start is None:
+            pos = i = 0
+        else:
+            pos = bisect_left(self._maxes, start)
+            if pos == len(self._maxes):
+                return
+            i = bisect_left(self._keys[pos], start)
+
+        while pos < len(self._blocks):
+            keys = self._keys[pos]
+            block = self._blocks[pos]
+            while i < len(keys):
+                if end is not None and keys[i] >= end:
+                    return
+                yield block[i]
+                i += 1
+            pos += 1
+            i = 0
+
+    def _split(self, pos):
+        block = self._blocks[pos]
+        keys = self._keys[pos]
+        half = len(block) // 2
+        self._blocks[pos:pos + 1] = [block[:half], block[half:]]
+        self._keys[pos:pos + 1] = [keys[:half], keys[half:]]
+        self._maxes.insert(pos, keys[half - 1])
+
+    def _delete(self, pos, i):
+        del self._blocks[pos][i]
+        del self._keys[pos][i]
+        self._len -= 1
+        if self._keys[pos]:
+            self._maxes[pos] = self._keys[pos][-1]
+        else:
+            del self._blocks[pos]
+            del self._keys[pos]
+            del self._maxes[pos]
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError('SortedEditList index out of range')
+        for block in self._blocks:
+            if index < len(block):
+                return block[index]
+            index -= len(block)
+
+    def __iter__(self):
+        for block in self._blocks:
+            for item in block:
+                yield item
+
+    def __len__(self):
+        return self._len
+
+
+class OffsetTree(object):
+    '''
+    Fenwick tree of shifts. The offset of a position is the sum of all
+    shifts added at or before it.
+    '''
+
+    def __init__(self, offsets=()):
+        offsets = list(offsets)
+        tree = [0] * (len(offsets) + 1)
+        previous = 0
+        for i, offset in enumerate(offsets):
+            tree[i + 1] = offset - previous
+            previous = offset
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def add(self, position, delta):
+        '''
+        Shifts *position* and all positions after it by *delta*.
+        '''
+        i = position + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def offset(self, position):
+        i = position + 1
+        total = 0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def __len__(self):
+        return len(self._tree) - 1
+
+
+class _RippleBlock(object):
+    def __init__(self, items, shifts, index):
+        self.items = items
+        self.shifts = shifts
+        self.index = index
+
+
+class RippleList(object):
+    '''
+    A list of items ordered by *key* where shifting every item after a given
+    item is deferred. Shifts within an item's own block are stored per item,
+    shifts of the following blocks go into an OffsetTree, so a shift costs
+    one block plus a tree update instead of touching every later item.
+    '''
+
+    def __init__(self, items, key, load=256):
+        self._key = key
+        self._load = load
+        items = sorted(items, key=key)
+        self._blocks = []
+        for i in range(0, len(items), load):
+            block = items[i:i + load]
+            self._blocks.append(_RippleBlock(block, [0] * len(block), len(self._blocks)))
+        if not self._blocks:
+            self._blocks.append(_RippleBlock([], [], 0))
+        self._block_of = {}
+        for block in self._blocks:
+            for item in block.items:
+                self._block_of[id(item)] = block
+        self._tree = OffsetTree([0] * len(self._blocks))
+
+    def shift(self, item, delta, include=False):
+        '''
+        Shifts all items after *item*, and *item* itself if *include* is
+        set, by *delta*.
+        '''
+        block, i = self._locate(item)
+        shifts = block.shifts
+        for j in range(i if include else i + 1, len(shifts)):
+            shifts[j] += delta
+        self._tree.add(block.index + 1, delta)
+
+    def insert(self, item):
+        '''
+        Inserts *item* before all items whose shifted key is the same or
+        later than the key of *item*.
+        '''
+        key = self._key(item)
+
+        # last block starting before the key, only a sole block can be empty
+        lo, hi = 0, len(self._blocks)
+        while lo < hi and self._blocks[0].items:
+            mid = (lo + hi) // 2
+            if self._shifted_key(self._blocks[mid], 0) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        block = self._blocks[max(lo - 1, 0)]
+
+        lo, hi = 0, len(block.items)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._shifted_key(block, mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        # cancel out the shifts already applied to this position
+        block.items.insert(lo, item)
+        block.shifts.insert(lo, -self._tree.offset(block.index))
+        self._block_of[id(item)] = block
+
+        if len(block.items) > 2 * self._load:
+            self._split(block)
+
+    def remove(self, item):
+        block, i = self._locate(item)
+        del block.items[i]
+        del block.shifts[i]
+        del self._block_of[id(item)]
+        if not block.items and len(self._blocks) > 1:
+            self._rebuild(self._blocks[:block.index] + self._blocks[block.index + 1:])
+
+    def before(self, item):
+        '''
+        Returns the item before *item*, or None for the first item.
+        '''
+        block, i = self._locate(item)
+        if i > 0:
+            return block.items[i - 1]
+        if block.index > 0:
+            return self._blocks[block.index - 1].items[-1]
+        return None
+
+    def settle(self, item):
+        '''
+        Returns the shift of *item* and clears it, for an item whose key was
+        moved by that shift.
+        '''
+        block, i = self._locate(item)
+        shift = block.shifts[i] + self._tree.offset(block.index)
+        block.shifts[i] -= shift
+        return shift
+
+    def items(self):
+        '''
+        Iterates over (item, shift) pairs in order.
+        '''
+        for block in self._blocks:
+            offset = self._tree.offset(block.index)
+            for item, shift in zip(block.items, block.shifts):
+                yield item, shift + offset
+
+    def _shifted_key(self, block, i):
+        return self._key(block.items[i]) + block.shifts[i] + self._tree.offset(block.index)
+
+    def _locate(self, item):
+        try:
+            block = self._block_of[id(item)]
+        except KeyError:
+            raise ValueError('Item is not in the list')
+        for i, other in enumerate(block.items):
+            if other is item:
+                return block, i
+        raise ValueError('Item is not in the list')
+
+    def _split(self, block):
+        half = len(block.items) // 2
+        new_block = _RippleBlock(block.items[half:], block.shifts[half:], 0)
+        del block.items[half:]
+        del block.shifts[half:]
+        for item in new_block.items:
+            self._block_of[id(item)] = new_block
+        # the new block starts with the same offset as the one it came from
+        self._rebuild(self._blocks[:block.index + 1] + [new_block] +
+                      self._blocks[block.index + 1:], duplicate=block.index)
+
+    def _rebuild(self, blocks, duplicate=None):
+        offsets = [self._tree.offset(block.index) for block in blocks]
+        if duplicate is not None:
+            offsets[duplicate + 1] = offsets[duplicate]
+        for i, block in enumerate(blocks):
+            block.index = i
+        self._blocks = blocks
+        self._tree = OffsetTree(offsets)
+
+    def __len__(self):
+        return len(self._block_of)
+
+
+_MISSING = object()
+
+
+class AttributeSchema(object):
+    '''
+    The attribute names shared by the edits of one EDL, along with a table
+    of interned string values so that repeated values such as tape and
+    clip names are stored once.
+    '''
+
+    def __init__(self):
+        self._slots = {}
+        self._keys = []
+        self._strings = {}
+
+    def slot(self, key):
+        slot = self._slots.get(key)
+        if slot is None:
+            key = self.intern(key)
+            self._slots[key] = len(self._keys)
+            self._keys.append(key)
+            slot = self._slots[key]
+        return slot
+
+    def keys(self):
+        return list(self._keys)
+
+    def intern(self, value):
+        if isinstance(value, basestring):
+            return self._strings.setdefault(value, value)
+        return value
+
+    def attributes(self, items=()):
+        '''
+        Returns a SharedAttributes mapping holding *items*.
+        '''
+        if isinstance(items, dict):
+            items = items.items()
+        slots = [self.slot(key) for key, value in items]
+
+        values = [_MISSING] * len(self._keys)
+        strings = self._strings
+        for slot, (key, value) in zip(slots, items):
+            if isinstance(value, basestring):
+                value = strings.setdefault(value, value)
+            values[slot] = value
+
+        attributes = SharedAttributes(self)
+        attributes._values = values
+        return attributes
+
+
+class SharedAttributes(object):
+    '''
+    Attribute mapping of one edit that keeps only the values, in the slots
+    given by its AttributeSchema.
+
+    Registered as a MutableMapping instead of deriving from it, since the
+    Python 2 mapping classes have no __slots__ and would give every
+    instance a __dict__.
+    '''
+    __slots__ = ('_schema', '_values')
+
+    def __init__(self, schema):
+        self._schema = schema
+        self._values = []
+
+    def __getitem__(self, key):
+        slot = self._schema._slots.get(key)
+        if slot is None or slot >= len(self._values) or self._values[slot] is _MISSING:
+            raise KeyError(key)
+        return self._values[slot]
+
+    def __setitem__(self, key, value):
+        slot = self._schema.slot(key)
+        values = self._values
+        if slot >= len(values):
+            values.extend([_MISSING] * (slot + 1 - len(values)))
+        values[slot] = self._schema.intern(value)
+
+    def __delitem__(self, key):
+        slot = self._schema._slots.get(key)
+        if slot is None or slot >= len(self._values) or self._values[slot] is _MISSING:
+            raise KeyError(key)
+        self._values[slot] = _MISSING
+
+    def __iter__(self):
+        keys = self._schema._keys
+        for slot, value in enumerate(self._values):
+            if value is not _MISSING:
+                yield keys[slot]
+
+    def __len__(self):
+        return sum(1 for value in self._values if value is not _MISSING)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        slot = self._schema._slots.get(key)
+        if slot is None or slot >= len(self._values) or self._values[slot] is _MISSING:
+            return default
+        return self._values[slot]
+
+    def keys(self):
+        return list(self)
+
+    def values(self):
+        return [value for value in self._values if value is not _MISSING]
+
+    def items(self):
+        keys = self._schema._keys
+        return [(keys[slot], value) for slot, value in enumerate(self._values)
+                if value is not _MISSING]
+
+    def update(self, items=(), **kwargs):
+        if isinstance(items, Mapping):
+            items = items.items()
+        for key, value in items:
+            self[key] = value
+        for key, value in kwargs.items():
+            self[key] = value
+
+    def __getstate__(self):
+        # the missing marker would not survive pickling
+        return self._schema, self.items()
+
+    def __setstate__(self, state):
+        self._schema, items = state
+        self._values = []
+        self.update(items)
+
+    def __eq__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return dict(self.items()) == dict(other.items())
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __getstate__(self):
+        return (self._schema, self._values)
+
+    def __setstate__(self, state):
+        self._schema, self._values = state
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+MutableMapping.register(SharedAttributes)
+
+
+class PersistentSequence(object):
+    '''
+    An immutable sequence where set, insert, append and delete return a new
+    sequence in O(log n), sharing all unchanged structure with the old one.
+
+    Stored as a height balanced tree of (left, item, right, size, height)
+    tuples ordered by position.
+    '''
+    __slots__ = ('_root',)
+
+    def __init__(self, items=()):
+        items = list(items)
+        self._root = _build(items, 0, len(items))
+
+    @classmethod
+    def _from_root(cls, root):
+        sequence = cls.__new__(cls)
+        sequence._root = root
+        return sequence
+
+    def __len__(self):
+        return _size(self._root)
+
+    def __getitem__(self, index):
+        index = self._index(index)
+        node = self._root
+        while True:
+            left_size = _size(node[0])
+            if index < left_size:
+                node = node[0]
+            elif index > left_size:
+                index -= left_size + 1
+                node = node[2]
+            else:
+                return node[1]
+
+    def __iter__(self):
+        stack = []
+        node = self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node[0]
+            node = stack.pop()
+            yield node[1]
+            node = node[2]
+
+    def set(self, index, item):
+        return self._from_root(_set(self._root, self._index(index), item))
+
+    def insert(self, index, item):
+        # like list.insert, indices past the end append
+        length = len(self)
+        if index < 0:
+            index = max(0, index + length)
+        return self._from_root(_insert(self._root, min(index, length), item))
+
+    def append(self, item):
+        return self._from_root(_insert(self._root, len(self), item))
+
+    def delete(self, index):
+        return self._from_root(_delete(self._root, self._index(index)))
+
+    def _index(self, index):
+        length = _size(self._root)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError('PersistentSequence index out of range')
+        return index
+
+    def __repr__(self):
+        return 'PersistentSequence(%r)' % list(self)
+
+
+def _size(node):
+    return node[3] if node is not None else 0
+
+
+def _height(node):
+    return node[4] if node is not None else 0
+
+
+def _node(left, item, right):
+    return (left, item, right, _size(left) + _size(right) + 1,
+            max(_height(left), _height(right)) + 1)
+
+
+def _balance(left, item, right):
+    left_height = _height(left)
+    right_height = _height(right)
+    if left_height > right_height + 1:
+        if _height(left[0]) >= _height(left[2]):
+            return _node(left[0], left[1], _node(left[2], item, right))
+        inner = left[2]
+        return _node(_node(left[0], left[1], inner[0]), inner[1], _node(inner[2], item, right))
+    if right_height > left_height + 1:
+        if _height(right[2]) >= _height(right[0]):
+            return _node(_node(left, item, right[0]), right[1], right[2])
+        inner = right[0]
+        return _node(_node(left, item, inner[0]), inner[1], _node(inner[2], right[1], right[2]))
+    return _node(left, item, right)
+
+
+def _build(items, start, end):
+    if start >= end:
+        return None
+    middle = (start + end) // 2
+    return _node(_build(items, start, middle), items[middle], _build(items, middle + 1, end))
+
+
+def _set(node, index, item):
+    left, current, right = node[0], node[1], node[2]
+    left_size = _size(left)
+    if index < left_size:
+        return (_set(left, index, item), current, right, node[3], node[4])
+    if index > left_size:
+        return (left, current, _set(right, index - left_size - 1, item), node[3], node[4])
+    return (left, item, right, node[3], node[4])
+
+
+def _insert(node, index, item):
+    if node is None:
+        return (None, item, None, 1, 1)
+    left, current, right = node[0], node[1], node[2]
+    left_size = _size(left)
+    if index <= left_size:
+        return _balance(_insert(left, index, item), current, right)
+    return _balance(left, current, _insert(right, index - left_size - 1, item))
+
+
+def _delete(node, index):
+    left, current, right = node[0], node[1], node[2]
+    left_size = _size(left)
+    if index < left_size:
+        return _balance(_delete(left, index), current, right)
+    if index > left_size:
+        return _balance(left, current, _delete(right, index - left_size - 1))
+    if left is None:
+        return right
+    if right is None:
+        return left
+    rest, first = _pop_first(right)
+    return _balance(left, first, rest)
+
+
+def _pop_first(node):
+    if node[0] is None:
+        return node[2], node[1]
+    rest, first = _pop_first(node[0])
+    return _balance(rest, node[1], node[2]), first
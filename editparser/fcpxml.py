@@ -0,0 +1,249 @@
+# Copyright (c) 2012, Sveinbjorn J. Tryggvason
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    Redistributions of source code must retain the above
+#    copyright notice, this list of conditions and the following disclaimer.
+#
+#    Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT,INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+'''
+Parser for Final Cut Pro 7 XML (xmeml) sequences. The file is read with
+iterparse and every clip item is dropped once it has been turned into an
+edit, so memory does not grow with the length of the timeline.
+
+Only the first sequence in the file is read. Record timecodes are the clip
+item start and end added to the sequence timecode, media timecodes the clip
+item in and out added to the source timecode of its file. Edits use the
+frame rate of the sequence when it has one, otherwise *base*.
+'''
+
+import os
+from xml.etree import ElementTree
+
+from . import EDL, TimeCode, Edit, ParserError
+
+
+def parse(edl_path, start_tc=None, base=25):
+    if not os.path.exists(edl_path):
+        raise IOError('Path does not exist: %s' % edl_path)
+
+    name, base, start_frame = read_sequence_info(edl_path, base)
+
+    if start_tc:
+        the_edl = EDL(name, edl_path, start_tc, base=base)
+    else:
+        the_edl = EDL(name, edl_path, TimeCode(frames=start_frame, base=base).tc(), base=base)
+
+    for current_edit in iter_edits(edl_path, base, the_edl.attribute_schema()):
+        the_edl.appendEdit(current_edit)
+
+    the_edl.check_edits()
+    return the_edl
+
+
+def read_sequence_info(edl_path, base=25):
+    '''
+    Returns the name, frame rate and start frame of the first sequence in
+    *edl_path*, reading only up to the start of its media. A sequence
+    without a name is named after the file.
+    '''
+    found = False
+    name = None
+    start_frame = 0
+    stack = []
+    for event, elem in ElementTree.iterparse(edl_path, events=('start', 'end')):
+        if event == 'start':
+            if elem.tag == 'sequence':
+                found = True
+            elif elem.tag == 'media' and stack and stack[-1].tag == 'sequence':
+                break
+            stack.append(elem)
+            continue
+
+        stack.pop()
+        parent = stack[-1].tag if stack else None
+        if parent == 'sequence':
+            if elem.tag == 'name':
+                name = (elem.text or '').strip()
+            elif elem.tag == 'rate':
+                base = _int(elem.findtext('timebase'), base)
+            elif elem.tag == 'timecode':
+                start_frame = _int(elem.findtext('frame'), 0)
+        elif elem.tag == 'sequence':
+            break
+
+    if not found:
+        raise ParserError('No sequence found in %s' % edl_path)
+    return name or os.path.basename(edl_path), base, start_frame
+
+
+def iter_edits(edl_path, base=25, schema=None):
+    '''
+    Lazily yields the edits of the first sequence in *edl_path*, video
+    tracks before audio tracks in file order. The attributes are stored in
+    *schema* if one is given. The edits are not checked, see
+    EDL.check_edits.
+    '''
+    if not os.path.exists(edl_path):
+        raise IOError('Path does not exist: %s' % edl_path)
+
+    stack = []
+    record_offset = 0
+    files = {}
+    media_type = None
+    track = 0
+    clip_depth = 0
+    number = 0
+    transition = None
+    track_end = 0
+    pending = None
+
+    for event, elem in ElementTree.iterparse(edl_path, events=('start', 'end')):
+        tag = elem.tag
+        if event == 'start':
+            if clip_depth == 0:
+                if tag in ('video', 'audio'):
+                    media_type = tag.upper()
+                    track = 0
+                elif tag == 'track':
+                    track += 1
+                    transition = None
+                    track_end = 0
+            if tag == 'clipitem':
+                clip_depth += 1
+            stack.append(elem)
+            continue
+
+        stack.pop()
+        parent = stack[-1] if stack else None
+        if clip_depth == 0 and parent is not None and parent.tag == 'sequence':
+            if tag == 'rate':
+                base = _int(elem.findtext('timebase'), base)
+            elif tag == 'timecode':
+                record_offset = _int(elem.findtext('frame'), 0)
+
+        if tag == 'clipitem':
+            clip_depth -= 1
+            if clip_depth:
+                continue
+            clip = _read_clipitem(elem, files)
+            parent.remove(elem)
+
+            if pending is not None:
+                # no transition followed, the clip ends where it starts
+                clip_before, attributes = pending
+                clip_before['end'] = track_end = clip_before['start']
+                yield _make_edit(clip_before, attributes, record_offset, base, schema)
+                pending = None
+
+            number += 1
+            if clip['start'] < 0:
+                if transition is not None:
+                    clip['start'] = transition[0]
+                    clip['transition'] = 'D'
+                    clip['duration'] = transition[1] - transition[0]
+                else:
+                    # no transition before it, it follows the previous clip
+                    clip['start'] = track_end
+            # only the clip right after a transition dissolves in
+            transition = None
+            attributes = _attributes(clip, number, media_type, track)
+            if clip['end'] < 0:
+                pending = (clip, attributes)
+            else:
+                track_end = clip['end']
+                yield _make_edit(clip, attributes, record_offset, base, schema)
+
+        elif tag == 'transitionitem' and clip_depth == 0:
+            transition = (_int(elem.findtext('start'), 0), _int(elem.findtext('end'), 0))
+            parent.remove(elem)
+            if pending is not None:
+                clip, attributes = pending
+                clip['end'] = track_end = transition[1]
+                yield _make_edit(clip, attributes, record_offset, base, schema)
+                pending = None
+
+        elif tag == 'track' and clip_depth == 0:
+            if pending is not None:
+                clip, attributes = pending
+                clip['end'] = clip['start']
+                yield _make_edit(clip, attributes, record_offset, base, schema)
+                pending = None
+            parent.remove(elem)
+
+        elif tag == 'sequence' and clip_depth == 0:
+            break
+
+
+def _read_clipitem(elem, files):
+    clip = {'name': elem.findtext('name'),
+            'enabled': elem.findtext('enabled', 'TRUE').strip().upper() != 'FALSE',
+            'start': _int(elem.findtext('start'), 0),
+            'end': _int(elem.findtext('end'), 0),
+            'in': _int(elem.findtext('in'), 0),
+            'out': _int(elem.findtext('out'), 0),
+            'transition': 'C',
+            'duration': 0}
+
+    # files are described once and referred to by id afterwards
+    file_elem = elem.find('file')
+    file_info = {'source_frame': 0, 'path': None, 'reel': None}
+    if file_elem is not None:
+        file_id = file_elem.get('id')
+        if len(file_elem):
+            file_info = {'source_frame': _int(file_elem.findtext('timecode/frame'), 0),
+                         'path': file_elem.findtext('pathurl'),
+                         'reel': file_elem.findtext('timecode/reel/name')}
+            if file_id is not None:
+                files[file_id] = file_info
+        else:
+            file_info = files.get(file_id, file_info)
+    clip.update(file_info)
+    return clip
+
+
+def _attributes(clip, number, media_type, track):
+    return {'number': number,
+            'tape': clip['reel'],
+            'channels': [media_type[0]] if media_type else [],
+            'transition': clip['transition'],
+            'duration': clip['duration'],
+            'from_clip_name': clip['name'],
+            'FileName': clip['path'],
+            'MediaType': media_type,
+            'Track': track,
+            'enabled': clip['enabled']}
+
+
+def _make_edit(clip, attributes, record_offset, base, schema):
+    source_frame = clip['source_frame']
+    edit = Edit.from_frames(source_frame + clip['in'], source_frame + clip['out'],
+                            record_offset + clip['start'], record_offset + clip['end'],
+                            base, attributes)
+    if schema is not None:
+        edit.use_schema(schema)
+    return edit
+
+
+def _int(text, default):
+    try:
+        return int(text.strip())
+    except (AttributeError, ValueError):
+        return default
@@ -0,0 +1,101 @@
+# Copyright (c) 2012, Sveinbjorn J. Tryggvason
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    Redistributions of source code must retain the above
+#    copyright notice, this list of conditions and the following disclaimer.
+#
+#    Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT,INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+'''
+Content fingerprints of edits and EDLs, for recognizing duplicate events
+and identical lists.
+'''
+
+import hashlib
+import json
+
+
+# attributes hashed along with the frames by default
+ATTRIBUTES = ('tape', 'channels', 'transition', 'duration', 'from_clip_name', 'to_clip_name',
+              'FileName', 'Track', 'MediaType', 'Stream')
+
+
+def edit_digest(edit, attributes=None):
+    '''
+    Returns the sha1 digest of the frames, base and *attributes* of *edit*.
+    The digest over the default ATTRIBUTES is cached on the edit until its
+    timecodes are replaced or Edit.set is called.
+    '''
+    edit._sync()
+    if attributes is not None:
+        return _digest(edit, attributes)
+
+    timecodes = (edit._mediaIn, edit._mediaOut, edit._globalIn, edit._globalOut)
+    cached = edit._digest
+    if cached is not None and all(a is b for a, b in zip(cached[0], timecodes)):
+        return cached[1]
+
+    digest = _digest(edit, ATTRIBUTES)
+    edit._digest = (timecodes, digest)
+    return digest
+
+
+class Fingerprinter(object):
+    '''
+    Combines the digests of a sequence of edits into one fingerprint, one
+    edit at a time, so lists can be fingerprinted while they are parsed.
+    '''
+
+    def __init__(self, attributes=None):
+        self._attributes = attributes
+        self._hash = hashlib.sha1()
+        self._count = 0
+
+    def add(self, edit):
+        '''
+        Adds the next *edit* and returns its digest.
+        '''
+        digest = edit_digest(edit, self._attributes)
+        self._hash.update(digest)
+        self._count += 1
+        return digest
+
+    def watch(self, edits):
+        '''
+        Passes *edits* on unchanged while adding each of them.
+        '''
+        for edit in edits:
+            self.add(edit)
+            yield edit
+
+    def count(self):
+        return self._count
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+
+def _digest(edit, attributes):
+    content = [edit._mediaIn._base,
+               edit._mediaIn._frames, edit._mediaOut._frames,
+               edit._globalIn._frames, edit._globalOut._frames,
+               [[key, edit.get(key)] for key in sorted(attributes)]]
+    serialized = json.dumps(content, separators=(',', ':'), default=repr)
+    return hashlib.sha1(serialized.encode('utf-8')).digest()
@@ -0,0 +1,299 @@
+# Copyright (c) 2012, Sveinbjorn J. Tryggvason
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    Redistributions of source code must retain the above
+#    copyright notice, this list of conditions and the following disclaimer.
+#
+#    Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT,INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+'''
+SQLite backed index of parsed EDL files, used to search an archive of EDLs
+without re-parsing them.
+'''
+
+import hashlib
+import json
+import os
+import sqlite3
+
+from . import parse, Edit, TimeCode
+
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS edls (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    title TEXT,
+    format TEXT,
+    base INTEGER,
+    start_frame INTEGER,
+    mtime REAL,
+    digest TEXT
+);
+CREATE TABLE IF NOT EXISTS edits (
+    id INTEGER PRIMARY KEY,
+    edl_id INTEGER NOT NULL REFERENCES edls(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    number INTEGER,
+    tape TEXT,
+    clip_name TEXT,
+    base INTEGER,
+    media_in INTEGER,
+    media_out INTEGER,
+    global_in INTEGER,
+    global_out INTEGER
+);
+CREATE TABLE IF NOT EXISTS attributes (
+    edit_id INTEGER NOT NULL REFERENCES edits(id) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS edits_edl ON edits (edl_id, position);
+CREATE INDEX IF NOT EXISTS edits_tape ON edits (tape, media_in, media_out);
+CREATE INDEX IF NOT EXISTS edits_global ON edits (global_in, global_out);
+CREATE INDEX IF NOT EXISTS edits_clip_name ON edits (clip_name);
+CREATE INDEX IF NOT EXISTS attributes_edit ON attributes (edit_id);
+CREATE INDEX IF NOT EXISTS attributes_key_value ON attributes (key, value);
+'''
+
+
+def file_digest(path, block_size=1 << 16):
+    '''
+    Returns the sha1 hex digest of the contents of *path*.
+    '''
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ArchiveIndex(object):
+    '''
+    Index of EDL files stored in the SQLite database at *db_path*.
+
+    Files are only re-parsed when their modification time and contents
+    have changed since they were last ingested.
+    '''
+
+    def __init__(self, db_path=':memory:'):
+        self._db_path = db_path
+        self._conn = sqlite3.connect(db_path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA foreign_keys = ON')
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def ingest(self, edl_path, format='cmx3600', base=25, start_tc=None, force=False):
+        '''
+        Parses *edl_path* and stores it in the index, unless the file is
+        unchanged since the last ingest. Returns True if the file was
+        (re-)indexed.
+        '''
+        edl_path = os.path.abspath(edl_path)
+        mtime = os.path.getmtime(edl_path)
+
+        row = self._conn.execute('SELECT id, mtime, digest FROM edls WHERE path = ?',
+                                 (edl_path,)).fetchone()
+        if row is not None and not force:
+            if row['mtime'] == mtime:
+                return False
+            digest = file_digest(edl_path)
+            if row['digest'] == digest:
+                # touched but not modified
+                with self._conn:
+                    self._conn.execute('UPDATE edls SET mtime = ? WHERE id = ?', (mtime, row['id']))
+                return False
+        else:
+            digest = file_digest(edl_path)
+
+        edl = parse(edl_path, start_tc, format=format, base=base)
+        self.ingest_edl(edl, format=format, mtime=mtime, digest=digest)
+        return True
+
+    def ingest_directory(self, directory, format='cmx3600', base=25, extensions=('.edl',)):
+        '''
+        Ingests every file below *directory* ending in one of *extensions*.
+        Returns the list of paths that were (re-)indexed.
+        '''
+        extensions = tuple(ext.lower() for ext in extensions)
+        ingested = []
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            for name in sorted(files):
+                if not name.lower().endswith(extensions):
+                    continue
+                path = os.path.join(root, name)
+                if self.ingest(path, format=format, base=base):
+                    ingested.append(os.path.abspath(path))
+        return ingested
+
+    def ingest_edl(self, edl, format=None, mtime=None, digest=None):
+        '''
+        Stores an already parsed *edl*, replacing any previous entry for
+        its path, stored as an absolute path like in ingest.
+        '''
+        edl_path = os.path.abspath(edl.path())
+        start_tc = edl.start_tc()
+        with self._conn:
+            self._conn.execute('DELETE FROM edls WHERE path = ?', (edl_path,))
+            cursor = self._conn.execute(
+                'INSERT INTO edls (path, title, format, base, start_frame, mtime, digest) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (edl_path, edl.title(), format, start_tc.base(), start_tc.frames(), mtime, digest))
+            edl_id = cursor.lastrowid
+
+            for position, edit in enumerate(edl.getAllEdits()):
+                cursor = self._conn.execute(
+                    'INSERT INTO edits (edl_id, position, number, tape, clip_name, base, '
+                    'media_in, media_out, global_in, global_out) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (edl_id, position, edit.get('number', edit.get('ID')),
+                     _edit_tape(edit), _edit_clip_name(edit), edit.mediaIn().base(),
+                     edit.mediaIn().frames(), edit.mediaOut().frames(),
+                     edit.globalIn().frames(), edit.globalOut().frames()))
+                edit_id = cursor.lastrowid
+                self._conn.executemany(
+                    'INSERT INTO attributes (edit_id, key, value) VALUES (?, ?, ?)',
+                    [(edit_id, k, json.dumps(v)) for k, v in edit.attributes().items()])
+        return edl_id
+
+    def remove(self, edl_path):
+        with self._conn:
+            self._conn.execute('DELETE FROM edls WHERE path = ?', (os.path.abspath(edl_path),))
+
+    def paths(self):
+        return [row['path'] for row in self._conn.execute('SELECT path FROM edls ORDER BY path')]
+
+    def find_rows(self, tape=None, start=None, end=None, clip_name=None, path=None,
+                  record_start=None, record_end=None):
+        '''
+        Returns the indexed edit rows matching all given criteria.
+
+        *start* and *end* limit the media (source) range and *record_start*
+        and *record_end* the record range; edits overlapping the range are
+        returned. They can be TimeCode objects, timecode strings or frame
+        counts. Strings are interpreted in the base of every indexed EDL,
+        TimeCode objects only match EDLs of their own base.
+        '''
+        clauses = []
+        params = []
+
+        if tape is not None:
+            clauses.append('edits.tape = ?')
+            params.append(tape)
+        if clip_name is not None:
+            clauses.append('edits.clip_name = ?')
+            params.append(clip_name)
+        if path is not None:
+            clauses.append('edls.path = ?')
+            params.append(os.path.abspath(path))
+
+        for column_in, column_out, range_start, range_end in (
+                ('media_in', 'media_out', start, end),
+                ('global_in', 'global_out', record_start, record_end)):
+            if range_start is None and range_end is None:
+                continue
+            per_base = []
+            for base in self._bases(range_start, range_end):
+                terms = []
+                if base is not None:
+                    terms.append('edits.base = ?')
+                    params.append(base)
+                if range_end is not None:
+                    terms.append('edits.%s < ?' % column_in)
+                    params.append(_to_frames(range_end, base))
+                if range_start is not None:
+                    terms.append('edits.%s > ?' % column_out)
+                    params.append(_to_frames(range_start, base))
+                per_base.append('(%s)' % ' AND '.join(terms))
+            if not per_base:
+                return []
+            clauses.append('(%s)' % ' OR '.join(per_base))
+
+        query = ('SELECT edits.*, edls.path AS path, edls.title AS title '
+                 'FROM edits JOIN edls ON edls.id = edits.edl_id')
+        if clauses:
+            query += ' WHERE ' + ' AND '.join(clauses)
+        query += ' ORDER BY edls.path, edits.position'
+
+        return self._conn.execute(query, params).fetchall()
+
+    def find_edits(self, **kwargs):
+        '''
+        Same as find_rows but returns a list of (path, Edit) tuples with the
+        edits rebuilt from the index.
+        '''
+        return [(row['path'], self.edit_from_row(row)) for row in self.find_rows(**kwargs)]
+
+    def edit_from_row(self, row):
+        base = row['base']
+        attributes = {}
+        for attr in self._conn.execute('SELECT key, value FROM attributes WHERE edit_id = ?',
+                                       (row['id'],)):
+            attributes[str(attr['key'])] = json.loads(attr['value'])
+
+        return Edit(TimeCode(frames=row['media_in'], base=base),
+                    TimeCode(frames=row['media_out'], base=base),
+                    TimeCode(frames=row['global_in'], base=base),
+                    TimeCode(frames=row['global_out'], base=base),
+                    **attributes)
+
+    def _bases(self, *values):
+        # TimeCode objects carry their base, anything else matches every base
+        for value in values:
+            if isinstance(value, TimeCode):
+                return [value.base()]
+        if all(value is None or isinstance(value, (int, long)) for value in values):
+            return [None]
+        return [row[0] for row in self._conn.execute('SELECT DISTINCT base FROM edits')]
+
+
+def _to_frames(value, base):
+    if isinstance(value, TimeCode):
+        return value.frames()
+    if isinstance(value, basestring):
+        return TimeCode(value, base=base).frames()
+    return value
+
+
+def _edit_tape(edit):
+    tape = edit.get('tape')
+    if tape is None:
+        tape = edit.get('FileName')
+    return tape
+
+
+def _edit_clip_name(edit):
+    clip_name = edit.get('from_clip_name')
+    if clip_name is None:
+        clip_name = edit.get('to_clip_name')
+    return clip_name
@@ -0,0 +1,194 @@
+# Copyright (c) 2012, Sveinbjorn J. Tryggvason
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    Redistributions of source code must retain the above
+#    copyright notice, this list of conditions and the following disclaimer.
+#
+#    Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT,INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+'''
+Resolving the media references of edits, file names and clip names, to
+files below local media roots.
+'''
+
+import json
+import os
+import posixpath
+
+from .pipeline import edits_of, _copy
+
+
+# attributes tried in order to find the media of an edit
+REFERENCES = ('FileName', 'from_clip_name', 'to_clip_name', 'tape')
+
+_CACHE_VERSION = 1
+
+
+def normalize_reference(reference, case_sensitive=False):
+    '''
+    Returns *reference* as a POSIX style path: backslashes become slashes
+    and a Windows drive letter is dropped. Case is folded unless
+    *case_sensitive*.
+    '''
+    reference = reference.strip().replace('\\', '/')
+    if len(reference) > 1 and reference[1] == ':':
+        reference = reference[2:]
+    if not case_sensitive:
+        reference = reference.lower()
+    return reference
+
+
+class MediaIndex(object):
+    '''
+    Index of the files below *roots* by name and by name without extension.
+    With *cache_path* the file list is stored on disk and reused as long as
+    no directory below the roots has changed.
+    '''
+
+    def __init__(self, roots, cache_path=None, case_sensitive=False):
+        self._roots = [os.path.abspath(root) for root in roots]
+        self._cache_path = cache_path
+        self._case_sensitive = case_sensitive
+        self._by_name = {}
+        self._by_stem = {}
+
+        files = self._load_cache()
+        if files is None:
+            files, directories = self._scan()
+            self._save_cache(files, directories)
+        for path in files:
+            self._add(path)
+
+    def _normalize(self, reference):
+        return normalize_reference(reference, self._case_sensitive)
+
+    def _add(self, path):
+        name = self._normalize(os.path.basename(path))
+        self._by_name.setdefault(name, []).append(path)
+        self._by_stem.setdefault(os.path.splitext(name)[0], []).append(path)
+
+    def _scan(self):
+        files = []
+        directories = {}
+        for root in self._roots:
+            for directory, dirs, names in os.walk(root):
+                dirs.sort()
+                directories[directory] = os.path.getmtime(directory)
+                for name in sorted(names):
+                    files.append(os.path.join(directory, name))
+        return files, directories
+
+    def _load_cache(self):
+        if self._cache_path is None or not os.path.exists(self._cache_path):
+            return None
+        try:
+            with open(self._cache_path, 'rb') as f:
+                cache = json.load(f)
+        except ValueError:
+            return None
+        if (cache.get('version') != _CACHE_VERSION or cache.get('roots') != self._roots or
+                cache.get('case_sensitive') != self._case_sensitive):
+            return None
+
+        # a new, removed or renamed file changes the mtime of its directory
+        for directory, mtime in cache['directories'].items():
+            try:
+                if os.path.getmtime(directory) != mtime:
+                    return None
+            except OSError:
+                return None
+        return cache['files']
+
+    def _save_cache(self, files, directories):
+        if self._cache_path is None:
+            return
+        cache = {'version': _CACHE_VERSION, 'roots': self._roots,
+                 'case_sensitive': self._case_sensitive,
+                 'directories': directories, 'files': files}
+        with open(self._cache_path, 'wb') as f:
+            json.dump(cache, f)
+
+    def resolve(self, reference):
+        '''
+        Returns the indexed file matching *reference*, a path or a clip
+        name, or None. References are matched by file name, then by file
+        name without extension, then, for references with a file extension,
+        by file name with another extension. When several files match, the
+        one sharing
+        the most trailing directories with the reference wins, then the
+        one closest to its root.
+        '''
+        if not reference or not isinstance(reference, basestring):
+            return None
+        reference = self._normalize(reference)
+        name = posixpath.basename(reference)
+        if not name:
+            return None
+
+        candidates = self._by_name.get(name) or self._by_stem.get(name)
+        if not candidates:
+            # a clip name like 7-2B.NEW.01 has no extension to swap
+            stem, extension = posixpath.splitext(name)
+            if _is_extension(extension):
+                candidates = self._by_stem.get(stem)
+        if not candidates:
+            return None
+        if len(candidates) == 1:
+            return candidates[0]
+
+        parts = reference.split('/')[:-1]
+        return max(candidates, key=lambda path: (self._shared_parents(parts, path), -path.count(os.sep)))
+
+    def _shared_parents(self, parts, path):
+        candidate_parts = self._normalize(os.path.dirname(path)).split('/')
+        shared = 0
+        while (shared < len(parts) and shared < len(candidate_parts) and
+               parts[-1 - shared] == candidate_parts[-1 - shared]):
+            shared += 1
+        return shared
+
+
+def relink(source, roots, attribute='media_path', references=REFERENCES, cache_path=None,
+           case_sensitive=False):
+    '''
+    Lazily yields copies of the edits of *source*, an EDL or any iterable
+    of edits, with *attribute* set to the file below *roots* that the
+    first resolvable of their *references* attributes points to. Edits
+    whose media is not found are passed on unchanged. *roots* can also be
+    a MediaIndex.
+    '''
+    if isinstance(roots, MediaIndex):
+        index = roots
+    else:
+        index = MediaIndex(roots, cache_path, case_sensitive)
+
+    for edit in edits_of(source):
+        for reference in references:
+            path = index.resolve(edit.get(reference))
+            if path is not None:
+                edit = _copy(edit, attributes={attribute: path})
+                break
+        yield edit
+
+
+def _is_extension(extension):
+    # a short suffix with a letter in it, not a take or version number
+    extension = extension[1:]
+    return 0 < len(extension) <= 5 and extension.isalnum() and not extension.isdigit()
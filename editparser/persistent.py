@@ -0,0 +1,243 @@
+# Copyright (c) 2012, Sveinbjorn J. Tryggvason
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    Redistributions of source code must retain the above
+#    copyright notice, this list of conditions and the following disclaimer.
+#
+#    Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT,INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+'''
+Immutable EDL versions for undo histories and variants. Every change
+returns a new PersistentEDL in O(log n) that shares all unchanged edits
+and structure with the version it was made from, so keeping many versions
+costs little more than keeping one.
+'''
+
+from . import EDL, Edit, EditError, TimeCode, Transition
+from .containers import PersistentSequence
+
+
+class FrozenEdit(Edit):
+    '''
+    An Edit that can not be changed in place. Use replace to get a changed
+    copy. List values such as the channels are stored as tuples and
+    attributes returns a copy.
+    '''
+
+    @classmethod
+    def freeze(cls, edit):
+        '''
+        Returns *edit* if it is frozen, otherwise a frozen copy of it.
+        '''
+        if isinstance(edit, FrozenEdit):
+            return edit
+        edit._sync()
+        return cls.from_timecodes(edit._mediaIn, edit._mediaOut, edit._globalIn, edit._globalOut,
+                                  _freeze_attributes(edit.attributes()))
+
+    def thaw(self):
+        '''
+        Returns a mutable Edit copy of this edit, with lists for the tuple
+        values.
+        '''
+        return Edit.from_timecodes(self._mediaIn, self._mediaOut, self._globalIn, self._globalOut,
+                                   _thaw_attributes(self._attributes))
+
+    def replace(self, mediaIn=None, mediaOut=None, globalIn=None, globalOut=None, **attributes):
+        '''
+        Returns a copy of this edit with the given timecodes and attributes
+        replaced, checked like a new Edit.
+        '''
+        new_attributes = dict(self._attributes)
+        new_attributes.update(_freeze_attributes(attributes))
+        return FrozenEdit(mediaIn if mediaIn is not None else self._mediaIn,
+                          mediaOut if mediaOut is not None else self._mediaOut,
+                          globalIn if globalIn is not None else self._globalIn,
+                          globalOut if globalOut is not None else self._globalOut,
+                          **new_attributes)
+
+    def attributes(self):
+        return dict(self._attributes)
+
+    def _frozen(self, *args):
+        raise EditError('FrozenEdit can not be changed, use replace()')
+
+    setMediaIn = setMediaOut = setGlobalIn = setGlobalOut = set = use_schema = _frozen
+
+
+class PersistentEDL(object):
+    '''
+    An immutable EDL. The methods changing the edits return a new version
+    and leave this one untouched. Transitions follow their edits when those
+    are replaced and are dropped with them.
+    '''
+
+    def __init__(self, title, path, startTimeCode='01:00:00:00', base=25, edits=(), transitions=()):
+        self._title = title
+        self._edlPath = path
+        self.startTC = TimeCode(startTimeCode, base=base)
+        frozen = {}
+        self._edits = PersistentSequence(frozen.setdefault(id(edit), FrozenEdit.freeze(edit))
+                                         for edit in edits)
+        self._transitions = _map_transitions(transitions, frozen)
+
+    @classmethod
+    def from_edl(cls, edl):
+        '''
+        Returns a PersistentEDL with frozen copies of the edits and the
+        transitions of *edl*.
+        '''
+        return cls(edl.title(), edl.path(), edl.start_tc().tc(), edl.start_tc().base(),
+                   edl.getAllEdits(), edl.getAllTransitions())
+
+    def to_edl(self):
+        '''
+        Returns a mutable EDL with copies of the edits and the transitions of
+        this version.
+        '''
+        the_edl = EDL(self._title, self._edlPath, self.startTC.tc(), base=self.startTC.base())
+        thawed = {}
+        for edit in self._edits:
+            thawed[id(edit)] = edit.thaw()
+            the_edl.appendEdit(thawed[id(edit)])
+        for transition in _map_transitions(self._transitions, thawed):
+            the_edl.appendTransition(transition)
+        return the_edl
+
+    def _evolve(self, edits, old=None, new=None):
+        # the transitions of *old* move to *new*, or are dropped without one
+        version = PersistentEDL.__new__(PersistentEDL)
+        version._title = self._title
+        version._edlPath = self._edlPath
+        version.startTC = self.startTC
+        version._edits = edits
+        version._transitions = self._transitions
+        if old is not None and old is not new:
+            if new is None:
+                version._transitions = tuple(transition for transition in self._transitions
+                                             if transition._outgoing is not old and
+                                             transition._incoming is not old)
+            else:
+                version._transitions = _map_transitions(self._transitions, {id(old): new})
+        return version
+
+    def title(self):
+        return self._title
+
+    def path(self):
+        return self._edlPath
+
+    def start_tc(self):
+        return self.startTC
+
+    def getAllEdits(self):
+        return list(self._edits)
+
+    def getAllTransitions(self):
+        return list(self._transitions)
+
+    def getEdit(self, index):
+        return self._edits[index]
+
+    def __len__(self):
+        return len(self._edits)
+
+    def __iter__(self):
+        return iter(self._edits)
+
+    def appendEdit(self, edit):
+        return self._evolve(self._edits.append(FrozenEdit.freeze(edit)))
+
+    def insertEdit(self, index, edit):
+        return self._evolve(self._edits.insert(index, FrozenEdit.freeze(edit)))
+
+    def replaceEdit(self, index, edit):
+        edit = FrozenEdit.freeze(edit)
+        return self._evolve(self._edits.set(index, edit), self._edits[index], edit)
+
+    def updateEdit(self, index, **changes):
+        '''
+        Returns a version where the edit at *index* has the given timecodes
+        and attributes changed, see FrozenEdit.replace.
+        '''
+        edit = self._edits[index].replace(**changes)
+        return self._evolve(self._edits.set(index, edit), self._edits[index], edit)
+
+    def deleteEdit(self, index):
+        return self._evolve(self._edits.delete(index), self._edits[index])
+
+
+class History(object):
+    '''
+    Undo and redo over the versions of a PersistentEDL. Committing a new
+    version drops the versions that could be redone.
+    '''
+
+    def __init__(self, edl):
+        if isinstance(edl, EDL):
+            edl = PersistentEDL.from_edl(edl)
+        self._versions = [edl]
+        self._position = 0
+
+    def current(self):
+        return self._versions[self._position]
+
+    def commit(self, edl):
+        del self._versions[self._position + 1:]
+        self._versions.append(edl)
+        self._position += 1
+        return edl
+
+    def can_undo(self):
+        return self._position > 0
+
+    def can_redo(self):
+        return self._position < len(self._versions) - 1
+
+    def undo(self):
+        if not self.can_undo():
+            raise EditError('Nothing to undo')
+        self._position -= 1
+        return self.current()
+
+    def redo(self):
+        if not self.can_redo():
+            raise EditError('Nothing to redo')
+        self._position += 1
+        return self.current()
+
+
+def _map_transitions(transitions, edits):
+    # copies *transitions* with their edits looked up by id in *edits*
+    return tuple(Transition(transition._kind, transition._duration,
+                            edits.get(id(transition._outgoing), transition._outgoing),
+                            edits.get(id(transition._incoming), transition._incoming))
+                 for transition in transitions)
+
+
+def _freeze_attributes(attributes):
+    # list values like the CMX channels must not be shared with mutable edits
+    return dict((key, tuple(value) if isinstance(value, list) else value)
+                for key, value in attributes.items())
+
+
+def _thaw_attributes(attributes):
+    return dict((key, list(value) if isinstance(value, tuple) else value)
+                for key, value in attributes.items())
@@ -0,0 +1,326 @@
+# Copyright (c) 2012, Sveinbjorn J. Tryggvason
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    Redistributions of source code must retain the above
+#    copyright notice, this list of conditions and the following disclaimer.
+#
+#    Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT,INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+'''
+Lazy stages for processing a stream of edits one at a time. Every stage
+takes an edit source (an EDL, a list of edits or another stage, including
+editparser.iter_edits) and yields new Edit objects, so stages can be
+chained without building intermediate EDLs:
+
+    edits = iter_edits('reel1.edl')
+    edits = filter(edits, tape='L30107')
+    edits = offset(edits, TimeCode('-00:59:00:00', base=25))
+    sink(renumber(edits), the_edl.appendEdit)
+'''
+
+import heapq
+
+from . import EDL, Edit, EditError, TimeCode, rebase_edit_frames
+
+
+def edits_of(source):
+    '''
+    Returns an iterator over the edits of *source*, an EDL or any iterable
+    of edits.
+    '''
+    if isinstance(source, EDL):
+        return iter(source.getAllEdits())
+    return iter(source)
+
+
+def compose(source, *stages):
+    '''
+    Feeds *source* through *stages*, functions taking an edit stream as
+    their only argument, and returns the resulting stream.
+    '''
+    edits = edits_of(source)
+    for stage in stages:
+        edits = stage(edits)
+    return edits
+
+
+def filter(source, predicate=None, **attributes):
+    '''
+    Passes on the edits for which *predicate* returns True and whose
+    *attributes* match. An attribute value can be a function to call with
+    the edit's value; a list valued attribute, like the CMX 'channels',
+    matches when it contains the given value.
+    '''
+    for edit in edits_of(source):
+        if predicate is not None and not predicate(edit):
+            continue
+        if all(_matches(edit.get(key), expected) for key, expected in attributes.items()):
+            yield edit
+
+
+def offset(source, delta):
+    '''
+    Moves the record in and out of every edit by *delta*, a frame count or
+    a TimeCode. To move an EDL to a new start use the difference between
+    the new start and EDL.start_tc().
+    '''
+    if isinstance(delta, TimeCode):
+        delta = delta.frames()
+    for edit in edits_of(source):
+        base = edit.globalIn().base()
+        yield _copy(edit, edit.mediaIn().frames(), edit.mediaOut().frames(),
+                    edit.globalIn().frames() + delta, edit.globalOut().frames() + delta, base)
+
+
+def rebase(source, new_base, rounding='nearest'):
+    '''
+    Converts every edit to the frame rate *new_base*, see
+    editparser.rebase_edit_frames.
+    '''
+    for edit in edits_of(source):
+        base = edit.globalIn().base()
+        frames = (edit.mediaIn().frames(), edit.mediaOut().frames(),
+                  edit.globalIn().frames(), edit.globalOut().frames())
+        media_in, media_out, global_in, global_out = rebase_edit_frames(frames, base, new_base, rounding)
+        yield _copy(edit, media_in, media_out, global_in, global_out, new_base)
+
+
+def renumber(source, start=1, attribute='number'):
+    '''
+    Numbers the edits from *start*. Consecutive edits that shared a number,
+    like the two events of a CMX dissolve, keep sharing their new number.
+    Numbers given as strings of digits stay strings of the same width.
+    '''
+    number = start - 1
+    previous = object()
+    for edit in edits_of(source):
+        original = edit.get(attribute)
+        if original is None or original != previous:
+            number += 1
+        previous = original
+        yield _copy(edit, attributes={attribute: _format_number(number, original)})
+
+
+def merge(sources, offsets=None):
+    '''
+    Merges *sources*, each ordered by record in, into one stream ordered by
+    record in, reading one edit ahead per source; EDLs are read in record
+    order. *offsets* moves the record frames of each source, see offset;
+    it is a list with one frame count or TimeCode per source or a
+    dictionary from source index to offset. Edits with the same record in
+    come out in the order of their sources.
+    '''
+    streams = []
+    for index, source in enumerate(sources):
+        delta = None
+        if isinstance(offsets, dict):
+            delta = offsets.get(index)
+        elif offsets is not None:
+            delta = offsets[index]
+        if isinstance(source, EDL) and not _record_ordered(source.getAllEdits()):
+            edits = source.edits_in_range()
+        else:
+            edits = edits_of(source)
+        if delta:
+            edits = offset(edits, delta)
+        streams.append(edits)
+
+    heap = []
+    for index, edits in enumerate(streams):
+        for edit in edits:
+            heap.append((edit.globalIn().frames(), index, edit))
+            break
+    heapq.heapify(heap)
+
+    while heap:
+        record_in, index, edit = heap[0]
+        yield edit
+        for next_edit in streams[index]:
+            next_in = next_edit.globalIn().frames()
+            if next_in < record_in:
+                raise EditError('Source %d is not ordered by record in at %s' %
+                                (index, next_edit.globalIn()))
+            heapq.heapreplace(heap, (next_in, index, next_edit))
+            break
+        else:
+            heapq.heappop(heap)
+
+
+# attributes that must match for two events to show the same source
+SOURCE_ATTRIBUTES = ('tape', 'channels', 'FileName', 'Stream', 'Track', 'MediaType', 'PlayRate')
+
+# Vegas durations, summed when events are merged
+_SUMMED_ATTRIBUTES = ('Length', 'StreamLength')
+
+# comment lines and clip names, collected from all merged events
+COMMENT_ATTRIBUTES = ('comment', 'from_clip_name', 'to_clip_name', 'loc', 'source_file')
+
+
+def consolidate(source, callback=None):
+    '''
+    Merges through-edits: runs of consecutive cuts from the same source
+    whose media and record times both continue where the previous event
+    ended. A merged edit keeps the attributes of the first event of its
+    run, including its number, and gains the attributes only later events
+    have. The values of the COMMENT_ATTRIBUTES are collected instead: a
+    value shared by all events stays as it is, differing values become a
+    list in event order. The outgoing event of a dissolve or wipe is never
+    merged away.
+
+    *callback* is called with every edit passed on and the list of source
+    edits it replaces.
+    '''
+    run = []
+    for edit in edits_of(source):
+        if run and _continues(run[-1], edit):
+            run.append(edit)
+            continue
+
+        if (len(run) > 1 and edit.get('transition') not in (None, 'C') and
+                edit.get('number') == run[-1].get('number')):
+            # the last event is the outgoing side of this transition
+            for merged, originals in ((_merge(run[:-1]), run[:-1]), (run[-1], run[-1:])):
+                if callback is not None:
+                    callback(merged, originals)
+                yield merged
+        elif run:
+            merged = _merge(run)
+            if callback is not None:
+                callback(merged, run)
+            yield merged
+        run = [edit]
+
+    if run:
+        merged = _merge(run)
+        if callback is not None:
+            callback(merged, run)
+        yield merged
+
+
+def map_attributes(source, function=None, **functions):
+    '''
+    Replaces the attributes of every edit with the dictionary *function*
+    returns for them, and the value of each attribute named in *functions*
+    with what its function returns for the old value.
+    '''
+    for edit in edits_of(source):
+        attributes = dict(edit.attributes())
+        if function is not None:
+            attributes = function(attributes)
+        for key, key_function in functions.items():
+            attributes[key] = key_function(attributes.get(key))
+        yield _copy(edit, replace_attributes=attributes)
+
+
+def sink(source, target):
+    '''
+    Consumes the stream, handing every edit to *target*: an EDL to append
+    the edits to or a function to call with each edit. Returns the number
+    of edits consumed.
+    '''
+    if isinstance(target, EDL):
+        target = target.appendEdit
+    count = 0
+    for edit in edits_of(source):
+        target(edit)
+        count += 1
+    return count
+
+
+def _record_ordered(edits):
+    # most lists are, and then need no record ordered copy
+    for i in xrange(1, len(edits)):
+        if edits[i]._globalIn._frames < edits[i - 1]._globalIn._frames:
+            return False
+    return True
+
+
+def _continues(previous, edit):
+    if edit.get('transition') not in (None, 'C'):
+        return False
+    if previous.get('tape') is None and previous.get('FileName') is None:
+        return False
+    if (previous._mediaOut._frames != edit._mediaIn._frames or
+            previous._globalOut._frames != edit._globalIn._frames or
+            previous._globalOut._base != edit._globalIn._base):
+        return False
+    return all(previous.get(key) == edit.get(key) for key in SOURCE_ATTRIBUTES)
+
+
+def _merge(run):
+    first = run[0]
+    if len(run) == 1:
+        return first
+    last = run[-1]
+
+    attributes = {}
+    for edit in reversed(run):
+        attributes.update(edit.attributes())
+    for key in _SUMMED_ATTRIBUTES:
+        if key in attributes:
+            attributes[key] = sum(edit.get(key, 0) for edit in run)
+    for key in COMMENT_ATTRIBUTES:
+        values = []
+        for edit in run:
+            value = edit.get(key)
+            for value in (value if isinstance(value, list) else [value]):
+                if value is not None and value not in values:
+                    values.append(value)
+        if len(values) > 1:
+            attributes[key] = values
+
+    base = first.globalIn().base()
+    return _copy(first, first.mediaIn().frames(), last.mediaOut().frames(),
+                 first.globalIn().frames(), last.globalOut().frames(), base,
+                 replace_attributes=attributes)
+
+
+def _format_number(number, original):
+    if isinstance(original, basestring) and original.isdigit():
+        return str(number).zfill(len(original))
+    return number
+
+
+def _matches(value, expected):
+    if callable(expected):
+        return expected(value)
+    if isinstance(value, (list, tuple)) and not isinstance(expected, (list, tuple)):
+        return expected in value
+    return value == expected
+
+
+def _copy(edit, media_in=None, media_out=None, global_in=None, global_out=None, base=None,
+          attributes=None, replace_attributes=None):
+    if base is None:
+        base = edit.globalIn().base()
+    if media_in is None:
+        media_in, media_out = edit.mediaIn().frames(), edit.mediaOut().frames()
+        global_in, global_out = edit.globalIn().frames(), edit.globalOut().frames()
+
+    if replace_attributes is not None:
+        new_attributes = replace_attributes
+    else:
+        new_attributes = dict(edit.attributes())
+    if attributes is not None:
+        new_attributes.update(attributes)
+
+    return Edit(TimeCode(frames=media_in, base=base), TimeCode(frames=media_out, base=base),
+                TimeCode(frames=global_in, base=base), TimeCode(frames=global_out, base=base),
+                **new_attributes)
@@ -0,0 +1,225 @@
+# Copyright (c) 2012, Sveinbjorn J. Tryggvason
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    Redistributions of source code must retain the above
+#    copyright notice, this list of conditions and the following disclaimer.
+#
+#    Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT,INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+'''
+Frame ranges and sets of frame ranges, for coverage questions like how much
+of a tape an EDL uses or which parts of the record have no picture.
+'''
+
+from array import array
+from bisect import bisect_right
+
+from . import TimeCode, TimeCodeError
+
+
+class TimeRange(object):
+    '''
+    The half open frame range from *start* up to but not including *end*,
+    given as TimeCodes or as frame counts in *base*. Accepts the tuples of
+    Edit.mediaInOut() and Edit.globalInOut() as TimeRange(*tuple).
+    '''
+
+    def __init__(self, start, end, base=25):
+        if isinstance(start, TimeCode):
+            base = start.base()
+            start = start.frames()
+        if isinstance(end, TimeCode):
+            if end.base() != base:
+                raise TimeCodeError('Cannot make a range of TimeCode objects with different bases!')
+            end = end.frames()
+        if start > end:
+            raise TimeCodeError('Range start cannot be after its end!')
+        self._start = start
+        self._end = end
+        self._base = base
+
+    def start(self):
+        return TimeCode(frames=self._start, base=self._base)
+
+    def end(self):
+        return TimeCode(frames=self._end, base=self._base)
+
+    def frames(self):
+        return (self._start, self._end)
+
+    def base(self):
+        return self._base
+
+    def duration(self):
+        return self._end - self._start
+
+    def __eq__(self, other):
+        return (isinstance(other, TimeRange) and self._base == other._base and
+                self.frames() == other.frames())
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        return '<TimeRange:%s-%s>' % (self.start(), self.end())
+
+
+class RangeSet(object):
+    '''
+    A set of frames in *base*, stored as a sorted array of the start and end
+    frames of its disjoint ranges. The set operations merge the two arrays
+    in one pass.
+    '''
+
+    def __init__(self, ranges=(), base=25):
+        pairs = []
+        for time_range in ranges:
+            if not isinstance(time_range, TimeRange):
+                time_range = TimeRange(time_range[0], time_range[1], base)
+            if time_range.base() != base:
+                raise TimeCodeError('Cannot add a range with a different base to the set!')
+            if time_range.duration():
+                pairs.append(time_range.frames())
+        pairs.sort()
+
+        bounds = array('l')
+        for start, end in pairs:
+            if bounds and start <= bounds[-1]:
+                bounds[-1] = max(bounds[-1], end)
+            else:
+                bounds.append(start)
+                bounds.append(end)
+        self._bounds = bounds
+        self._base = base
+
+    @classmethod
+    def from_edits(cls, edits, side='record', base=25):
+        '''
+        Returns the set of record ('record') or source ('media') frames the
+        *edits* cover.
+        '''
+        if side == 'record':
+            ranges = [edit.globalInOut() for edit in edits]
+        elif side == 'media':
+            ranges = [edit.mediaInOut() for edit in edits]
+        else:
+            raise ValueError('Invalid side "%s", expected "record" or "media"' % side)
+        if ranges:
+            base = ranges[0][0].base()
+        return cls([TimeRange(start, end) for start, end in ranges], base)
+
+    @classmethod
+    def from_edl(cls, edl, side='record', tape=None):
+        '''
+        Returns the set of record or source frames the edits of *edl* cover,
+        limited to the edits from *tape* (the CMX tape or Vegas FileName) if
+        given.
+        '''
+        edits = edl.getAllEdits()
+        if tape is not None:
+            edits = [edit for edit in edits if edit.get('tape', edit.get('FileName')) == tape]
+        return cls.from_edits(edits, side, edl.start_tc().base())
+
+    @classmethod
+    def _from_bounds(cls, bounds, base):
+        range_set = cls(base=base)
+        range_set._bounds = bounds
+        return range_set
+
+    def base(self):
+        return self._base
+
+    def ranges(self):
+        bounds = self._bounds
+        return [TimeRange(bounds[i], bounds[i + 1], self._base) for i in range(0, len(bounds), 2)]
+
+    def duration(self):
+        bounds = self._bounds
+        return sum(bounds[1::2]) - sum(bounds[::2])
+
+    def union(self, other):
+        return self._combine(other, lambda a, b: a or b)
+
+    def intersection(self, other):
+        return self._combine(other, lambda a, b: a and b)
+
+    def difference(self, other):
+        return self._combine(other, lambda a, b: a and not b)
+
+    def complement(self, start=None, end=None):
+        '''
+        Returns the frames between *start* and *end* that are not in the
+        set, by default between the start and end of the set.
+        '''
+        if start is None:
+            start = self._bounds[0] if self._bounds else 0
+        if end is None:
+            end = self._bounds[-1] if self._bounds else 0
+        return RangeSet([TimeRange(start, end, self._base)], self._base).difference(self)
+
+    def _combine(self, other, operation):
+        if self._base != other._base:
+            raise TimeCodeError('Cannot combine two RangeSet objects with different bases!')
+
+        a = self._bounds
+        b = other._bounds
+        i = j = 0
+        in_a = in_b = inside = False
+        bounds = array('l')
+        while i < len(a) or j < len(b):
+            if j == len(b) or (i < len(a) and a[i] <= b[j]):
+                frame = a[i]
+            else:
+                frame = b[j]
+            while i < len(a) and a[i] == frame:
+                in_a = not in_a
+                i += 1
+            while j < len(b) and b[j] == frame:
+                in_b = not in_b
+                j += 1
+            if operation(in_a, in_b) != inside:
+                inside = not inside
+                bounds.append(frame)
+        return RangeSet._from_bounds(bounds, self._base)
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+    def __contains__(self, frame):
+        if isinstance(frame, TimeCode):
+            frame = frame.frames()
+        return bisect_right(self._bounds, frame) % 2 == 1
+
+    def __len__(self):
+        return len(self._bounds) // 2
+
+    def __iter__(self):
+        return iter(self.ranges())
+
+    def __eq__(self, other):
+        return (isinstance(other, RangeSet) and self._base == other._base and
+                self._bounds == other._bounds)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        return '<RangeSet:%s>' % ', '.join('%s-%s' % (r.start(), r.end()) for r in self.ranges())
@@ -0,0 +1,266 @@
+# Copyright (c) 2012, Sveinbjorn J. Tryggvason
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    Redistributions of source code must retain the above
+#    copyright notice, this list of conditions and the following disclaimer.
+#
+#    Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT,INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+'''
+Passing parsed EDLs between processes without pickling them. A worker
+writes the frame columns and attributes of an EDL into a memory mapped
+file and returns a small SharedDescriptor; the receiving process opens a
+read-only SharedEDL view over the same memory.
+
+    descriptor = pool.apply(parse_shared, (edl_path,))
+    with SharedEDL(descriptor) as view:
+        media_in, media_out, global_in, global_out = view.frame_columns()
+
+The files are created in /dev/shm where it exists, so they live in shared
+memory. On POSIX systems the view removes the file as soon as it is
+mapped, the memory is then freed when the view is released or its process
+exits.
+'''
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from collections import namedtuple
+
+from . import parse, Edit, TimeCode, ParserError
+
+
+SharedDescriptor = namedtuple('SharedDescriptor', 'path title edl_path start_frame base count')
+
+# magic, version, column item size, base, edit count, string count
+_HEADER = struct.Struct('=4sHHiqq')
+_MAGIC = 'EPSM'
+_VERSION = 1
+
+_SHM_DIRECTORY = '/dev/shm'
+
+
+def parse_shared(edl_path, start_tc=None, format='cmx3600', base=25, directory=None, **kwargs):
+    '''
+    Parses *edl_path*, see editparser.parse, and exports the result with
+    export_edl. Meant to run in worker processes.
+    '''
+    return export_edl(parse(edl_path, start_tc, format=format, base=base, **kwargs), directory)
+
+
+def export_edl(edl, directory=None):
+    '''
+    Writes the edits of *edl* to a new file in *directory* (shared memory
+    if available) and returns its SharedDescriptor. The receiver of the
+    descriptor owns the file, see SharedEDL and discard.
+    '''
+    if directory is None and os.path.isdir(_SHM_DIRECTORY):
+        directory = _SHM_DIRECTORY
+
+    edits = edl.getAllEdits()
+    columns = edl.frame_columns()
+
+    # a table of the distinct attribute records, each edit refers to one
+    table = []
+    table_ids = {}
+    records = array('l')
+    for edit in edits:
+        # sorted pairs rather than sort_keys, which needs the slow pure Python encoder
+        record = json.dumps(sorted(edit.attributes().items()), separators=(',', ':'))
+        record_id = table_ids.get(record)
+        if record_id is None:
+            record_id = table_ids[record] = len(table)
+            table.append(record.encode('utf-8'))
+        records.append(record_id)
+
+    offsets = array('l', [0])
+    for record in table:
+        offsets.append(offsets[-1] + len(record))
+
+    handle, path = tempfile.mkstemp(prefix='editparser-', suffix='.edl.shm', dir=directory)
+    try:
+        with os.fdopen(handle, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, records.itemsize, edl.start_tc().base(),
+                                 len(edits), len(table)))
+            for column in columns:
+                f.write(column.tostring())
+            f.write(records.tostring())
+            f.write(offsets.tostring())
+            f.write(''.join(table))
+    except:
+        os.remove(path)
+        raise
+
+    start_tc = edl.start_tc()
+    return SharedDescriptor(path, edl.title(), edl.path(), start_tc.frames(), start_tc.base(), len(edits))
+
+
+def discard(descriptor):
+    '''
+    Removes the file of a descriptor that will not be opened.
+    '''
+    try:
+        os.remove(descriptor.path)
+    except OSError:
+        pass
+
+
+class SharedEDL(object):
+    '''
+    Read-only view of an EDL exported with export_edl. Frames are read
+    straight from the shared memory; Edit objects are only built for the
+    edits asked for.
+    '''
+
+    def __init__(self, descriptor):
+        self._descriptor = descriptor
+        with open(descriptor.path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if os.name == 'posix':
+            discard(descriptor)
+
+        magic, version, itemsize, base, count, table_count = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != _VERSION or itemsize != array('l').itemsize:
+            self.release()
+            raise ParserError('Not a shared EDL of this version: %s' % descriptor.path)
+
+        self._base = base
+        self._count = count
+        self._itemsize = itemsize
+        # native C long, the size of the array('l') columns
+        self._item = struct.Struct('l')
+        self._columns_offset = _HEADER.size
+        self._records_offset = self._columns_offset + 4 * count * itemsize
+        self._offsets_offset = self._records_offset + count * itemsize
+        self._table_offset = self._offsets_offset + (table_count + 1) * itemsize
+        self._records = {}
+
+    def release(self):
+        '''
+        Unmaps the shared memory and removes its file if it still exists.
+        '''
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+            discard(self._descriptor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def __del__(self):
+        if getattr(self, '_map', None) is not None:
+            self.release()
+
+    def title(self):
+        return self._descriptor.title
+
+    def path(self):
+        return self._descriptor.edl_path
+
+    def start_tc(self):
+        return TimeCode(frames=self._descriptor.start_frame, base=self._descriptor.base)
+
+    def __len__(self):
+        return self._count
+
+    def frames(self, index):
+        '''
+        Returns the (mediaIn, mediaOut, globalIn, globalOut) frames of the
+        edit at *index*.
+        '''
+        index = self._index(index)
+        step = self._count * self._itemsize
+        offset = self._columns_offset + index * self._itemsize
+        return tuple(self._item.unpack_from(self._map, offset + column * step)[0]
+                     for column in xrange(4))
+
+    def frame_columns(self):
+        '''
+        Returns the frames of all edits as four parallel arrays, see
+        EDL.frame_columns. The arrays are copied out of the shared memory,
+        one memcpy per column; use frames to read single edits in place.
+        '''
+        columns = []
+        step = self._count * self._itemsize
+        for column in xrange(4):
+            start = self._columns_offset + column * step
+            values = array('l')
+            values.fromstring(self._map[start:start + step])
+            columns.append(values)
+        return tuple(columns)
+
+    def attributes(self, index):
+        '''
+        Returns the attributes of the edit at *index*. Edits with the same
+        attributes share one dictionary, it must not be changed.
+
+        The attributes pass through JSON, so tuples come back as lists and
+        text that is not ASCII as unicode; ASCII text comes back as str.
+        '''
+        record_id = self._read(self._records_offset, self._index(index))
+        attributes = self._records.get(record_id)
+        if attributes is None:
+            start = self._read(self._offsets_offset, record_id)
+            end = self._read(self._offsets_offset, record_id + 1)
+            record = self._map[self._table_offset + start:self._table_offset + end]
+            attributes = dict((_restore_strings(key), _restore_strings(value))
+                              for key, value in json.loads(record.decode('utf-8')))
+            self._records[record_id] = attributes
+        return attributes
+
+    def getEdit(self, index):
+        media_in, media_out, global_in, global_out = self.frames(index)
+        return Edit.from_frames(media_in, media_out, global_in, global_out, self._base,
+                                dict(self.attributes(index)))
+
+    def getAllEdits(self):
+        return [self.getEdit(i) for i in xrange(self._count)]
+
+    def __iter__(self):
+        for i in xrange(self._count):
+            yield self.getEdit(i)
+
+    def _index(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('SharedEDL index out of range')
+        return index
+
+    def _read(self, offset, index):
+        return self._item.unpack_from(self._map, offset + index * self._itemsize)[0]
+
+
+def _restore_strings(value):
+    # json decodes all strings to unicode, the parsers give str
+    if isinstance(value, unicode):
+        try:
+            return value.encode('ascii')
+        except UnicodeEncodeError:
+            return value
+    if isinstance(value, list):
+        return [_restore_strings(item) for item in value]
+    return value
@@ -0,0 +1,352 @@
+# Copyright (c) 2012, Sveinbjorn J. Tryggvason
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    Redistributions of source code must retain the above
+#    copyright notice, this list of conditions and the following disclaimer.
+#
+#    Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT,INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+'''
+Single pass summaries of EDLs: runtimes, event counts, transitions and
+shot length distributions. Summaries of parts of a list, or of many lists,
+can be merged, so they can be computed in parallel over whole archives.
+'''
+
+import math
+from bisect import insort
+from collections import Counter
+
+from . import EDL, EditError, round_division
+from .validate import channel_of
+
+
+class QuantileSketch(object):
+    '''
+    Approximate distribution of numbers in bounded memory. Quantiles are
+    returned with a relative error of at most *accuracy*; values are kept
+    in logarithmically sized buckets, at most *max_buckets* of them, the
+    smallest buckets being merged first when there are more.
+
+    Sketches with the same accuracy can be merged.
+    '''
+
+    def __init__(self, accuracy=0.01, max_buckets=2048):
+        if not 0 < accuracy < 1:
+            raise ValueError('accuracy must be between 0 and 1, got %s' % accuracy)
+        self._accuracy = accuracy
+        self._gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._max_buckets = max_buckets
+        self._positive = _Buckets()
+        self._negative = _Buckets()
+        self._zero = 0
+        self._count = 0
+        self._min = None
+        self._max = None
+
+    def add(self, value, count=1):
+        if value > 0:
+            self._positive.add(self._bucket(value), count)
+            self._positive.collapse(self._max_buckets)
+        elif value < 0:
+            self._negative.add(self._bucket(-value), count)
+            self._negative.collapse(self._max_buckets)
+        else:
+            self._zero += count
+        self._count += count
+        if self._min is None or value < self._min:
+            self._min = value
+        if self._max is None or value > self._max:
+            self._max = value
+
+    def merge(self, other):
+        '''
+        Adds the values counted by *other* to this sketch.
+        '''
+        if other._accuracy != self._accuracy:
+            raise ValueError('Cannot merge sketches of different accuracy')
+        if not other._count:
+            return self
+        self._positive.update(other._positive)
+        self._negative.update(other._negative)
+        self._positive.collapse(self._max_buckets)
+        self._negative.collapse(self._max_buckets)
+        self._zero += other._zero
+        self._count += other._count
+        self._min = other._min if self._min is None else min(self._min, other._min)
+        self._max = other._max if self._max is None else max(self._max, other._max)
+        return self
+
+    def count(self):
+        return self._count
+
+    def min(self):
+        return self._min
+
+    def max(self):
+        return self._max
+
+    def quantile(self, q):
+        '''
+        Returns the approximate *q* quantile, 0 <= q <= 1, or None if the
+        sketch is empty.
+        '''
+        if not 0 <= q <= 1:
+            raise ValueError('q must be between 0 and 1, got %s' % q)
+        if not self._count:
+            return None
+        if q == 0:
+            return self._min
+        if q == 1:
+            return self._max
+
+        rank = q * (self._count - 1)
+        seen = 0
+        for low, high, count in self._buckets():
+            seen += count
+            if seen > rank:
+                if low == high:
+                    value = low
+                else:
+                    value = math.copysign(2 * abs(high) * abs(low) / (abs(high) + abs(low)), high)
+                return min(max(value, self._min), self._max)
+        return self._max
+
+    def histogram(self):
+        '''
+        Returns the non empty buckets as (low, high, count) tuples in
+        ascending order.
+        '''
+        return list(self._buckets())
+
+    def _buckets(self):
+        counts = self._negative.counts
+        for index in reversed(self._negative.indices):
+            yield (-self._gamma ** index, -self._gamma ** (index - 1), counts[index])
+        if self._zero:
+            yield (0, 0, self._zero)
+        counts = self._positive.counts
+        for index in self._positive.indices:
+            yield (self._gamma ** (index - 1), self._gamma ** index, counts[index])
+
+    def _bucket(self, value):
+        return int(math.ceil(math.log(value) / self._log_gamma))
+
+
+class _Buckets(object):
+    # bucket counts by index, with the indices kept in order
+
+    def __init__(self):
+        self.counts = {}
+        self.indices = []
+
+    def add(self, index, count):
+        if index in self.counts:
+            self.counts[index] += count
+        else:
+            self.counts[index] = count
+            insort(self.indices, index)
+
+    def update(self, other):
+        for index in other.indices:
+            self.add(index, other.counts[index])
+
+    def collapse(self, max_buckets):
+        # the lowest buckets are merged into the next one
+        excess = len(self.indices) - max_buckets
+        if excess > 0:
+            merged = sum(self.counts.pop(index) for index in self.indices[:excess])
+            del self.indices[:excess]
+            self.counts[self.indices[0]] += merged
+
+    def __len__(self):
+        return len(self.indices)
+
+
+class Stats(object):
+    '''
+    Summary of edits, fed one edit or one EDL at a time. Frame counts are
+    kept at *base*, by default the base of the first edit added; edits at
+    other bases are converted to it.
+
+    runtime_per_channel and runtime_per_tape hold the summed record
+    durations, events_per_channel the event counts and transitions the
+    count of each transition kind other than cuts. shot_lengths is a
+    QuantileSketch of the record durations.
+
+    The runtime counts the record frames covered by any edit once. Edits
+    added one at a time or as columns are taken to be parts of one list,
+    and merging unions their record ranges; each EDL added with add_edl
+    counts on its own.
+    '''
+
+    def __init__(self, base=None, accuracy=0.01):
+        self.base = base
+        self.events = 0
+        self.edls = 0
+        self.events_per_channel = Counter()
+        self.runtime_per_channel = Counter()
+        self.runtime_per_tape = Counter()
+        self.transitions = Counter()
+        self.shot_lengths = QuantileSketch(accuracy)
+        # record runtime of the EDLs added, and the ranges of single edits
+        self._edl_runtime = 0
+        self._ranges = []
+        self._merged_ranges = 0
+
+    def add(self, edit):
+        edit._sync()
+        self._count(edit._globalIn._frames, edit._globalOut._frames, edit._globalIn._base,
+                    channel_of(edit), _tape_of(edit), edit.get('transition'), self._ranges)
+        self._compact()
+        return edit
+
+    def watch(self, edits):
+        '''
+        Passes *edits* on unchanged while adding each of them.
+        '''
+        for edit in edits:
+            self.add(edit)
+            yield edit
+
+    def add_edl(self, edl):
+        '''
+        Adds all edits of *edl*, reading their record frames as columns.
+        '''
+        edits = edl.getAllEdits()
+        media_in, media_out, global_in, global_out = edl.frame_columns()
+        ranges = []
+        for i, edit in enumerate(edits):
+            self._count(global_in[i], global_out[i], edit._globalIn._base, channel_of(edit),
+                        _tape_of(edit), edit.get('transition'), ranges)
+        self._edl_runtime += _covered(_union(ranges))
+        self.edls += 1
+        return self
+
+    def add_columns(self, global_in, global_out, base, channels=None, tapes=None, transitions=None):
+        '''
+        Adds edits given as parallel columns of record frames at *base*,
+        with optional columns of their channels, tapes and transitions.
+        '''
+        for i in xrange(len(global_in)):
+            self._count(global_in[i], global_out[i], base,
+                        channels[i] if channels is not None else None,
+                        tapes[i] if tapes is not None else None,
+                        transitions[i] if transitions is not None else None,
+                        self._ranges)
+        self._compact()
+        return self
+
+    def merge(self, other):
+        '''
+        Adds the edits summarized by *other*, for example the result of
+        another worker, to this summary.
+        '''
+        if not other.events and not other.edls:
+            return self
+        if self.base is None:
+            self.base = other.base
+        elif other.base is not None and other.base != self.base:
+            raise EditError('Cannot merge statistics at base %s into base %s' % (other.base, self.base))
+        self.events += other.events
+        self.edls += other.edls
+        self.events_per_channel.update(other.events_per_channel)
+        self.runtime_per_channel.update(other.runtime_per_channel)
+        self.runtime_per_tape.update(other.runtime_per_tape)
+        self.transitions.update(other.transitions)
+        self.shot_lengths.merge(other.shot_lengths)
+        self._edl_runtime += other._edl_runtime
+        self._ranges = _union(self._ranges + other._ranges)
+        self._merged_ranges = len(self._ranges)
+        return self
+
+    def runtime(self):
+        '''
+        Returns the number of record frames at base covered by the edits,
+        see Stats.
+        '''
+        return self._edl_runtime + _covered(_union(self._ranges))
+
+    def percentiles(self, percents=(50, 90, 99)):
+        '''
+        Returns a dictionary from each of *percents* to the approximate shot
+        length at that percentile.
+        '''
+        return dict((percent, self.shot_lengths.quantile(percent / 100.0)) for percent in percents)
+
+    def _count(self, global_in, global_out, base, channel, tape, transition, ranges):
+        if self.base is None:
+            self.base = base
+        elif base != self.base:
+            global_in = round_division(global_in * self.base, base, 'nearest')
+            global_out = round_division(global_out * self.base, base, 'nearest')
+        duration = global_out - global_in
+        if duration > 0:
+            ranges.append((global_in, global_out))
+
+        self.events += 1
+        self.events_per_channel[channel] += 1
+        self.runtime_per_channel[channel] += duration
+        if tape is not None:
+            self.runtime_per_tape[tape] += duration
+        if transition is not None and transition != 'C':
+            self.transitions[transition] += 1
+        self.shot_lengths.add(duration)
+
+    def _compact(self):
+        # keeps the ranges of long edit streams from growing with every edit
+        if len(self._ranges) > 2 * self._merged_ranges + 1024:
+            self._ranges = _union(self._ranges)
+            self._merged_ranges = len(self._ranges)
+
+
+def summarize(source, base=None):
+    '''
+    Returns the Stats of *source*, an EDL or any iterable of edits.
+    '''
+    stats = Stats(base)
+    if isinstance(source, EDL):
+        return stats.add_edl(source)
+    for edit in source:
+        stats.add(edit)
+    return stats
+
+
+def _union(ranges):
+    # the sorted, disjoint ranges covering the same frames as *ranges*
+    union = []
+    for start, end in sorted(ranges):
+        if union and start <= union[-1][1]:
+            if end > union[-1][1]:
+                union[-1] = (union[-1][0], end)
+        else:
+            union.append((start, end))
+    return union
+
+
+def _covered(union):
+    return sum(end - start for start, end in union)
+
+
+def _tape_of(edit):
+    tape = edit.get('tape')
+    if tape is None:
+        tape = edit.get('FileName')
+    return tape
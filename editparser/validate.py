@@ -0,0 +1,153 @@
+# Copyright (c) 2012, Sveinbjorn J. Tryggvason
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    Redistributions of source code must retain the above
+#    copyright notice, this list of conditions and the following disclaimer.
+#
+#    Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT,INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+'''
+Consistency checks of the edits of an EDL.
+'''
+
+from collections import namedtuple
+
+
+Finding = namedtuple('Finding', ['index', 'number', 'check', 'message'])
+
+CHECKS = ('reversed', 'duration', 'continuity', 'numbering')
+
+
+def channel_of(edit):
+    '''
+    Returns the channel an edit is on, the CMX 'channels' or the Vegas
+    'Track'.
+    '''
+    channels = edit.get('channels')
+    if channels is not None:
+        return tuple(channels)
+    return edit.get('Track')
+
+
+def validate_edl(edl):
+    '''
+    Runs all checks over the frame columns of *edl* and returns the list of
+    findings ordered by edit index.
+    '''
+    edits = edl.getAllEdits()
+    media_in, media_out, global_in, global_out = edl.frame_columns()
+    numbers = [edit.get('number') for edit in edits]
+    channels = [channel_of(edit) for edit in edits]
+    indices = range(len(edits))
+    findings = []
+
+    for i in [i for i in indices if media_out[i] < media_in[i]]:
+        findings.append(Finding(i, numbers[i], 'reversed', 'Media Out is before Media In'))
+    for i in [i for i in indices if global_out[i] < global_in[i]]:
+        findings.append(Finding(i, numbers[i], 'reversed', 'Global Out is before Global In'))
+
+    for i in [i for i in indices
+              if media_out[i] - media_in[i] != global_out[i] - global_in[i]]:
+        findings.append(Finding(i, numbers[i], 'duration',
+                                'Media duration %d does not match record duration %d' %
+                                (media_out[i] - media_in[i], global_out[i] - global_in[i])))
+
+    # previous edit on the same channel
+    last_on_channel = {}
+    previous = []
+    for i in indices:
+        previous.append(last_on_channel.get(channels[i]))
+        last_on_channel[channels[i]] = i
+    for i in [i for i in indices
+              if previous[i] is not None and global_in[i] != global_out[previous[i]]]:
+        findings.append(_continuity_finding(i, numbers[i], global_in[i], global_out[previous[i]]))
+
+    for i in [i for i in indices[1:]
+              if numbers[i] is not None and numbers[i - 1] is not None and numbers[i] < numbers[i - 1]]:
+        findings.append(Finding(i, numbers[i], 'numbering',
+                                'Event number %s follows %s' % (numbers[i], numbers[i - 1])))
+
+    findings.sort(key=lambda finding: (finding.index, CHECKS.index(finding.check)))
+    return findings
+
+
+class Validator(object):
+    '''
+    Runs the same checks as validate_edl one edit at a time, for use while
+    edits are streamed in. Findings are collected in *findings*.
+    '''
+
+    def __init__(self):
+        self.findings = []
+        self._index = 0
+        self._last_number = None
+        self._last_out = {}
+
+    def check(self, edit):
+        '''
+        Checks the next *edit* and returns its findings.
+        '''
+        i = self._index
+        number = edit.get('number')
+        media_in = edit.mediaIn().frames()
+        media_out = edit.mediaOut().frames()
+        global_in = edit.globalIn().frames()
+        global_out = edit.globalOut().frames()
+        findings = []
+
+        if media_out < media_in:
+            findings.append(Finding(i, number, 'reversed', 'Media Out is before Media In'))
+        if global_out < global_in:
+            findings.append(Finding(i, number, 'reversed', 'Global Out is before Global In'))
+        if media_out - media_in != global_out - global_in:
+            findings.append(Finding(i, number, 'duration',
+                                    'Media duration %d does not match record duration %d' %
+                                    (media_out - media_in, global_out - global_in)))
+
+        channel = channel_of(edit)
+        previous_out = self._last_out.get(channel)
+        if previous_out is not None and global_in != previous_out:
+            findings.append(_continuity_finding(i, number, global_in, previous_out))
+        self._last_out[channel] = global_out
+
+        if number is not None and self._last_number is not None and number < self._last_number:
+            findings.append(Finding(i, number, 'numbering',
+                                    'Event number %s follows %s' % (number, self._last_number)))
+        self._last_number = number
+
+        self._index += 1
+        self.findings.extend(findings)
+        return findings
+
+    def watch(self, edits):
+        '''
+        Passes *edits* on unchanged while checking each of them.
+        '''
+        for edit in edits:
+            self.check(edit)
+            yield edit
+
+
+def _continuity_finding(index, number, global_in, previous_out):
+    if global_in > previous_out:
+        message = 'Gap of %d frames after the previous edit on the channel' % (global_in - previous_out)
+    else:
+        message = 'Overlaps the previous edit on the channel by %d frames' % (previous_out - global_in)
+    return Finding(index, number, 'continuity', message)
@@ -23,24 +23,24 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
 # THE POSSIBILITY OF SUCH DAMAGE.
 
+import operator
 import os
 import re
+from array import array
 
-from . import EDL, TimeCode, Edit, ParserError
+from . import EDL, TimeCode, Edit, ParserError, ROUNDING, round_division
 
 
-def parse(edl_path, start_tc=None, base=25):
+# Vegas writes times with four decimals, counting in units of 1/10000 ms
+# keeps the conversion to frames exact for integer frame rates
+_UNITS_PER_MSEC = 10000
+
+
+def parse(edl_path, start_tc=None, base=25, rounding='floor'):
     
     if not os.path.exists(edl_path):
         raise IOError('Path does not exist: %s' % edl_path)
 
-    edl_file = open(edl_path, 'rt')
-    edl_lines = edl_file.readlines()
-    edl_file.close()
-
-    if edl_lines[0].startswith('"ID"'):
-        del edl_lines[0]
-
     edl_name = os.path.basename(edl_path)
 
     if start_tc:
@@ -48,33 +48,91 @@ def parse(edl_path, start_tc=None, base=25):
     else:
         the_edl = EDL(edl_name, edl_path, base=base)
 
-    for line in edl_lines:
-        try:
-            vLine = VegasEDLLine(line)
-        except ParserError, err:
-            print 'ERROR:', err
-            continue
+    for current_edit in iter_edits(edl_path, base, the_edl.attribute_schema(), rounding):
+        the_edl.appendEdit(current_edit)
 
-        try:
-            edit_number = vLine.ID
-            edit_name = os.path.basename(vLine.FileName)
-        except AttributeError, err:
-            print 'ERROR:', err
-            continue
+    the_edl.check_edits()
+    return the_edl
 
-        global_in_tc = TimeCode.from_msec(vLine.StartTime, base=base)
-        global_length_tc = TimeCode.from_msec(vLine.Length, base=base)
-        global_out_tc = global_in_tc + global_length_tc
 
-        media_in_tc = TimeCode.from_msec(vLine.StreamStart, base=base)
-        media_length_tc = TimeCode.from_msec(vLine.StreamLength, base=base)
-        media_out_tc = media_in_tc + media_length_tc
+def iter_edits(edl_path, base=25, schema=None, rounding='floor', chunk_size=1024):
+    '''
+    Lazily yields the edits of the Vegas EDL at *edl_path*. Rows are read
+    and converted to frames *chunk_size* at a time. The attributes are
+    stored in *schema* if one is given. The edits are not checked, see
+    EDL.check_edits.
+    '''
+    if not os.path.exists(edl_path):
+        raise IOError('Path does not exist: %s' % edl_path)
+
+    with open(edl_path, 'rt') as edl_file:
+        vLines = []
+        for line in edl_file:
+            if line.startswith('"ID"'):
+                continue
+
+            try:
+                vLine = VegasEDLLine(line)
+            except ParserError, err:
+                print 'ERROR:', err
+                continue
+
+            try:
+                edit_number = vLine.ID
+                edit_name = os.path.basename(vLine.FileName)
+            except AttributeError, err:
+                print 'ERROR:', err
+                continue
+
+            vLines.append(vLine)
+            if len(vLines) == chunk_size:
+                for edit in _edits_from_lines(vLines, base, schema, rounding):
+                    yield edit
+                vLines = []
+
+        for edit in _edits_from_lines(vLines, base, schema, rounding):
+            yield edit
+
+
+def _edits_from_lines(vLines, base, schema, rounding):
+    # convert whole columns at once, as with TimeCode.from_msec the out
+    # points are the rounded in points plus the rounded lengths
+    global_in = msec_to_frames([vLine.StartTime for vLine in vLines], base, rounding)
+    global_out = _add_columns(global_in, msec_to_frames([vLine.Length for vLine in vLines], base, rounding))
+    media_in = msec_to_frames([vLine.StreamStart for vLine in vLines], base, rounding)
+    media_out = _add_columns(media_in, msec_to_frames([vLine.StreamLength for vLine in vLines], base, rounding))
+
+    for i, vLine in enumerate(vLines):
+        current_edit = Edit.from_frames(media_in[i], media_out[i], global_in[i], global_out[i],
+                                        base, dict(vLine._dict))
+        if schema is not None:
+            current_edit.use_schema(schema)
+        yield current_edit
+
+
+def msec_to_frames(values, base, rounding='floor'):
+    '''
+    Converts a sequence of millisecond *values* to an array of frame counts
+    at *base* frames per second, rounding fractional frames down ('floor'),
+    to the nearest frame ('nearest', halves round up) or up ('ceil').
+    '''
+    if rounding not in ROUNDING:
+        raise ParserError('Invalid rounding "%s", expected one of %s' % (rounding, ', '.join(ROUNDING)))
+    if not isinstance(base, (int, long)):
+        return array('l', [round_division(value * base, 1000, rounding) for value in values])
 
-        current_edit = Edit(media_in_tc, media_out_tc, global_in_tc, global_out_tc, **vLine._dict)
-        the_edl.appendEdit(current_edit)
+    divisor = 1000 * _UNITS_PER_MSEC
+    units = [int(round(value * _UNITS_PER_MSEC)) * base for value in values]
+    if rounding == 'floor':
+        return array('l', [value // divisor for value in units])
+    elif rounding == 'ceil':
+        return array('l', [-(-value // divisor) for value in units])
+    half = divisor // 2
+    return array('l', [(value + half) // divisor for value in units])
 
-    return the_edl
 
+def _add_columns(first, second):
+    return array('l', map(operator.add, first, second))
 
 
 
@@ -119,37 +177,38 @@ def parse(edl_path, start_tc=None, base=25):
 
 
 class VegasEDLLine(object):
+    _fields = ('ID',
+               'Track',
+               'StartTime',
+               'Length',
+               'PlayRate',
+               'Locked',
+               'Normalized',
+               'StretchMethod',
+               'Looped',
+               'OnRuler',
+               'MediaType',
+               'FileName',
+               'Stream',
+               'StreamStart',
+               'StreamLength',
+               'FadeTimeIn',
+               'FadeTimeOut',
+               'SustainGain',
+               'CurveIn',
+               'GainIn',
+               'CurveOut',
+               'GainOut',
+               'Layer',
+               'Color',
+               'CurveInR',
+               'CurveOutR',
+               'PlayPitch',
+               'LockPitch',
+               'FirstChannel',
+               'Channels')
+
     def __init__(self, line):
-        self._fields = ['ID',
-                        'Track',
-                        'StartTime',
-                        'Length',
-                        'PlayRate',
-                        'Locked',
-                        'Normalized',
-                        'StretchMethod',
-                        'Looped',
-                        'OnRuler',
-                        'MediaType',
-                        'FileName',
-                        'Stream',
-                        'StreamStart',
-                        'StreamLength',
-                        'FadeTimeIn',
-                        'FadeTimeOut',
-                        'SustainGain',
-                        'CurveIn',
-                        'GainIn',
-                        'CurveOut',
-                        'GainOut',
-                        'Layer',
-                        'Color',
-                        'CurveInR',
-                        'CurveOutR',
-                        'PlayPitch',
-                        'LockPitch',
-                        'FirstChannel',
-                        'Channels']
         self._dict = {}
 
         line_parts = line.split(';')
@@ -168,10 +227,16 @@ class VegasEDLLine(object):
             elif line_part == 'TRUE':
                 value = True
 
+            elif line_part.startswith('"'):
+                # quoted strings, file names would otherwise fail two number conversions
+                value = line_part
+
             else:
                 try:
-                    int_value = int(line_part)
-                    value = int_value
+                    if '.' in line_part:
+                        value = float(line_part)
+                    else:
+                        value = int(line_part)
                 except ValueError:
                     try:
                         value = float(line_part)
@@ -186,7 +251,7 @@ class VegasEDLLine(object):
             self._dict[field] = value
 
     def __getattr__(self, name):
-        if name not in self._dict.keys():
+        if name not in self._dict:
             raise AttributeError('VegasEDLLine does not have the field \'%s\'' % name)
 
         return self._dict[name]
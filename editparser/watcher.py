@@ -0,0 +1,316 @@
+# Copyright (c) 2012, Sveinbjorn J. Tryggvason
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    Redistributions of source code must retain the above
+#    copyright notice, this list of conditions and the following disclaimer.
+#
+#    Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT,INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+'''
+Polling watcher for EDL drop folders. New and modified files are parsed by
+a pool of worker threads once they have stopped changing, and the parsed
+EDL is delivered to a callback together with the edits that changed since
+the previous version of the file. Every change re-parses the whole file;
+the changed edits are then found by comparing edit fingerprints.
+'''
+
+import logging
+import os
+import threading
+import time
+import Queue
+from collections import namedtuple, Counter
+
+from . import parse
+from .fingerprint import edit_digest
+from .index import file_digest
+
+
+_log = logging.getLogger(__name__)
+_log.addHandler(logging.NullHandler())
+
+WatchEvent = namedtuple('WatchEvent', 'path kind edl diff')
+
+EDLDiff = namedtuple('EDLDiff', 'added removed')
+
+
+def diff_edls(old, new):
+    '''
+    Returns an EDLDiff with the edits of *new* that are not in *old* and
+    the edits of *old* that are not in *new*, compared by fingerprint.
+    '''
+    old_edits = old.getAllEdits() if old is not None else []
+    new_edits = new.getAllEdits() if new is not None else []
+
+    old_counts = Counter(edit_digest(edit) for edit in old_edits)
+    new_counts = Counter(edit_digest(edit) for edit in new_edits)
+
+    added = []
+    for edit in new_edits:
+        digest = edit_digest(edit)
+        if old_counts[digest] > 0:
+            old_counts[digest] -= 1
+        else:
+            added.append(edit)
+
+    removed = []
+    for edit in old_edits:
+        digest = edit_digest(edit)
+        if new_counts[digest] > 0:
+            new_counts[digest] -= 1
+        else:
+            removed.append(edit)
+
+    return EDLDiff(added, removed)
+
+
+class Watcher(object):
+    '''
+    Watches *directory* for files ending in one of *extensions* and calls
+    *callback* with a WatchEvent for every new, modified or deleted file.
+
+    A file is parsed once its size and modification time have not changed
+    for *settle* seconds, so a burst of saves results in a single parse.
+    Files that were touched but whose contents did not change are skipped.
+    A changed file is parsed again as a whole and diffed against its last
+    version by edit fingerprint, see diff_edls.
+
+    Errors while parsing a file or in *callback* are passed to *errback*
+    with the path, errors while polling with the directory, or logged
+    without an errback; they never stop the watcher. At
+    most *max_pending* files wait for the *workers* parsing threads;
+    polling blocks when the queue is full. A path that is already waiting
+    is not queued again, the worker parses its latest contents.
+    '''
+
+    def __init__(self, directory, callback, format='cmx3600', base=25, extensions=('.edl',),
+                 interval=1.0, settle=2.0, workers=2, max_pending=64, errback=None, **kwargs):
+        self._directory = directory
+        self._callback = callback
+        self._errback = errback
+        self._format = format
+        self._base = base
+        self._extensions = tuple(ext.lower() for ext in extensions)
+        self._interval = interval
+        self._settle = settle
+        self._kwargs = kwargs
+
+        # path -> (stat signature, time it was first seen with it)
+        self._changing = {}
+        # path -> stat signature of the version that was last queued
+        self._queued_signatures = {}
+        # path -> (content digest, EDL) of the last delivered version
+        self._versions = {}
+
+        self._lock = threading.Lock()
+        # path -> [lock, number of workers using it], while in use
+        self._path_locks = {}
+        self._pending = set()
+        self._queue = Queue.Queue(max_pending)
+        self._stopping = threading.Event()
+        self._poller = None
+        self._workers = []
+        for i in xrange(workers):
+            worker = threading.Thread(target=self._work, name='editparser-watch-%d' % i)
+            worker.daemon = True
+            self._workers.append(worker)
+
+    def start(self):
+        '''
+        Starts the worker threads and a thread polling the directory every
+        *interval* seconds.
+        '''
+        for worker in self._workers:
+            worker.start()
+        self._poller = threading.Thread(target=self._poll_loop, name='editparser-watch-poll')
+        self._poller.daemon = True
+        self._poller.start()
+        return self
+
+    def stop(self, timeout=None):
+        '''
+        Stops polling, lets the workers finish the queued files and waits
+        for the threads to exit.
+        '''
+        self._stopping.set()
+        if self._poller is not None:
+            self._poller.join(timeout)
+        running = [worker for worker in self._workers if worker.is_alive()]
+        for worker in running:
+            self._queue.put(None)
+        for worker in running:
+            worker.join(timeout)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def join(self):
+        '''
+        Blocks until every queued file has been processed.
+        '''
+        self._queue.join()
+
+    def poll(self, now=None):
+        '''
+        Scans the directory once and queues the files that have settled.
+        Returns the list of queued paths.
+        '''
+        if now is None:
+            now = time.time()
+
+        current = {}
+        for root, dirs, files in os.walk(self._directory):
+            dirs.sort()
+            for name in sorted(files):
+                if not name.lower().endswith(self._extensions):
+                    continue
+                path = os.path.abspath(os.path.join(root, name))
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    # removed while scanning
+                    continue
+                current[path] = (stat.st_mtime, stat.st_size)
+
+        queued = []
+        for path, signature in current.items():
+            if self._queued_signatures.get(path) == signature:
+                self._changing.pop(path, None)
+                continue
+            seen = self._changing.get(path)
+            if seen is None or seen[0] != signature:
+                # new or still changing, wait for it to settle
+                self._changing[path] = (signature, now)
+                if self._settle > 0:
+                    continue
+            elif now - seen[1] < self._settle:
+                continue
+            del self._changing[path]
+            self._queued_signatures[path] = signature
+            self._enqueue(path)
+            queued.append(path)
+
+        for path in list(self._queued_signatures):
+            if path not in current:
+                del self._queued_signatures[path]
+                self._enqueue(path)
+                queued.append(path)
+        for path in list(self._changing):
+            if path not in current:
+                del self._changing[path]
+
+        return sorted(queued)
+
+    def _enqueue(self, path):
+        with self._lock:
+            if path in self._pending:
+                return
+            self._pending.add(path)
+        self._queue.put(path)
+
+    def _poll_loop(self):
+        while not self._stopping.is_set():
+            try:
+                self.poll()
+            except Exception, err:
+                # an unreadable directory must not stop the watcher
+                self._error(self._directory, err)
+            self._stopping.wait(self._interval)
+
+    def _work(self):
+        while True:
+            path = self._queue.get()
+            try:
+                if path is None:
+                    return
+                with self._lock:
+                    self._pending.discard(path)
+                    path_lock = self._path_locks.get(path)
+                    if path_lock is None:
+                        path_lock = self._path_locks[path] = [threading.Lock(), 0]
+                    path_lock[1] += 1
+                try:
+                    # versions of one file are processed in order
+                    with path_lock[0]:
+                        self.process(path)
+                except Exception, err:
+                    self._error(path, err)
+                finally:
+                    with self._lock:
+                        path_lock[1] -= 1
+                        if not path_lock[1]:
+                            del self._path_locks[path]
+            finally:
+                self._queue.task_done()
+
+    def process(self, path):
+        '''
+        Parses *path* if its contents changed since the last delivered
+        version and calls the callback. The whole file is parsed and diffed
+        against the last version by fingerprint. Returns the WatchEvent, or
+        None if nothing changed or the file could not be parsed.
+        '''
+        with self._lock:
+            previous = self._versions.get(path)
+
+        try:
+            digest = file_digest(path)
+        except (IOError, OSError):
+            digest = None
+
+        if digest is None:
+            if previous is None:
+                return None
+            with self._lock:
+                del self._versions[path]
+            event = WatchEvent(path, 'deleted', None, diff_edls(previous[1], None))
+        else:
+            if previous is not None and previous[0] == digest:
+                return None
+            try:
+                edl = parse(path, format=self._format, base=self._base, **self._kwargs)
+            except Exception, err:
+                # a broken file must not stop the worker
+                self._error(path, err)
+                return None
+            with self._lock:
+                self._versions[path] = (digest, edl)
+            if previous is None:
+                event = WatchEvent(path, 'created', edl, diff_edls(None, edl))
+            else:
+                event = WatchEvent(path, 'modified', edl, diff_edls(previous[1], edl))
+
+        try:
+            self._callback(event)
+        except Exception, err:
+            self._error(path, err)
+        return event
+
+    def _error(self, path, err):
+        if self._errback is not None:
+            try:
+                self._errback(path, err)
+                return
+            except Exception, errback_err:
+                _log.error('Error handler failed for %s: %s', path, errback_err)
+        _log.error('Could not process %s: %s', path, err)
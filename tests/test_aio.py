@@ -0,0 +1,245 @@
+# Copyright (c) 2012, Sveinbjorn J. Tryggvason
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    Redistributions of source code must retain the above
+#    copyright notice, this list of conditions and the following disclaimer.
+#
+#    Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT,INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+import os
+import multiprocessing
+
+from editparser import aio
+
+try:
+    from concurrent.futures import ProcessPoolExecutor
+except ImportError:
+    ProcessPoolExecutor = None
+
+tests_folder = os.path.dirname(os.path.abspath(__file__))
+edl_path = os.path.join(tests_folder, 'sample.edl')
+
+
+class FakeFuture(object):
+    def __init__(self):
+        self._state = 'pending'
+        self._callbacks = []
+
+    def done(self):
+        return self._state != 'pending'
+
+    def cancelled(self):
+        return self._state == 'cancelled'
+
+    def cancel(self):
+        if self.done():
+            return False
+        self._finish('cancelled')
+        return True
+
+    def set_result(self, result):
+        self._result = result
+        self._finish('result')
+
+    def set_exception(self, exception):
+        self._exception = exception
+        self._finish('exception')
+
+    def result(self):
+        return self._result
+
+    def exception(self):
+        return self._exception if self._state == 'exception' else None
+
+    def add_done_callback(self, callback):
+        if self.done():
+            callback(self)
+        else:
+            self._callbacks.append(callback)
+
+    def _finish(self, state):
+        self._state = state
+        for callback in self._callbacks:
+            callback(self)
+
+
+class FakeLoop(object):
+    '''
+    Runs nothing, the test finishes the executor jobs by hand.
+    '''
+
+    def __init__(self):
+        self.jobs = []
+
+    def create_future(self):
+        return FakeFuture()
+
+    def run_in_executor(self, executor, call):
+        job = FakeFuture()
+        self.jobs.append((job, executor, call))
+        return job
+
+    def finish(self, index):
+        job, executor, call = self.jobs[index]
+        try:
+            if executor is None:
+                result = call()
+            else:
+                result = executor.apply(call)
+        except Exception as e:
+            job.set_exception(e)
+        else:
+            job.set_result(result)
+
+
+class TestLimit(unittest.TestCase):
+    def setUp(self):
+        self.loop = FakeLoop()
+        self.limit = aio.Limit(1)
+
+    def test_waiting(self):
+        first = aio.parse(edl_path, limit=self.limit, loop=self.loop)
+        second = aio.parse(edl_path, limit=self.limit, loop=self.loop)
+        self.assertEquals(len(self.loop.jobs), 1)
+        self.loop.finish(0)
+        self.assertEquals(len(first.result().getAllEdits()), 20)
+        self.assertEquals(len(self.loop.jobs), 2)
+        self.loop.finish(1)
+        self.assertEquals(len(second.result().getAllEdits()), 20)
+        self.assertEquals(self.limit._value, 1)
+
+    def test_cancel_started(self):
+        first = aio.parse(edl_path, limit=self.limit, loop=self.loop)
+        second = aio.parse(edl_path, limit=self.limit, loop=self.loop)
+        first.cancel()
+        # the executor job is cancelled and its slot goes to the next parse
+        self.assertTrue(self.loop.jobs[0][0].cancelled())
+        self.assertEquals(len(self.loop.jobs), 2)
+        self.loop.finish(1)
+        self.assertFalse(second.cancelled())
+        self.assertEquals(self.limit._value, 1)
+
+    def test_cancel_waiting(self):
+        aio.parse(edl_path, limit=self.limit, loop=self.loop)
+        second = aio.parse(edl_path, limit=self.limit, loop=self.loop)
+        second.cancel()
+        self.loop.finish(0)
+        self.assertEquals(len(self.loop.jobs), 1)
+        self.assertEquals(self.limit._value, 1)
+
+    def test_parse_many(self):
+        result = aio.parse_many([edl_path] * 3, limit=2, loop=self.loop)
+        self.assertEquals(len(self.loop.jobs), 2)
+        self.loop.finish(1)
+        self.loop.finish(0)
+        self.loop.finish(2)
+        self.assertEquals([len(edl.getAllEdits()) for edl in result.result()], [20] * 3)
+
+    def test_return_exceptions(self):
+        paths = [edl_path, 'this.does.not.exist.edl']
+        result = aio.parse_many(paths, return_exceptions=True, loop=self.loop)
+        self.loop.finish(0)
+        self.loop.finish(1)
+        self.assertEquals(len(result.result()[0].getAllEdits()), 20)
+        self.assertTrue(isinstance(result.result()[1], IOError))
+
+        result = aio.parse_many(paths, loop=self.loop)
+        self.loop.finish(3)
+        self.assertTrue(isinstance(result.exception(), IOError))
+
+    def test_cancel_many(self):
+        result = aio.parse_many([edl_path] * 3, limit=self.limit, loop=self.loop)
+        self.loop.finish(0)
+        result.cancel()
+        self.assertTrue(self.loop.jobs[1][0].cancelled())
+        self.assertEquals(len(self.loop.jobs), 2)
+        self.assertEquals(self.limit._value, 1)
+
+    def test_empty(self):
+        self.assertEquals(aio.parse_many([], loop=self.loop).result(), [])
+
+    def test_process_pool(self):
+        pool = multiprocessing.Pool(1)
+        try:
+            edl = aio.parse(edl_path, executor=pool, loop=self.loop)
+            self.loop.finish(0)
+        finally:
+            pool.close()
+            pool.join()
+        self.assertEquals(len(edl.result().getAllEdits()), 20)
+        self.assertEquals(edl.result().getEdit(3).globalIn().frames(),
+                          aio.parse_sync(edl_path).getEdit(3).globalIn().frames())
+
+    def test_number_limit(self):
+        with self.assertRaises(TypeError):
+            aio.parse(edl_path, limit=2, loop=self.loop)
+        with self.assertRaises(ValueError):
+            aio.Limit(0)
+
+
+@unittest.skipIf(aio.asyncio is None, 'asyncio or trollius is not available')
+class TestAio(unittest.TestCase):
+    def setUp(self):
+        self.loop = aio.asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_parse(self):
+        edl = self.loop.run_until_complete(aio.parse(edl_path, loop=self.loop))
+        self.assertEquals(len(edl.getAllEdits()), 20)
+
+    def test_parse_many(self):
+        limit = aio.Limit(2)
+        edls = self.loop.run_until_complete(
+            aio.parse_many([edl_path] * 5, limit=limit, loop=self.loop))
+        self.assertEquals([len(edl.getAllEdits()) for edl in edls], [20] * 5)
+        self.assertEquals(limit._value, 2)
+
+    def test_return_exceptions(self):
+        results = self.loop.run_until_complete(
+            aio.parse_many([edl_path, 'this.does.not.exist.edl'], return_exceptions=True,
+                           loop=self.loop))
+        self.assertEquals(len(results[0].getAllEdits()), 20)
+        self.assertTrue(isinstance(results[1], IOError))
+
+    def test_cancel_waiting(self):
+        limit = aio.Limit(1)
+        first = aio.parse(edl_path, limit=limit, loop=self.loop)
+        second = aio.parse(edl_path, limit=limit, loop=self.loop)
+        second.cancel()
+        self.loop.run_until_complete(first)
+        self.assertTrue(second.cancelled())
+        self.assertEquals(limit._value, 1)
+
+    @unittest.skipIf(ProcessPoolExecutor is None, 'concurrent.futures is not available')
+    def test_process_pool(self):
+        executor = ProcessPoolExecutor(1)
+        try:
+            edls = self.loop.run_until_complete(
+                aio.parse_many([edl_path] * 2, executor=executor, loop=self.loop))
+        finally:
+            executor.shutdown()
+        self.assertEquals([len(edl.getAllEdits()) for edl in edls], [20] * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
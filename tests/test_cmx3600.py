@@ -26,6 +26,7 @@
 import unittest
 import sys
 import os
+import tempfile
 
 sys.path.append('..')
 import editparser
@@ -42,6 +43,20 @@ class Test_CMX3600(unittest.TestCase):
         with self.assertRaises(IOError):
             editparser.parse(os.path.join(tests_folder, 'this.does.not.exist.edl'))
 
+    def test_invalid_events(self):
+        handle, path = tempfile.mkstemp(suffix='.edl')
+        with os.fdopen(handle, 'w') as f:
+            f.write('TITLE: BAD\n\n'
+                    '001  A001 V     C        00:00:00:00 00:00:01:00 01:00:01:00 01:00:00:00\n'
+                    '002  A001 V     C        00:00:00:00 00:00:01:00 01:00:00:00 01:00:01:00\n'
+                    '003  A001 V     C        00:00:00:00 00:00:01:00 01:00:03:00 01:00:02:00\n')
+        try:
+            with self.assertRaises(editparser.EditError) as context:
+                editparser.parse(path)
+        finally:
+            os.remove(path)
+        self.assertEquals([number for index, number, message in context.exception.errors], [1, 3])
+
     def test_complex_parsing(self):
         edl = editparser.parse(complex_edl_path, format='cmx3600')
         self.assertEquals(len(edl.getAllEdits()), 20)
@@ -75,6 +90,35 @@ class Test_CMX3600(unittest.TestCase):
         #for edit in edl.getAllEdits():
         #    print edit._attributes
 
+class TestTransitions(unittest.TestCase):
+    def setUp(self):
+        self.edl = editparser.parse(complex_edl_path, format='cmx3600')
+
+    def test_paired_dissolves(self):
+        transitions = self.edl.getAllTransitions()
+        self.assertEquals(len(transitions), 4)
+        dissolve = transitions[1]
+        self.assertEquals(dissolve.kind(), 'D')
+        self.assertEquals(dissolve.duration(), 30)
+        self.assertIs(dissolve.outgoing(), self.edl.getEdit(4))
+        self.assertIs(dissolve.incoming(), self.edl.getEdit(5))
+        self.assertEquals(dissolve.globalIn(), editparser.TimeCode('01:00:08:26', base=25))
+        self.assertEquals(dissolve.globalOut(), editparser.TimeCode('01:00:10:06', base=25))
+
+    def test_blend(self):
+        dissolve = self.edl.getAllTransitions()[1]
+        blend = list(dissolve.blend())
+        self.assertEquals(len(blend), 30)
+        record, a, b, weight = blend[15]
+        self.assertEquals(record, editparser.TimeCode('01:00:08:26', base=25).frames() + 15)
+        self.assertEquals(a, editparser.TimeCode('07:50:16:07', base=25).frames() + 15)
+        self.assertEquals(b, editparser.TimeCode('07:07:49:10', base=25).frames() + 15)
+        self.assertEquals(weight, 0.5)
+
+        columns = dissolve.blend_columns()
+        self.assertEquals(zip(*columns), blend)
+
+
 class TestArbitraryBase(unittest.TestCase):
     def test_valid_base_parsing(self):
         edl = editparser.parse(edl_path, format='cmx3600', base=30)
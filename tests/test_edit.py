@@ -26,6 +26,7 @@
 import unittest
 
 from editparser import Edit, TimeCode, EditError
+from editparser.containers import AttributeSchema, MutableMapping
 
 
 class TestEditCreation(unittest.TestCase):
@@ -93,6 +94,13 @@ class TestEditCreation(unittest.TestCase):
         with self.assertRaises(RuntimeError):
             Edit(mi, mo, gi, go)
 
+    def test_from_frames(self):
+        edit = Edit.from_frames(1, 3, 26, 28, 25, {'number': 1})
+        self.assertEquals(edit.mediaIn(), TimeCode('00:00:00:01', base=25))
+        self.assertEquals(edit.globalOut(), TimeCode('00:00:01:03', base=25))
+        self.assertEquals(edit.get('number'), 1)
+        self.assertEquals(Edit.from_frames(1, 3, 26, 28, 25).attributes(), {})
+
 
 class TestEditMethods(unittest.TestCase):
     def setUp(self):
@@ -194,5 +202,40 @@ class TestEditMethods(unittest.TestCase):
         self.assertEquals(str(self.e), '< Edit: 00:00:01:01[00:00:00:01;00:00:00:03]00:00:02:01>')
 
 
+class TestSharedAttributes(unittest.TestCase):
+    def setUp(self):
+        self.schema = AttributeSchema()
+        self.a = Edit('00:00:00:01', '00:00:00:02', '00:00:01:01', '00:00:02:01',
+                      tape='TAPE_A', number=1)
+        self.b = Edit('00:00:00:01', '00:00:00:02', '00:00:01:01', '00:00:02:01',
+                      number=2, tape=''.join(['TAPE', '_A']))
+        self.a.use_schema(self.schema)
+        self.b.use_schema(self.schema)
+
+    def test_get_set(self):
+        self.assertEquals(self.a.get('tape'), 'TAPE_A')
+        self.assertEquals(self.b.get('number'), 2)
+        self.b.set('comment', 'hello')
+        self.assertEquals(self.b.get('comment'), 'hello')
+        self.assertIsNone(self.a.get('comment'))
+        self.assertEquals(self.a.attributes(), {'tape': 'TAPE_A', 'number': 1})
+        self.assertEquals(dict(self.b.attributes()), {'tape': 'TAPE_A', 'number': 2,
+                                                      'comment': 'hello'})
+        self.assertEquals(sorted(self.schema.keys()), ['comment', 'number', 'tape'])
+
+    def test_interned_values(self):
+        self.assertIs(self.a.get('tape'), self.b.get('tape'))
+
+    def test_mapping(self):
+        attributes = self.schema.attributes({'tape': 'TAPE_A'})
+        self.assertTrue(isinstance(attributes, MutableMapping))
+        self.assertFalse(hasattr(attributes, '__dict__'))
+        attributes.update(number=3)
+        self.assertEquals(attributes, {'tape': 'TAPE_A', 'number': 3})
+        self.assertTrue('number' in attributes)
+        del attributes['number']
+        self.assertFalse('number' in attributes)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
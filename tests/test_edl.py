@@ -23,9 +23,16 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
 # THE POSSIBILITY OF SUCH DAMAGE.
 
+import os
+import pickle
+import random
+import time
 import unittest
 
-from editparser import EDL, Edit, TimeCode
+import editparser
+from editparser import EDL, Edit, TimeCode, Transition, EditError
+
+tests_folder = os.path.dirname(os.path.abspath(__file__))
 
 
 class TestEDLCreation(unittest.TestCase):
@@ -89,5 +96,418 @@ class TestEditManagement(unittest.TestCase):
         self.assertIsNone(self.edl.getEdit(8))
 
 
+class TestSortedEdits(unittest.TestCase):
+    def edit(self, record_in):
+        return Edit(TimeCode(frames=0, base=24), TimeCode(frames=10, base=24),
+                    TimeCode(frames=record_in, base=24), TimeCode(frames=record_in + 10, base=24))
+
+    def test_insert_sorted(self):
+        edl = EDL('testEDL', 'edlpath', base=24)
+        edits = [self.edit(frame) for frame in (30, 10, 20, 10)]
+        for edit in edits:
+            edl.insert_sorted(edit)
+        self.assertEquals(edl.getAllEdits(), [edits[1], edits[3], edits[2], edits[0]])
+        self.assertEquals(edl.getEdit(2), edits[2])
+
+    def test_remove_edit(self):
+        edl = EDL('testEDL', 'edlpath', base=24)
+        edits = [self.edit(frame) for frame in range(0, 5000, 10)]
+        for edit in reversed(edits):
+            edl.insert_sorted(edit)
+        for edit in edits[::2]:
+            edl.removeEdit(edit)
+        self.assertEquals(edl.getAllEdits(), edits[1::2])
+        with self.assertRaises(ValueError):
+            edl.removeEdit(edits[0])
+
+    def test_sorted_changes_scale(self):
+        # a linear search per change took over 30 seconds here
+        edl = EDL('testEDL', 'edlpath', base=24)
+        rand = random.Random(1)
+        edits = [self.edit(rand.randrange(1000000)) for i in range(20000)]
+        start = time.time()
+        for edit in edits:
+            edl.insert_sorted(edit)
+        for edit in edits[::2]:
+            edl.removeEdit(edit)
+        self.assertLess(time.time() - start, 3)
+        frames = [edit.globalIn().frames() for edit in edl.getAllEdits()]
+        self.assertEquals(frames, sorted(edit.globalIn().frames() for edit in edits[1::2]))
+
+    def test_mixed_changes(self):
+        edl = EDL('testEDL', 'edlpath', base=24)
+        edits = [self.edit(frame) for frame in (10, 20, 30, 5, 15)]
+        edl.insert_sorted(edits[0])
+        edl.insert_sorted(edits[2])
+        edl.appendEdit(edits[3])
+        edl.insert_sorted(edits[1])
+        edl.insertEdit(0, edits[4])
+        edl.removeEdit(edits[0])
+        self.assertEquals(edl.getAllEdits(), [edits[4], edits[2], edits[3], edits[1]])
+        self.assertEquals(edl.getEdit(-1), edits[1])
+
+    def test_edits_in_range(self):
+        edl = EDL('testEDL', 'edlpath', base=24)
+        edits = [self.edit(frame) for frame in (40, 0, 20, 30, 10)]
+        for edit in edits:
+            edl.appendEdit(edit)
+        in_range = list(edl.edits_in_range(10, TimeCode(frames=40, base=24)))
+        self.assertEquals(in_range, [edits[4], edits[2], edits[3]])
+        # the edit list keeps its order
+        self.assertEquals(edl.getAllEdits(), edits)
+
+    def test_remove_after_range_query(self):
+        edl = EDL('testEDL', 'edlpath', base=24)
+        edits = [self.edit(frame) for frame in (40, 0, 20, 30, 10)]
+        for edit in edits:
+            edl.appendEdit(edit)
+        list(edl.edits_in_range())
+        edl.removeEdit(edits[2])
+        self.assertEquals(edl.getAllEdits(), [edits[0], edits[1], edits[3], edits[4]])
+        self.assertEquals(list(edl.edits_in_range()), [edits[1], edits[4], edits[3], edits[0]])
+
+    def test_range_after_set_global_in(self):
+        edl = EDL('testEDL', 'edlpath', base=24)
+        edits = [self.edit(frame) for frame in (0, 10, 20)]
+        for edit in edits:
+            edl.appendEdit(edit)
+        list(edl.edits_in_range())
+        edits[0].setGlobalIn(TimeCode(frames=25, base=24))
+        self.assertEquals(list(edl.edits_in_range(20)), [edits[2], edits[0]])
+        edl.removeEdit(edits[0])
+        self.assertEquals(list(edl.edits_in_range()), edits[1:])
+
+
+class TestRippleEdits(unittest.TestCase):
+    def setUp(self):
+        self.edl = EDL('testEDL', 'edlpath', base=24)
+        self.edits = []
+        for i in range(4):
+            edit = Edit(TimeCode(frames=100, base=24), TimeCode(frames=110, base=24),
+                        TimeCode(frames=i * 10, base=24), TimeCode(frames=i * 10 + 10, base=24))
+            self.edits.append(edit)
+            self.edl.appendEdit(edit)
+
+    def record_frames(self):
+        return [(edit.globalIn().frames(), edit.globalOut().frames())
+                for edit in self.edl.getAllEdits()]
+
+    def test_ripple_trim(self):
+        self.edl.ripple_trim(self.edits[1], 5)
+        self.edl.ripple_trim(self.edits[2], 3, side='in')
+        self.assertEquals(self.record_frames(), [(0, 10), (10, 25), (25, 32), (32, 42)])
+        self.assertEquals(self.edits[1].mediaOut().frames(), 115)
+        self.assertEquals(self.edits[2].mediaIn().frames(), 103)
+
+    def test_ripple_trim_past_in(self):
+        with self.assertRaises(EditError):
+            self.edl.ripple_trim(self.edits[1], -11)
+        self.assertEquals(self.record_frames(), [(0, 10), (10, 20), (20, 30), (30, 40)])
+
+    def test_ripple_delete(self):
+        self.edl.ripple_delete(self.edits[1])
+        self.assertEquals(self.edl.getAllEdits(), [self.edits[0], self.edits[2], self.edits[3]])
+        self.assertEquals(self.record_frames(), [(0, 10), (10, 20), (20, 30)])
+
+    def test_ripple_insert(self):
+        edit = Edit(TimeCode(frames=0, base=24), TimeCode(frames=4, base=24),
+                    TimeCode(frames=22, base=24), TimeCode(frames=26, base=24))
+        self.edl.ripple_trim(self.edits[0], 2)
+        self.edl.ripple_insert(edit)
+        self.assertEquals(self.edl.getEdit(2), edit)
+        self.assertEquals(self.record_frames(), [(0, 12), (12, 22), (22, 26), (26, 36), (36, 46)])
+
+    def test_held_edit_is_moved(self):
+        self.edl.ripple_trim(self.edits[0], 5)
+        self.assertEquals(self.edits[3].globalIn().frames(), 35)
+        self.assertEquals(self.edits[2].globalInOut()[1].frames(), 35)
+        self.edl.ripple_trim(self.edits[1], -2)
+        self.assertEquals(self.edits[3].globalOut().frames(), 43)
+
+    def test_read_between_ripples(self):
+        self.edl.ripple_trim(self.edits[0], 5)
+        self.assertEquals(self.edits[2].globalIn().frames(), 25)
+        self.edl.ripple_trim(self.edits[1], 2)
+        self.assertEquals(self.edits[2].globalIn().frames(), 27)
+        self.edl.ripple_delete(self.edits[0])
+        self.assertEquals(self.record_frames(), [(0, 12), (12, 22), (22, 32)])
+
+    def test_ripples_scale(self):
+        # every read used to apply all pending ripple edits to all edits
+        edl = EDL('testEDL', 'edlpath', base=24)
+        edits = [Edit.from_frames(0, 10, i * 10, i * 10 + 10, 24) for i in range(20000)]
+        for edit in edits:
+            edl.appendEdit(edit)
+        durations = [10] * len(edits)
+        start = time.time()
+        for i in range(0, 4000, 2):
+            edl.ripple_trim(edits[i], 1)
+            durations[i] += 1
+            self.assertEquals(edits[i + 1].globalIn().frames(), sum(durations[:i + 1]))
+        for i in range(3999, 0, -2):
+            edl.ripple_delete(edits[i])
+            del durations[i]
+        self.assertLess(time.time() - start, 3)
+        frames = [edit.globalIn().frames() for edit in edl.getAllEdits()]
+        self.assertEquals(frames[:2000], [sum(durations[:i]) for i in range(2000)])
+        self.assertEquals(frames[-1], sum(durations) - 10)
+
+    def test_edit_order_is_kept(self):
+        edl = EDL('testEDL', 'edlpath', base=24)
+        for edit in (self.edits[2], self.edits[0], self.edits[3], self.edits[1]):
+            edl.appendEdit(edit)
+        edit = Edit(TimeCode(frames=0, base=24), TimeCode(frames=4, base=24),
+                    TimeCode(frames=10, base=24), TimeCode(frames=14, base=24))
+        edl.ripple_delete(self.edits[3])
+        edl.ripple_insert(edit)
+        self.assertEquals(edl.getAllEdits(), [self.edits[2], self.edits[0], edit, self.edits[1]])
+        self.assertEquals(self.edits[2].globalIn().frames(), 24)
+
+
+class TestCheckEdits(unittest.TestCase):
+    def test_check_edits(self):
+        edl = EDL('testEDL', 'edlpath', base=24)
+        edl.appendEdit(Edit.from_frames(0, 10, 0, 10, 24, {'number': 1}))
+        edl.check_edits()
+
+        edl.appendEdit(Edit.from_frames(0, 10, 20, 10, 24, {'number': 2}))
+        edl.appendEdit(Edit.from_timecodes(TimeCode(frames=0, base=25), TimeCode(frames=10, base=24),
+                                           TimeCode(frames=10, base=24), TimeCode(frames=20, base=24)))
+        with self.assertRaises(EditError) as context:
+            edl.check_edits()
+        self.assertEquals([(index, number) for index, number, message in context.exception.errors],
+                          [(1, 2), (2, None)])
+        self.assertTrue('event 2: Global In cannot be after Global Out!' in str(context.exception))
+        self.assertTrue('edit #2: ' in str(context.exception))
+
+
+class TestConsolidate(unittest.TestCase):
+    def setUp(self):
+        self.edl = EDL('testEDL', 'edlpath', base=24)
+        for number, tape, transition, media_in, record_in, comment in (
+                (1, 'A001', 'C', 100, 0, None),
+                (2, 'A001', 'C', 110, 10, 'through'),
+                (3, 'A001', 'C', 120, 20, None),
+                (4, 'A002', 'C', 130, 30, None),
+                (5, 'A002', 'C', 140, 40, None),
+                (5, 'A003', 'D', 500, 50, None),
+                (6, 'A003', 'C', 510, 60, None)):
+            attributes = dict(number=number, tape=tape, channels=['V'], transition=transition)
+            if comment:
+                attributes['comment'] = comment
+            self.edl.appendEdit(Edit(TimeCode(frames=media_in, base=24),
+                                     TimeCode(frames=media_in + 10, base=24),
+                                     TimeCode(frames=record_in, base=24),
+                                     TimeCode(frames=record_in + 10, base=24), **attributes))
+        outgoing, incoming = self.edl.getEdit(4), self.edl.getEdit(5)
+        self.edl.appendTransition(Transition('D', 10, outgoing, incoming))
+
+    def test_consolidate(self):
+        mapping = self.edl.consolidate()
+        self.assertEquals(mapping, {1: 1, 2: 1, 3: 1, 4: 2, 5: 3, 6: 3})
+        edits = self.edl.getAllEdits()
+        self.assertEquals(len(edits), 4)
+        self.assertEquals(edits[0].mediaIn().frames(), 100)
+        self.assertEquals(edits[0].mediaOut().frames(), 130)
+        self.assertEquals(edits[0].globalOut().frames(), 30)
+        self.assertEquals(edits[0].get('comment'), 'through')
+
+        # the outgoing event of the dissolve stays on its own
+        self.assertEquals([edit.get('number') for edit in edits], [1, 2, 3, 3])
+        self.assertEquals(edits[1].globalInOut()[1].frames(), 40)
+        self.assertEquals(edits[3].mediaOut().frames(), 520)
+        transition = self.edl.getAllTransitions()[0]
+        self.assertTrue(transition.outgoing() is edits[2])
+        self.assertTrue(transition.incoming() is edits[3])
+
+    def test_keep_numbers(self):
+        mapping = self.edl.consolidate(renumber=False)
+        self.assertEquals(mapping, {1: 1, 2: 1, 3: 1, 4: 4, 5: 5, 6: 5})
+
+    def test_merge_comments(self):
+        self.edl.getEdit(0).set('comment', 'first')
+        self.edl.consolidate()
+        self.assertEquals(self.edl.getEdit(0).get('comment'), ['first', 'through'])
+
+    def test_number_format(self):
+        edl = EDL('testEDL', 'edlpath', base=24)
+        for number, tape, record_in in (('003', 'A001', 0), ('007', 'A002', 10), ('003', 'A003', 20)):
+            edl.appendEdit(Edit(TimeCode(frames=record_in, base=24), TimeCode(frames=record_in + 10, base=24),
+                                TimeCode(frames=record_in, base=24), TimeCode(frames=record_in + 10, base=24),
+                                number=number, tape=tape, transition='C'))
+        mapping = edl.consolidate()
+        self.assertEquals([edit.get('number') for edit in edl.getAllEdits()], ['001', '002', '003'])
+        # the two events numbered 3 ended up apart
+        self.assertEquals(mapping, {'003': ('001', '003'), '007': '002'})
+
+
+class TestWhere(unittest.TestCase):
+    def setUp(self):
+        self.edl = EDL('testEDL', 'edlpath', base=24)
+        for tape, channels, transition in (('A001', ['V'], 'C'), ('A002', ['V', 'A'], 'C'),
+                                           ('A001', ['A'], 'D'), ('A001', ['V'], 'D')):
+            self.edl.appendEdit(Edit(TimeCode(frames=0, base=24), TimeCode(frames=10, base=24),
+                                     TimeCode(frames=0, base=24), TimeCode(frames=10, base=24),
+                                     tape=tape, channels=channels, transition=transition))
+        self.edits = self.edl.getAllEdits()
+
+    def test_single(self):
+        self.assertEquals(self.edl.where(tape='A001'), [self.edits[0], self.edits[2], self.edits[3]])
+        self.assertEquals(self.edl.where(channel='A'), [self.edits[1], self.edits[2]])
+        self.assertEquals(self.edl.where(tape='B001'), [])
+        self.assertEquals(self.edl.where(), self.edits)
+
+    def test_intersection(self):
+        self.assertEquals(self.edl.where(tape='A001', channel='V', transition='D'), [self.edits[3]])
+        self.assertEquals(self.edl.where(tape='A002', transition='D'), [])
+
+    def test_invalidation(self):
+        self.assertEquals(len(self.edl.where(transition='D')), 2)
+        self.edits[0].set('transition', 'D')
+        self.assertEquals(len(self.edl.where(transition='D')), 3)
+        self.edl.appendEdit(Edit(TimeCode(frames=0, base=24), TimeCode(frames=10, base=24),
+                                 TimeCode(frames=10, base=24), TimeCode(frames=20, base=24),
+                                 transition='D'))
+        self.assertEquals(len(self.edl.where(transition='D')), 4)
+        first, removed, last = self.edits[0], self.edits[2], self.edits[3]
+        self.edl.removeEdit(removed)
+        self.assertEquals(self.edl.where(tape='A001', transition='D'), [first, last])
+
+    def test_shared_edits(self):
+        other = EDL('otherEDL', 'edlpath', base=24)
+        edit = Edit(TimeCode(frames=0, base=24), TimeCode(frames=10, base=24),
+                    TimeCode(frames=0, base=24), TimeCode(frames=10, base=24), tape='A001')
+        other.appendEdit(self.edits[1])
+        other.appendEdit(edit)
+        self.assertEquals(other.where(tape='A001'), [edit])
+        self.edl.where(tape='A001')
+        # both EDLs holding the edit see the change
+        self.edits[1].set('tape', 'A001')
+        self.assertEquals(other.where(tape='A001'), [self.edits[1], edit])
+        self.assertEquals(len(self.edl.where(tape='A001')), 4)
+        self.edits[0].set('tape', 'B001')
+        self.assertEquals(other.where(tape='A001'), [self.edits[1], edit])
+        self.assertEquals(self.edl.where(tape='B001'), [self.edits[0]])
+
+    def test_ripple_positions(self):
+        first, second, third, fourth = self.edits
+        self.edl.where(tape='A001')
+        self.edl.ripple_delete(second)
+        self.assertEquals(self.edl.where(tape='A002'), [])
+        self.assertEquals(self.edl.where(channel='V'), [first, fourth])
+
+
+class TestFlatten(unittest.TestCase):
+    def setUp(self):
+        self.edl = EDL('testEDL', 'edlpath', base=24)
+        for track, media_in, record_in, record_out in ((2, 100, 0, 30), (1, 500, 10, 20), (3, 900, 25, 40)):
+            self.edl.appendEdit(Edit(TimeCode(frames=media_in, base=24),
+                                     TimeCode(frames=media_in + record_out - record_in, base=24),
+                                     TimeCode(frames=record_in, base=24),
+                                     TimeCode(frames=record_out, base=24),
+                                     Track=track))
+
+    def segments(self, edl):
+        return [(edit.get('Track'), edit.mediaIn().frames(),
+                 edit.globalIn().frames(), edit.globalOut().frames())
+                for edit in edl.getAllEdits()]
+
+    def test_flatten(self):
+        flat = self.edl.flatten()
+        self.assertEquals(self.segments(flat), [(2, 100, 0, 10), (1, 500, 10, 20),
+                                                (2, 120, 20, 30), (3, 905, 30, 40)])
+        self.assertEquals(len(self.edl.getAllEdits()), 3)
+
+    def test_flatten_track_priority(self):
+        flat = self.edl.flatten(track_priority=[3, 2, 1])
+        self.assertEquals(self.segments(flat), [(2, 100, 0, 25), (3, 900, 25, 40)])
+
+        flat = self.edl.flatten(track_priority=lambda edit: edit.get('Track'))
+        self.assertEquals(self.segments(flat), [(2, 100, 0, 25), (3, 900, 25, 40)])
+
+
+class TestRebase(unittest.TestCase):
+    def test_rebase(self):
+        edl = EDL('testEDL', 'edlpath', base=25)
+        edl.appendEdit(Edit(TimeCode(frames=100, base=25), TimeCode(frames=150, base=25),
+                            TimeCode(frames=90000, base=25), TimeCode(frames=90050, base=25)))
+        edl.appendEdit(Edit(TimeCode(frames=13, base=25), TimeCode(frames=31, base=25),
+                            TimeCode(frames=90050, base=25), TimeCode(frames=90063, base=25)))
+
+        rounded = edl.rebase(24)
+        self.assertEquals(rounded, [1])
+        self.assertEquals(edl.start_tc(), TimeCode('01:00:00:00', base=24))
+        first, second = edl.getAllEdits()
+        self.assertEquals(first.mediaInOut(), (TimeCode(frames=96, base=24), TimeCode(frames=144, base=24)))
+        self.assertEquals(first.globalOut(), TimeCode('01:00:02:00', base=24))
+        self.assertEquals(second.globalIn(), first.globalOut())
+        self.assertEquals(second.globalOut().frames(), 86460)
+        # media and record durations differed before, so both ends are rounded
+        self.assertEquals(second.mediaInOut(), (TimeCode(frames=12, base=24), TimeCode(frames=30, base=24)))
+
+    def test_rebase_edit_base(self):
+        # the edits were made at 50 frames a second, the EDL start at 25
+        edl = EDL('testEDL', 'edlpath', base=25)
+        edl.appendEdit(Edit(TimeCode(frames=100, base=50), TimeCode(frames=200, base=50),
+                            TimeCode(frames=180000, base=50), TimeCode(frames=180100, base=50)))
+        self.assertEquals(edl.rebase(25), [])
+        edit = edl.getEdit(0)
+        self.assertEquals(edit.mediaInOut(), (TimeCode(frames=50, base=25), TimeCode(frames=100, base=25)))
+        self.assertEquals(edit.globalIn(), TimeCode('01:00:00:00', base=25))
+        self.assertEquals(edl.start_tc(), TimeCode('01:00:00:00', base=25))
+
+
+class TestRecordFrameMapping(unittest.TestCase):
+    def setUp(self):
+        self.edl = EDL('testEDL', 'edlpath', base=24)
+        self.edl.appendEdit(Edit(TimeCode(frames=100, base=24), TimeCode(frames=110, base=24),
+                                 TimeCode(frames=0, base=24), TimeCode(frames=10, base=24),
+                                 tape='A'))
+        self.edl.appendEdit(Edit(TimeCode(frames=500, base=24), TimeCode(frames=505, base=24),
+                                 TimeCode(frames=15, base=24), TimeCode(frames=20, base=24),
+                                 tape='B'))
+
+    def test_map_record_frames(self):
+        indices, tapes, source_frames = self.edl.map_record_frames([0, 9, 12, 15, 19, 20])
+        self.assertEquals(list(indices), [0, 0, -1, 1, 1, -1])
+        self.assertEquals(tapes, ['A', 'A', None, 'B', 'B', None])
+        self.assertEquals(list(source_frames), [100, 109, -1, 500, 504, -1])
+
+    def test_map_overlapping_edits(self):
+        self.edl.appendEdit(Edit(TimeCode(frames=900, base=24), TimeCode(frames=902, base=24),
+                                 TimeCode(frames=4, base=24), TimeCode(frames=6, base=24),
+                                 tape='C'))
+        indices, tapes, source_frames = self.edl.map_record_frames(range(3, 8))
+        self.assertEquals(list(indices), [0, 2, 2, 0, 0])
+        self.assertEquals(list(source_frames), [103, 900, 901, 106, 107])
+
+    def test_frame_columns(self):
+        media_in, media_out, global_in, global_out = self.edl.frame_columns()
+        self.assertEquals(list(media_in), [100, 500])
+        self.assertEquals(list(global_out), [10, 20])
+
+
+class TestPickle(unittest.TestCase):
+    def setUp(self):
+        self.edl = editparser.parse(os.path.join(tests_folder, 'sample.edl'))
+
+    def test_round_trip(self):
+        self.edl.ripple_trim(self.edl.getEdit(2), 5)
+        for protocol in (0, pickle.HIGHEST_PROTOCOL):
+            edl = pickle.loads(pickle.dumps(self.edl, protocol))
+            self.assertEquals(edl.fingerprint(), self.edl.fingerprint())
+            self.assertEquals(edl.getEdit(3).attributes(), self.edl.getEdit(3).attributes())
+            # the unpickled edits belong to the unpickled EDL
+            edl.getEdit(0).setGlobalIn(TimeCode('01:10:00:00', base=25))
+            self.assertEquals(list(edl.edits_in_range())[-1], edl.getEdit(0))
+
+    def test_edit(self):
+        edit = self.edl.getEdit(5)
+        self.edl.ripple_trim(self.edl.getEdit(2), 5)
+        copy = pickle.loads(pickle.dumps(edit, pickle.HIGHEST_PROTOCOL))
+        self.assertEquals(copy.globalInOut(), edit.globalInOut())
+        self.assertEquals(copy.attributes(), edit.attributes())
+
+
 if __name__ == '__main__':
     unittest.main()
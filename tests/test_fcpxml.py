@@ -0,0 +1,121 @@
+# Copyright (c) 2012, Sveinbjorn J. Tryggvason
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    Redistributions of source code must retain the above
+#    copyright notice, this list of conditions and the following disclaimer.
+#
+#    Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT,INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+import os
+import shutil
+import tempfile
+
+import editparser
+from editparser import TimeCode
+
+tests_folder = os.path.dirname(os.path.abspath(__file__))
+edl_path = os.path.join(tests_folder, 'sample.fcp.xml')
+
+unnamed_xml = '''<?xml version="1.0" encoding="UTF-8"?>
+<xmeml version="4">
+  <sequence>
+    <rate><timebase>24</timebase></rate>
+    <media><video><track>
+      <clipitem><name>A</name><start>0</start><end>10</end><in>0</in><out>10</out></clipitem>
+      <clipitem><name>B</name><start>-1</start><end>20</end><in>0</in><out>10</out></clipitem>
+      <clipitem><name>C</name><start>20</start><end>-1</end><in>0</in><out>10</out></clipitem>
+      <clipitem><name>D</name><start>30</start><end>40</end><in>0</in><out>10</out></clipitem>
+    </track></video></media>
+  </sequence>
+</xmeml>
+'''
+
+
+class Test_FCPXML(unittest.TestCase):
+    def setUp(self):
+        self.edl = editparser.parse(edl_path, format='fcpxml')
+
+    def test_nonexisting_path(self):
+        with self.assertRaises(IOError):
+            editparser.parse(os.path.join(tests_folder, 'this.does.not.exist.xml'), format='fcpxml')
+
+    def test_sequence(self):
+        self.assertEquals(self.edl.title(), 'SAMPLE CUT')
+        self.assertEquals(self.edl.start_tc(), TimeCode('01:00:00:00', base=24))
+        self.assertEquals(len(self.edl.getAllEdits()), 4)
+
+    def test_clipitem(self):
+        edit = self.edl.getEdit(2)
+        self.assertEquals(edit.get('number'), 3)
+        self.assertEquals(edit.get('tape'), 'A001')
+        self.assertEquals(edit.get('from_clip_name'), 'SC010_SH010')
+        self.assertEquals(edit.get('FileName'), 'file://localhost/media/A001_C001.mov')
+        self.assertEquals(edit.get('channels'), ['V'])
+        self.assertEquals(edit.mediaIn(), TimeCode('10:00:03:08', base=24))
+        self.assertEquals(edit.mediaOut(), TimeCode('10:00:05:10', base=24))
+        self.assertEquals(edit.globalIn(), TimeCode('01:00:05:00', base=24))
+        self.assertEquals(edit.globalOut(), TimeCode('01:00:07:02', base=24))
+
+    def test_transition(self):
+        outgoing, incoming = self.edl.getEdit(0), self.edl.getEdit(1)
+        self.assertEquals(outgoing.globalOut(), TimeCode('01:00:02:22', base=24))
+        self.assertEquals(incoming.globalIn(), TimeCode('01:00:02:02', base=24))
+        self.assertEquals(incoming.get('transition'), 'D')
+        self.assertEquals(incoming.get('duration'), 20)
+
+    def test_audio(self):
+        edit = self.edl.getEdit(3)
+        self.assertEquals(edit.get('channels'), ['A'])
+        self.assertEquals(edit.get('MediaType'), 'AUDIO')
+
+    def test_iter_edits(self):
+        edits = list(editparser.iter_edits(edl_path, format='fcpxml'))
+        self.assertEquals([edit.attributes() for edit in edits],
+                          [edit.attributes() for edit in self.edl.getAllEdits()])
+
+
+class TestUnnamedSequence(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'unnamed.xml')
+        with open(self.path, 'w') as f:
+            f.write(unnamed_xml)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_file_name(self):
+        edl = editparser.parse(self.path, format='fcpxml')
+        self.assertEquals(edl.title(), 'unnamed.xml')
+
+    def test_start_without_transition(self):
+        second = editparser.parse(self.path, format='fcpxml').getEdit(1)
+        self.assertEquals(second.get('transition'), 'C')
+        self.assertEquals(second.globalIn().frames(), 10)
+
+    def test_end_without_transition(self):
+        edits = editparser.parse(self.path, format='fcpxml').getAllEdits()
+        self.assertEquals([edit.get('from_clip_name') for edit in edits], ['A', 'B', 'C', 'D'])
+        self.assertEquals(edits[2].globalOut().frames(), 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+# Copyright (c) 2012, Sveinbjorn J. Tryggvason
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    Redistributions of source code must retain the above
+#    copyright notice, this list of conditions and the following disclaimer.
+#
+#    Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT,INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+import os
+
+import editparser
+from editparser import TimeCode
+from editparser.fingerprint import Fingerprinter
+
+tests_folder = os.path.dirname(os.path.abspath(__file__))
+edl_path = os.path.join(tests_folder, 'sample.edl')
+complex_edl_path = os.path.join(tests_folder, 'sample.complex.edl')
+
+
+class TestFingerprint(unittest.TestCase):
+    def setUp(self):
+        self.edl = editparser.parse(edl_path)
+        self.other = editparser.parse(edl_path)
+
+    def test_identical_lists(self):
+        self.assertEquals(self.edl.fingerprint(), self.other.fingerprint())
+        self.assertNotEquals(self.edl.fingerprint(), editparser.parse(complex_edl_path).fingerprint())
+
+    def test_edit_changes(self):
+        edit = self.edl.getEdit(3)
+        before = edit.fingerprint()
+        self.assertEquals(before, self.other.getEdit(3).fingerprint())
+        self.assertNotEquals(before, self.edl.getEdit(4).fingerprint())
+
+        edit.setMediaOut(TimeCode(frames=edit.mediaOut().frames() + 1, base=25))
+        self.assertNotEquals(edit.fingerprint(), before)
+        self.assertNotEquals(self.edl.fingerprint(), self.other.fingerprint())
+
+        edit.setMediaOut(TimeCode(frames=edit.mediaOut().frames() - 1, base=25))
+        self.assertEquals(edit.fingerprint(), before)
+        edit.set('tape', 'OTHER')
+        self.assertNotEquals(edit.fingerprint(), before)
+
+    def test_set_copies_lists(self):
+        edit = self.edl.getEdit(3)
+        channels = ['V', 'A']
+        edit.set('channels', channels)
+        before = edit.fingerprint()
+        channels.append('A2')
+        self.assertEquals(edit.fingerprint(), before)
+        self.assertEquals(edit.get('channels'), ['V', 'A'])
+        self.assertTrue(edit.get('channels') is edit.attributes()['channels'])
+
+    def test_selected_attributes(self):
+        edit = self.edl.getEdit(0)
+        before = edit.fingerprint(attributes=['tape'])
+        edit.set('from_clip_name', 'renamed')
+        self.assertEquals(edit.fingerprint(attributes=['tape']), before)
+
+    def test_streaming(self):
+        fingerprinter = Fingerprinter()
+        for edit in fingerprinter.watch(editparser.iter_edits(edl_path)):
+            pass
+        self.assertEquals(fingerprinter.count(), 20)
+        self.assertEquals(fingerprinter.hexdigest(), self.edl.fingerprint())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+# Copyright (c) 2012, Sveinbjorn J. Tryggvason
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    Redistributions of source code must retain the above
+#    copyright notice, this list of conditions and the following disclaimer.
+#
+#    Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT,INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+import os
+import shutil
+import tempfile
+
+import editparser
+from editparser import TimeCode
+from editparser.index import ArchiveIndex
+
+tests_folder = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestArchiveIndex(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        for name in ('sample.edl', 'sample.complex.edl'):
+            shutil.copy(os.path.join(tests_folder, name), self.folder)
+        self.index = ArchiveIndex(os.path.join(self.folder, 'index.db'))
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.folder)
+
+    def test_ingest_directory(self):
+        ingested = self.index.ingest_directory(self.folder)
+        self.assertEquals(len(ingested), 2)
+        self.assertEquals(len(self.index.find_rows()), 40)
+
+    def test_skip_unchanged(self):
+        path = os.path.join(self.folder, 'sample.edl')
+        self.assertTrue(self.index.ingest(path))
+        self.assertFalse(self.index.ingest(path))
+        os.utime(path, (0, 0))
+        self.assertFalse(self.index.ingest(path))
+        self.assertTrue(self.index.ingest(path, force=True))
+        self.assertEquals(len(self.index.find_rows()), 20)
+
+    def test_ingest_edl_relative_path(self):
+        cwd = os.getcwd()
+        os.chdir(self.folder)
+        try:
+            self.index.ingest_edl(editparser.parse('sample.edl'))
+        finally:
+            os.chdir(cwd)
+        path = os.path.join(os.path.realpath(self.folder), 'sample.edl')
+        self.assertEquals(self.index.paths(), [path])
+        self.index.remove(path)
+        self.assertEquals(self.index.paths(), [])
+
+    def test_tape_range_query(self):
+        self.index.ingest_directory(self.folder)
+        rows = self.index.find_rows(tape='L30107', start='07:50:00:00', end='07:55:00:00')
+        self.assertEquals([row['number'] for row in rows], [1, 3, 4, 5, 11, 13])
+
+        rows = self.index.find_rows(tape='L30107',
+                                    start=TimeCode('07:50:00:00', base=30),
+                                    end=TimeCode('07:55:00:00', base=30))
+        self.assertEquals(rows, [])
+
+    def test_find_edits(self):
+        self.index.ingest_directory(self.folder)
+        results = self.index.find_edits(clip_name='SC0020_SH010_L_C007_JH')
+        self.assertEquals(len(results), 1)
+        path, edit = results[0]
+        self.assertEquals(os.path.basename(path), 'sample.edl')
+        self.assertEquals(edit.get('number'), 1)
+        self.assertEquals(edit.get('channels'), ['V'])
+        self.assertEquals(edit.mediaIn(), TimeCode('00:00:00:01', base=25))
+        self.assertEquals(edit.globalOut(), TimeCode('01:01:19:08', base=25))
+
+
+if __name__ == '__main__':
+    unittest.main()
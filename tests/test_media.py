@@ -0,0 +1,115 @@
+# Copyright (c) 2012, Sveinbjorn J. Tryggvason
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    Redistributions of source code must retain the above
+#    copyright notice, this list of conditions and the following disclaimer.
+#
+#    Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT,INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+import os
+import shutil
+import tempfile
+
+import editparser
+from editparser.media import MediaIndex, normalize_reference
+from editparser.persistent import PersistentEDL
+
+tests_folder = os.path.dirname(os.path.abspath(__file__))
+vegas_path = os.path.join(tests_folder, 'sample.vegas.txt')
+complex_edl_path = os.path.join(tests_folder, 'sample.complex.edl')
+
+
+class TestMediaIndex(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.root = os.path.join(self.folder, 'media')
+        for path in ('images/cam_1.png', 'images/SafeFrame.png', 'backup/images/cam_1.png',
+                     'other/cam_1.png', 'sound/audio.wav', 'clips/7-2B.NEW.01.mov'):
+            path = os.path.join(self.root, path)
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            open(path, 'w').close()
+        self.cache_path = os.path.join(self.folder, 'media.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def media(self, path):
+        return os.path.join(self.root, path)
+
+    def test_normalize_reference(self):
+        self.assertEquals(normalize_reference('C:\\temp\\images\\Cam_1.PNG'), '/temp/images/cam_1.png')
+        self.assertEquals(normalize_reference('C:\\temp\\Cam_1.PNG', case_sensitive=True), '/temp/Cam_1.PNG')
+
+    def test_resolve(self):
+        index = MediaIndex([self.root])
+        self.assertEquals(index.resolve('C:\\temp\\images\\safeFrame.PNG'), self.media('images/SafeFrame.png'))
+        self.assertEquals(index.resolve('C:\\temp\\sound\\audio.mp3'), self.media('sound/audio.wav'))
+        self.assertEquals(index.resolve('7-2B.NEW.01'), self.media('clips/7-2B.NEW.01.mov'))
+        self.assertEquals(index.resolve('D:\\backup\\images\\cam_1.png'), self.media('backup/images/cam_1.png'))
+        self.assertEquals(index.resolve('missing.png'), None)
+        self.assertEquals(index.resolve(''), None)
+
+        self.assertEquals(MediaIndex([self.root], case_sensitive=True).resolve('safeFrame.PNG'), None)
+
+    def test_resolve_other_take(self):
+        open(self.media('clips/7-2B.NEW.mov'), 'w').close()
+        index = MediaIndex([self.root])
+        # only an extension is swapped, not a take number
+        self.assertEquals(index.resolve('7-2B.NEW.02'), None)
+        self.assertEquals(index.resolve('7-2B.NEW.mxf'), self.media('clips/7-2B.NEW.mov'))
+
+    def test_cache(self):
+        os.utime(self.media('sound'), (1000, 1000))
+        MediaIndex([self.root], self.cache_path)
+        self.assertTrue(os.path.exists(self.cache_path))
+
+        # the cached list is used while the directories are unchanged
+        open(self.media('sound/new.wav'), 'w').close()
+        os.utime(self.media('sound'), (1000, 1000))
+        self.assertEquals(MediaIndex([self.root], self.cache_path).resolve('new.wav'), None)
+
+        os.utime(self.media('sound'), (1001, 1001))
+        index = MediaIndex([self.root], self.cache_path)
+        self.assertEquals(index.resolve('new.wav'), self.media('sound/new.wav'))
+        self.assertEquals(index.resolve('audio.mp3'), self.media('sound/audio.wav'))
+
+    def test_relink(self):
+        edl = editparser.parse(vegas_path, format='vegas')
+        edits = list(editparser.relink(edl, [self.root]))
+        resolved = [edit.get('media_path') for edit in edits if edit.get('media_path')]
+        self.assertEquals(len(resolved), 12)
+        self.assertEquals(set(resolved), set([self.media('images/cam_1.png'), self.media('images/SafeFrame.png'),
+                                              self.media('sound/audio.wav')]))
+
+        edits = list(editparser.relink(editparser.iter_edits(complex_edl_path), [self.root],
+                                       attribute='clip_path'))
+        self.assertEquals(edits[1].get('clip_path'), self.media('clips/7-2B.NEW.01.mov'))
+
+    def test_relink_copies(self):
+        version = PersistentEDL.from_edl(editparser.parse(vegas_path, format='vegas'))
+        edits = list(editparser.relink(version, [self.root]))
+        self.assertEquals(len([edit for edit in edits if edit.get('media_path')]), 12)
+        self.assertEquals([edit for edit in version if edit.get('media_path')], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
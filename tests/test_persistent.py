@@ -0,0 +1,145 @@
+# Copyright (c) 2012, Sveinbjorn J. Tryggvason
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    Redistributions of source code must retain the above
+#    copyright notice, this list of conditions and the following disclaimer.
+#
+#    Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT,INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+import os
+
+import editparser
+from editparser import Edit, EditError, TimeCode
+from editparser.containers import PersistentSequence
+from editparser.persistent import FrozenEdit, PersistentEDL, History
+
+tests_folder = os.path.dirname(os.path.abspath(__file__))
+edl_path = os.path.join(tests_folder, 'sample.edl')
+complex_edl_path = os.path.join(tests_folder, 'sample.complex.edl')
+
+
+class TestPersistentSequence(unittest.TestCase):
+    def test_versions(self):
+        first = PersistentSequence(range(100))
+        second = first.set(10, 'x').insert(0, 'y').delete(-1).append('z')
+        self.assertEquals(list(first), range(100))
+        self.assertEquals(list(second), ['y'] + range(10) + ['x'] + range(11, 99) + ['z'])
+        self.assertEquals(len(second), 101)
+        self.assertEquals(second[11], 'x')
+        self.assertEquals(second[-1], 'z')
+
+    def test_index_error(self):
+        with self.assertRaises(IndexError):
+            PersistentSequence([1, 2])[2]
+        with self.assertRaises(IndexError):
+            PersistentSequence().delete(0)
+
+
+class TestPersistentEDL(unittest.TestCase):
+    def setUp(self):
+        self.edl = editparser.parse(edl_path)
+        self.version = PersistentEDL.from_edl(self.edl)
+
+    def test_from_edl(self):
+        self.assertEquals(len(self.version), 20)
+        self.assertEquals(self.version.title(), self.edl.title())
+        self.assertEquals(self.version.start_tc(), self.edl.start_tc())
+        self.assertEquals([edit.globalIn() for edit in self.version],
+                          [edit.globalIn() for edit in self.edl.getAllEdits()])
+
+        # later changes to the source list do not leak in
+        self.edl.getEdit(0).set('tape', 'CHANGED')
+        self.edl.getEdit(0).get('channels').append('A')
+        self.assertEquals(self.version.getEdit(0).get('channels'), ('V',))
+        self.assertNotEquals(self.version.getEdit(0).get('tape'), 'CHANGED')
+
+    def test_frozen(self):
+        edit = self.version.getEdit(0)
+        with self.assertRaises(EditError):
+            edit.set('tape', 'X')
+        with self.assertRaises(EditError):
+            edit.setMediaIn(TimeCode(frames=0, base=25))
+        edit.attributes()['tape'] = 'X'
+        self.assertNotEquals(edit.get('tape'), 'X')
+        with self.assertRaises(AttributeError):
+            edit.get('channels').append('A')
+        self.assertEquals(edit.replace(channels=['A']).get('channels'), ('A',))
+        self.assertEquals(edit.thaw().get('channels'), ['V'])
+
+    def test_changes(self):
+        edit = Edit(TimeCode(frames=0, base=25), TimeCode(frames=10, base=25),
+                    TimeCode(frames=0, base=25), TimeCode(frames=10, base=25), number=99)
+        changed = (self.version.updateEdit(0, tape='X')
+                   .insertEdit(1, edit)
+                   .deleteEdit(-1)
+                   .appendEdit(edit))
+        self.assertEquals(len(changed), 21)
+        self.assertEquals(changed.getEdit(0).get('tape'), 'X')
+        self.assertEquals(changed.getEdit(1).get('number'), 99)
+        self.assertEquals(changed.getEdit(2), self.version.getEdit(1))
+        self.assertNotEquals(self.version.getEdit(0).get('tape'), 'X')
+        self.assertEquals(len(self.version), 20)
+
+        the_edl = changed.to_edl()
+        self.assertEquals(len(the_edl.getAllEdits()), 21)
+        the_edl.getEdit(0).set('tape', 'Y')
+        self.assertEquals(changed.getEdit(0).get('tape'), 'X')
+
+    def test_pending_ripples(self):
+        self.edl.ripple_trim(self.edl.getEdit(0), 5)
+        edit = self.edl.getAllEdits()[3]
+        self.edl.ripple_trim(self.edl.getEdit(0), 5)
+        frozen = FrozenEdit.freeze(edit)
+        self.assertEquals(frozen.globalIn(), edit.globalIn())
+
+    def test_transitions(self):
+        version = PersistentEDL.from_edl(editparser.parse(complex_edl_path))
+        transition = version.getAllTransitions()[1]
+        self.assertTrue(transition.outgoing() is version.getEdit(4))
+        self.assertTrue(transition.incoming() is version.getEdit(5))
+
+        changed = version.updateEdit(5, tape='X')
+        self.assertTrue(changed.getAllTransitions()[1].incoming() is changed.getEdit(5))
+        self.assertTrue(version.getAllTransitions()[1].incoming() is version.getEdit(5))
+        self.assertEquals(len(changed.deleteEdit(4).getAllTransitions()), 3)
+
+        the_edl = changed.to_edl()
+        transitions = the_edl.getAllTransitions()
+        self.assertEquals([t.kind() for t in transitions], ['D'] * 4)
+        self.assertTrue(transitions[1].incoming() is the_edl.getEdit(5))
+        self.assertEquals(transitions[1].incoming().get('tape'), 'X')
+
+    def test_history(self):
+        history = History(self.edl)
+        first = history.current()
+        second = history.commit(first.deleteEdit(0))
+        self.assertTrue(history.undo() is first)
+        self.assertTrue(history.redo() is second)
+        with self.assertRaises(EditError):
+            history.redo()
+        history.undo()
+        history.commit(first.deleteEdit(1))
+        self.assertFalse(history.can_redo())
+        self.assertEquals(len(history.current()), 19)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+# Copyright (c) 2012, Sveinbjorn J. Tryggvason
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    Redistributions of source code must retain the above
+#    copyright notice, this list of conditions and the following disclaimer.
+#
+#    Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT,INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+import os
+
+import editparser
+from editparser import EDL, TimeCode, EditError
+from editparser import pipeline
+
+tests_folder = os.path.dirname(os.path.abspath(__file__))
+edl_path = os.path.join(tests_folder, 'sample.edl')
+complex_edl_path = os.path.join(tests_folder, 'sample.complex.edl')
+vegas_path = os.path.join(tests_folder, 'sample.vegas.txt')
+
+
+class TestIterEdits(unittest.TestCase):
+    def test_cmx3600(self):
+        edits = list(editparser.iter_edits(complex_edl_path))
+        edl = editparser.parse(complex_edl_path)
+        self.assertEquals([edit.attributes() for edit in edits],
+                          [edit.attributes() for edit in edl.getAllEdits()])
+
+    def test_vegas(self):
+        edits = list(editparser.iter_edits(vegas_path, format='vegas', chunk_size=7))
+        edl = editparser.parse(vegas_path, format='vegas')
+        self.assertEquals([(edit.globalIn().frames(), edit.get('ID')) for edit in edits],
+                          [(edit.globalIn().frames(), edit.get('ID')) for edit in edl.getAllEdits()])
+
+
+class TestStages(unittest.TestCase):
+    def test_filter(self):
+        edits = list(pipeline.filter(editparser.iter_edits(complex_edl_path),
+                                     tape='L30107', channels='V'))
+        self.assertEquals(len(edits), 13)
+        edits = list(pipeline.filter(editparser.iter_edits(complex_edl_path),
+                                     lambda edit: edit.get('transition') == 'D'))
+        self.assertEquals(len(edits), 4)
+
+    def test_offset(self):
+        edl = editparser.parse(edl_path)
+        edits = list(pipeline.offset(edl, TimeCode('00:59:00:00', base=25) - edl.start_tc()))
+        self.assertEquals(edits[0].globalIn(), TimeCode('00:59:50:00', base=25))
+        self.assertEquals(edits[0].mediaIn(), TimeCode('00:00:00:01', base=25))
+        self.assertEquals(edl.getEdit(0).globalIn(), TimeCode('01:00:50:00', base=25))
+
+    def test_rebase(self):
+        edits = list(pipeline.rebase(editparser.iter_edits(edl_path), 50))
+        self.assertEquals(edits[0].globalIn(), TimeCode('01:00:50:00', base=50))
+        self.assertEquals(edits[0].mediaOut(), TimeCode('00:00:29:18', base=50))
+
+    def test_renumber(self):
+        edits = list(pipeline.renumber(editparser.iter_edits(complex_edl_path), start=10))
+        self.assertEquals([edit.get('number') for edit in edits][:6], [10, 10, 11, 12, 13, 13])
+
+        edits = list(pipeline.renumber([pipeline._copy(edit, attributes={'number': '0042'})
+                                        for edit in edits[:2]], start=7))
+        self.assertEquals([edit.get('number') for edit in edits], ['0007', '0007'])
+
+    def test_merge(self):
+        edits = list(pipeline.merge([editparser.parse(edl_path), editparser.iter_edits(edl_path)]))
+        self.assertEquals(len(edits), 40)
+        self.assertEquals([edit.get('number') for edit in edits[:4]], [1, 1, 2, 2])
+        frames = [edit.globalIn().frames() for edit in edits]
+        self.assertEquals(frames, sorted(frames))
+
+        unordered = list(editparser.iter_edits(edl_path))[::-1]
+        with self.assertRaises(EditError):
+            list(pipeline.merge([unordered]))
+
+    def test_merge_edl_order(self):
+        edl = editparser.parse(edl_path)
+        # an ordered list is read as it is
+        self.assertEquals(list(pipeline.merge([edl])), edl.getAllEdits())
+        self.assertEquals(list(edl.edits_in_range()), edl.getAllEdits())
+
+        reversed_edl = editparser.EDL('reversed', edl_path, base=25)
+        for edit in reversed(edl.getAllEdits()):
+            reversed_edl.appendEdit(edit)
+        self.assertEquals(list(pipeline.merge([reversed_edl])), edl.getAllEdits())
+
+    def test_assemble(self):
+        reels = [editparser.iter_edits(edl_path), editparser.iter_edits(edl_path)]
+        edits = list(editparser.assemble(reels, offsets=[0, TimeCode('01:00:00:00', base=25)]))
+        self.assertEquals(len(edits), 40)
+        self.assertEquals([edit.get('number') for edit in edits], range(1, 41))
+        self.assertEquals(edits[20].globalIn(), TimeCode('02:00:50:00', base=25))
+        self.assertEquals(edits[19].globalOut(), TimeCode('01:02:42:12', base=25))
+
+        edits = list(editparser.assemble([editparser.iter_edits(edl_path)], offsets={0: 25},
+                                         renumber=False))
+        self.assertEquals(edits[0].globalIn(), TimeCode('01:00:51:00', base=25))
+
+    def test_consolidate(self):
+        edits = [pipeline._copy(edit, attributes={'Length': 400.0})
+                 for edit in editparser.iter_edits(edl_path)][:2]
+        second = pipeline._copy(edits[0], edits[0].mediaOut().frames(), edits[0].mediaOut().frames() + 10,
+                                edits[0].globalOut().frames(), edits[0].globalOut().frames() + 10)
+        groups = []
+        merged = list(pipeline.consolidate([edits[0], second, edits[1]],
+                                           lambda edit, originals: groups.append(len(originals))))
+        self.assertEquals(groups, [2, 1])
+        self.assertEquals(merged[0].globalOut(), second.globalOut())
+        self.assertEquals(merged[0].get('Length'), 800.0)
+        self.assertTrue(merged[1] is edits[1])
+
+    def test_map_attributes(self):
+        edits = pipeline.map_attributes(editparser.iter_edits(edl_path),
+                                        lambda attributes: {'tape': attributes['tape']},
+                                        tape=lambda tape: tape.lower())
+        self.assertEquals(next(edits).attributes(), {'tape': 'l_previe'})
+
+    def test_compose_and_sink(self):
+        edl = EDL('out', 'out.edl')
+        stream = pipeline.compose(editparser.iter_edits(edl_path),
+                                  lambda edits: pipeline.filter(edits, tape='L_PREVIE'),
+                                  pipeline.renumber)
+        self.assertEquals(pipeline.sink(stream, edl), 4)
+        self.assertEquals([edit.get('number') for edit in edl.getAllEdits()], [1, 2, 3, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+# Copyright (c) 2012, Sveinbjorn J. Tryggvason
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    Redistributions of source code must retain the above
+#    copyright notice, this list of conditions and the following disclaimer.
+#
+#    Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT,INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+import os
+
+import editparser
+from editparser import TimeCode, TimeCodeError
+from editparser.ranges import TimeRange, RangeSet
+
+tests_folder = os.path.dirname(os.path.abspath(__file__))
+complex_edl_path = os.path.join(tests_folder, 'sample.complex.edl')
+
+
+class TestTimeRange(unittest.TestCase):
+    def test_from_timecodes(self):
+        time_range = TimeRange(TimeCode('00:00:01:00', base=25), TimeCode('00:00:02:05', base=25))
+        self.assertEquals(time_range.frames(), (25, 55))
+        self.assertEquals(time_range.duration(), 30)
+        self.assertEquals(time_range.base(), 25)
+
+    def test_invalid(self):
+        with self.assertRaises(TimeCodeError):
+            TimeRange(10, 5)
+        with self.assertRaises(TimeCodeError):
+            TimeRange(TimeCode(frames=1, base=25), TimeCode(frames=5, base=24))
+
+
+class TestRangeSet(unittest.TestCase):
+    def setUp(self):
+        self.a = RangeSet([(0, 10), (5, 15), (20, 30)])
+        self.b = RangeSet([(10, 25), (40, 50)])
+
+    def test_normalized(self):
+        self.assertEquals([r.frames() for r in self.a], [(0, 15), (20, 30)])
+        self.assertEquals(self.a.duration(), 25)
+        self.assertTrue(14 in self.a)
+        self.assertFalse(15 in self.a)
+
+    def test_set_operations(self):
+        self.assertEquals(self.a | self.b, RangeSet([(0, 30), (40, 50)]))
+        self.assertEquals(self.a & self.b, RangeSet([(10, 15), (20, 25)]))
+        self.assertEquals(self.a - self.b, RangeSet([(0, 10), (25, 30)]))
+        self.assertEquals(self.a.complement(), RangeSet([(15, 20)]))
+        self.assertEquals(self.b.complement(0, 60), RangeSet([(0, 10), (25, 40), (50, 60)]))
+
+    def test_mixed_bases(self):
+        with self.assertRaises(TimeCodeError):
+            self.a.union(RangeSet([(0, 1)], base=24))
+
+    def test_from_edl(self):
+        edl = editparser.parse(complex_edl_path)
+        record = RangeSet.from_edl(edl)
+        self.assertEquals(len(record), 1)
+        self.assertEquals(record.duration(), edl.getEdit(19).globalOut().frames() -
+                          edl.getEdit(0).globalIn().frames())
+
+        used = RangeSet.from_edl(edl, side='media', tape='L30108')
+        self.assertEquals(used.duration(), 53 + 30 + 51)
+        self.assertEquals(RangeSet([TimeRange(*edl.getEdit(2).mediaInOut())]) - used, RangeSet())
+
+
+if __name__ == '__main__':
+    unittest.main()
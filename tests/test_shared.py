@@ -0,0 +1,100 @@
+# Copyright (c) 2012, Sveinbjorn J. Tryggvason
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    Redistributions of source code must retain the above
+#    copyright notice, this list of conditions and the following disclaimer.
+#
+#    Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT,INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+import os
+import multiprocessing
+from array import array
+
+import editparser
+from editparser import shared, EDL, Edit
+
+tests_folder = os.path.dirname(os.path.abspath(__file__))
+complex_edl_path = os.path.join(tests_folder, 'sample.complex.edl')
+
+
+class TestSharedEDL(unittest.TestCase):
+    def setUp(self):
+        self.edl = editparser.parse(complex_edl_path)
+
+    def test_round_trip(self):
+        descriptor = shared.export_edl(self.edl)
+        self.assertEquals(descriptor.count, 20)
+        with shared.SharedEDL(descriptor) as view:
+            self.assertEquals(len(view), 20)
+            self.assertEquals(view.title(), self.edl.title())
+            self.assertEquals(view.start_tc(), self.edl.start_tc())
+            self.assertEquals(view.frame_columns(), self.edl.frame_columns())
+
+            original = self.edl.getEdit(-1)
+            self.assertEquals(view.frames(-1), (original.mediaIn().frames(), original.mediaOut().frames(),
+                                                original.globalIn().frames(), original.globalOut().frames()))
+            edit = view.getEdit(1)
+            self.assertEquals(edit.globalIn(), self.edl.getEdit(1).globalIn())
+            self.assertEquals(edit.get('tape'), 'L30107')
+            self.assertTrue(type(edit.get('tape')) is str)
+            self.assertEquals(edit.get('channels'), ['V'])
+            self.assertTrue(type(edit.get('channels')[0]) is str)
+            self.assertEquals(len(view.getAllEdits()), 20)
+            with self.assertRaises(IndexError):
+                view.frames(20)
+        self.assertFalse(os.path.exists(descriptor.path))
+
+    @unittest.skipIf(array('l').itemsize < 8, 'frames above 2**31 need a 64 bit long')
+    def test_large_frames(self):
+        edl = EDL('large', 'large.edl', base=25)
+        edl.appendEdit(Edit.from_frames(2 ** 31 + 7, 2 ** 31 + 9, 2 ** 40, 2 ** 40 + 2, 25, {'tape': 'A'}))
+        edl.appendEdit(Edit.from_frames(0, 2, 2 ** 40 + 2, 2 ** 40 + 4, 25, {'tape': 'B'}))
+        descriptor = shared.export_edl(edl)
+        with shared.SharedEDL(descriptor) as view:
+            self.assertEquals(view.frames(0), (2 ** 31 + 7, 2 ** 31 + 9, 2 ** 40, 2 ** 40 + 2))
+            self.assertEquals(view.frame_columns(), edl.frame_columns())
+            self.assertEquals(view.getEdit(1).get('tape'), 'B')
+
+    def test_release(self):
+        descriptor = shared.export_edl(self.edl)
+        view = shared.SharedEDL(descriptor)
+        view.release()
+        view.release()
+        self.assertFalse(os.path.exists(descriptor.path))
+
+    def test_discard(self):
+        descriptor = shared.export_edl(self.edl)
+        shared.discard(descriptor)
+        self.assertFalse(os.path.exists(descriptor.path))
+
+    def test_worker(self):
+        pool = multiprocessing.Pool(1)
+        try:
+            descriptor = pool.apply(shared.parse_shared, (complex_edl_path,))
+        finally:
+            pool.close()
+            pool.join()
+        with shared.SharedEDL(descriptor) as view:
+            self.assertEquals(view.frame_columns(), self.edl.frame_columns())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+# Copyright (c) 2012, Sveinbjorn J. Tryggvason
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    Redistributions of source code must retain the above
+#    copyright notice, this list of conditions and the following disclaimer.
+#
+#    Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT,INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+import os
+
+import editparser
+from editparser import EditError, Edit, TimeCode
+from editparser.stats import QuantileSketch, Stats, summarize
+
+tests_folder = os.path.dirname(os.path.abspath(__file__))
+complex_edl_path = os.path.join(tests_folder, 'sample.complex.edl')
+
+
+class TestQuantileSketch(unittest.TestCase):
+    def test_quantiles(self):
+        values = [(i * 7919) % 1000 for i in range(10000)]
+        first, second = QuantileSketch(), QuantileSketch()
+        for value in values[:5000]:
+            first.add(value)
+        for value in values[5000:]:
+            second.add(value)
+        sketch = first.merge(second)
+
+        ordered = sorted(values)
+        self.assertEquals(sketch.count(), 10000)
+        self.assertEquals(sketch.quantile(0), 0)
+        self.assertEquals(sketch.quantile(1), 999)
+        for q in (0.1, 0.5, 0.9, 0.99):
+            exact = ordered[int(q * (len(ordered) - 1))]
+            self.assertTrue(abs(sketch.quantile(q) - exact) <= 0.01 * exact + 1e-9)
+
+    def test_bounded(self):
+        sketch = QuantileSketch(max_buckets=8)
+        for value in range(-100, 100000, 7):
+            sketch.add(value)
+        self.assertTrue(len(sketch._positive) <= 8)
+        self.assertTrue(sketch.quantile(0.9) > 80000)
+        self.assertTrue(len(sketch._negative) <= 8)
+        self.assertEquals(sum(count for low, high, count in sketch.histogram()), sketch.count())
+        low, high, count = sketch.histogram()[0]
+        self.assertTrue(low <= -100 <= high)
+
+    def test_empty(self):
+        self.assertEquals(QuantileSketch().quantile(0.5), None)
+
+
+class TestStats(unittest.TestCase):
+    def test_summarize(self):
+        edl = editparser.parse(complex_edl_path)
+        stats = summarize(edl)
+        self.assertEquals(stats.events, 20)
+        self.assertEquals(stats.edls, 1)
+        self.assertEquals(stats.base, 25)
+        self.assertEquals(dict(stats.events_per_channel), {('V',): 20})
+        self.assertEquals(stats.runtime(), 1075)
+        self.assertEquals(dict(stats.transitions), {'D': 4})
+
+        streamed = summarize(editparser.iter_edits(complex_edl_path))
+        self.assertEquals(streamed.runtime_per_tape, stats.runtime_per_tape)
+        self.assertEquals(streamed.percentiles(), stats.percentiles())
+
+    def test_merge(self):
+        edits = list(editparser.iter_edits(complex_edl_path))
+        first, second = Stats(), Stats()
+        list(first.watch(edits[:7]))
+        list(second.watch(edits[7:]))
+        merged = first.merge(second)
+        whole = summarize(edits)
+        self.assertEquals(merged.events, whole.events)
+        self.assertEquals(merged.runtime_per_tape, whole.runtime_per_tape)
+        self.assertEquals(merged.runtime(), whole.runtime())
+        self.assertEquals(merged.shot_lengths.histogram(), whole.shot_lengths.histogram())
+
+        with self.assertRaises(EditError):
+            merged.merge(summarize(edits, base=24))
+
+    def test_rebase(self):
+        stats = Stats(base=50)
+        stats.add(Edit(TimeCode(frames=0, base=25), TimeCode(frames=10, base=25),
+                       TimeCode(frames=0, base=25), TimeCode(frames=10, base=25), tape='A'))
+        stats.add_columns([0], [30], 50, tapes=['A'])
+        self.assertEquals(stats.runtime_per_tape['A'], 50)
+        # the two edits cover the same first 20 frames
+        self.assertEquals(stats.runtime(), 30)
+
+    def test_runtime(self):
+        stats = Stats()
+        stats.add_columns([0, 0, 20], [10, 10, 30], 25, channels=[('V',), ('A',), ('V',)])
+        self.assertEquals(stats.runtime_per_channel[('V',)], 20)
+        self.assertEquals(stats.runtime(), 20)
+
+        other = Stats().add_columns([5, 30], [25, 40], 25)
+        self.assertEquals(stats.merge(other).runtime(), 40)
+
+        edl = editparser.parse(complex_edl_path)
+        self.assertEquals(stats.add_edl(edl).runtime(), 40 + 1075)
+
+
+if __name__ == '__main__':
+    unittest.main()
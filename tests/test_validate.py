@@ -0,0 +1,74 @@
+# Copyright (c) 2012, Sveinbjorn J. Tryggvason
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    Redistributions of source code must retain the above
+#    copyright notice, this list of conditions and the following disclaimer.
+#
+#    Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT,INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+import os
+
+import editparser
+from editparser import EDL, Edit, TimeCode
+from editparser.validate import Validator
+
+tests_folder = os.path.dirname(os.path.abspath(__file__))
+complex_edl_path = os.path.join(tests_folder, 'sample.complex.edl')
+
+
+def make_edit(media_in, media_out, global_in, global_out, **kwargs):
+    return Edit(TimeCode(frames=media_in, base=25), TimeCode(frames=media_out, base=25),
+                TimeCode(frames=global_in, base=25), TimeCode(frames=global_out, base=25), **kwargs)
+
+
+class TestValidate(unittest.TestCase):
+    def setUp(self):
+        self.edl = EDL('testEDL', 'edlpath')
+        self.edl.appendEdit(make_edit(0, 10, 0, 10, number=1, channels=['V']))
+        self.edl.appendEdit(make_edit(0, 12, 10, 20, number=2, channels=['V']))
+        self.edl.appendEdit(make_edit(0, 10, 0, 10, number=3, channels=['A']))
+        self.edl.appendEdit(make_edit(0, 10, 25, 35, number=2, channels=['V']))
+        reversed_edit = make_edit(20, 30, 35, 45, number=4, channels=['V'])
+        reversed_edit.setMediaIn(TimeCode(frames=40, base=25))
+        self.edl.appendEdit(reversed_edit)
+
+    def test_validate(self):
+        findings = self.edl.validate()
+        self.assertEquals([(finding.index, finding.check) for finding in findings],
+                          [(1, 'duration'), (3, 'continuity'), (3, 'numbering'),
+                           (4, 'reversed'), (4, 'duration')])
+        self.assertEquals(findings[1].number, 2)
+        self.assertEquals(findings[1].message, 'Gap of 5 frames after the previous edit on the channel')
+
+    def test_streaming(self):
+        validator = Validator()
+        edits = list(validator.watch(self.edl.getAllEdits()))
+        self.assertEquals(edits, self.edl.getAllEdits())
+        self.assertEquals(validator.findings, self.edl.validate())
+
+        validator = Validator()
+        for edit in validator.watch(editparser.iter_edits(complex_edl_path)):
+            pass
+        self.assertEquals(validator.findings, editparser.parse(complex_edl_path).validate())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -26,6 +26,7 @@
 import unittest
 import os
 import sys
+import tempfile
 
 sys.path.append('..')
 import editparser
@@ -47,6 +48,39 @@ class Test_Vegas_Parsing(unittest.TestCase):
         edit = self.edl.getEdit(7)
 
 
+class Test_Vegas_Frame_Conversion(unittest.TestCase):
+    def test_rounding(self):
+        values = [0.0, 40.0, 59.9999, 60.0, 1020.0]
+        self.assertEquals(list(vegas.msec_to_frames(values, 25)), [0, 1, 1, 1, 25])
+        self.assertEquals(list(vegas.msec_to_frames(values, 25, 'nearest')), [0, 1, 1, 2, 26])
+        self.assertEquals(list(vegas.msec_to_frames(values, 25, 'ceil')), [0, 1, 2, 2, 26])
+
+    def test_invalid_rounding(self):
+        with self.assertRaises(editparser.ParserError):
+            vegas.msec_to_frames([0.0], 25, 'sideways')
+
+    def test_parse_rounding(self):
+        edl = editparser.parse(edl_path, format='vegas', base=24, rounding='nearest')
+        edit = edl.getEdit(4)
+        self.assertEquals(edit.globalIn().frames(), 60)
+        self.assertEquals(edit.globalOut().frames(), 125)
+
+    def test_out_points(self):
+        # the rounded length is added to the rounded in, like TimeCode.from_msec
+        line = r'1; 1; 30.0000; 50.0000; 1.000000; FALSE; FALSE; 0; TRUE; FALSE; VIDEO; "file.ext"; 0; 30.0000; 50.0000; 0.0000; 0.0000; 1.000000; 4; 0.000000; 4; 0.000000; 0; -1; 4; 4; 0.000000; FALSE; 0; 0'
+        descriptor, path = tempfile.mkstemp(suffix='.txt')
+        try:
+            os.write(descriptor, line + '\n')
+            os.close(descriptor)
+            edit, = vegas.iter_edits(path, base=25)
+        finally:
+            os.remove(path)
+        expected = editparser.TimeCode.from_msec(30.0, 25) + editparser.TimeCode.from_msec(50.0, 25)
+        self.assertEquals(edit.globalOut(), expected)
+        self.assertEquals(edit.mediaOut(), expected)
+        self.assertEquals(edit.globalOut().frames(), 1)
+
+
 class Test_Vegas_VegasEDLLine(unittest.TestCase):
     def setUp(self):
         self.line = r'1; 1; 0.0000; 105840.0000; 1.000000; FALSE; FALSE; 0; TRUE; FALSE; VIDEO; "R:\this\is\file.ext"; 0; 0.0000; 5005.0000; 0.0000; 0.0000; 1.000000; 4; 0.000000; 4; 0.000000; 0; -1; 4; 4; 0.000000; FALSE; 0; 0'
@@ -0,0 +1,147 @@
+# Copyright (c) 2012, Sveinbjorn J. Tryggvason
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#    Redistributions of source code must retain the above
+#    copyright notice, this list of conditions and the following disclaimer.
+#
+#    Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT,INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+# THE POSSIBILITY OF SUCH DAMAGE.
+
+import unittest
+import os
+import shutil
+import tempfile
+import time
+
+import editparser
+from editparser import EditError
+from editparser.watcher import Watcher, diff_edls
+
+tests_folder = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestWatcher(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, 'sample.edl')
+        shutil.copy(os.path.join(tests_folder, 'sample.edl'), self.path)
+        self.events = []
+        self.watcher = Watcher(self.folder, self.events.append, settle=2.0, workers=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_settle(self):
+        self.assertEquals(self.watcher.poll(now=100.0), [])
+        self.assertEquals(self.watcher.poll(now=101.0), [])
+        self.assertEquals(self.watcher.poll(now=102.0), [self.path])
+        self.assertEquals(self.watcher.poll(now=110.0), [])
+
+    def test_debounce(self):
+        self.watcher.poll(now=100.0)
+        os.utime(self.path, (1, 1))
+        self.assertEquals(self.watcher.poll(now=101.5), [])
+        self.assertEquals(self.watcher.poll(now=103.0), [])
+        self.assertEquals(self.watcher.poll(now=103.5), [self.path])
+
+    def test_events(self):
+        self.watcher.poll(now=100.0)
+        self.watcher.poll(now=102.0)
+        event = self.watcher.process(self.path)
+        self.assertEquals(event.kind, 'created')
+        self.assertEquals(len(event.edl.getAllEdits()), 20)
+        self.assertEquals(len(event.diff.added), 20)
+
+        # touched only
+        os.utime(self.path, (1, 1))
+        self.assertEquals(self.watcher.process(self.path), None)
+
+        lines = open(self.path).readlines()
+        with open(self.path, 'w') as f:
+            f.writelines(lines[:-2])
+        event = self.watcher.process(self.path)
+        self.assertEquals(event.kind, 'modified')
+        self.assertEquals(len(event.diff.added), 0)
+        self.assertEquals(len(event.diff.removed), 1)
+
+        os.remove(self.path)
+        event = self.watcher.process(self.path)
+        self.assertEquals(event.kind, 'deleted')
+        self.assertEquals(len(event.diff.removed), 19)
+        self.assertEquals([e.kind for e in self.events], ['created', 'modified', 'deleted'])
+
+    def test_invalid_edl(self):
+        errors = []
+        watcher = Watcher(self.folder, self.events.append, workers=0,
+                          errback=lambda path, err: errors.append((path, err)))
+        with open(self.path, 'w') as f:
+            # record out before record in
+            f.write('001  L_PREVIE V     C        00:00:00:00 00:00:01:00 01:00:01:00 01:00:00:00\n')
+        self.assertEquals(watcher.process(self.path), None)
+        self.assertEquals(self.events, [])
+        self.assertEquals(errors[0][0], self.path)
+        self.assertTrue(isinstance(errors[0][1], EditError))
+
+        def failing_errback(path, err):
+            raise RuntimeError('errback failed')
+        watcher = Watcher(self.folder, self.events.append, workers=0, errback=failing_errback)
+        self.assertEquals(watcher.process(self.path), None)
+
+    def test_watch(self):
+        watcher = editparser.watch(self.folder, self.events.append, interval=0.01, settle=0)
+        try:
+            deadline = time.time() + 10
+            while not self.events and time.time() < deadline:
+                time.sleep(0.01)
+            watcher.join()
+        finally:
+            watcher.stop(timeout=10)
+        self.assertEquals([event.kind for event in self.events], ['created'])
+
+    def test_poll_error(self):
+        errors = []
+        watcher = Watcher(self.folder, self.events.append, interval=0.01, settle=0,
+                          errback=lambda path, err: errors.append((path, err)))
+        poll = watcher.poll
+
+        def failing_poll():
+            if not errors:
+                raise OSError('directory unavailable')
+            return poll()
+        watcher.poll = failing_poll
+
+        watcher.start()
+        try:
+            deadline = time.time() + 10
+            while not self.events and time.time() < deadline:
+                time.sleep(0.01)
+            watcher.join()
+        finally:
+            watcher.stop(timeout=10)
+        self.assertEquals(errors[0][0], self.folder)
+        self.assertEquals([event.kind for event in self.events], ['created'])
+
+    def test_diff_edls(self):
+        edl = editparser.parse(self.path)
+        diff = diff_edls(edl, edl)
+        self.assertEquals((diff.added, diff.removed), ([], []))
+
+
+if __name__ == '__main__':
+    unittest.main()